@@ -1,13 +1,25 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel
 import numpy as np
+import pandas as pd
 from ..services.supabase_client import supabase
+from ..core import deadline
+from ..core.analytics import run_analytics
+from ..core.tracing import traced
+from ..core.profiling import note_history_size
+from . import exercise_catalog
 
 logger = logging.getLogger(__name__)
 
+RECENT_RPE_SESSIONS = 4  # sessions averaged into trend_metrics["avg_rpe"]
+TREND_WINDOW = 12        # most recent sessions per exercise the trend fits cover
+HISTORY_PAGE_SIZE = 1000  # PostgREST max-rows default
+HISTORY_COLUMNS = "id,exercise_id,exercise_name,sets,reps,weight,sets_json,created_at"
+
 # ------------------------------------------------------------------------------
 # 🧩 Pydantic Models (aligned with backend/app/schemas/ai.py)
 # ------------------------------------------------------------------------------
@@ -26,6 +38,7 @@ class RawWorkoutRow(BaseModel):
     sets: int              # integer count of sets
     reps: int              # integer reps per set (as stored now)
     weight: Optional[float] = None
+    sets_json: Optional[List[Dict[str, Any]]] = None  # per-set detail (migration 006), may be []
     created_at: datetime 
 
 
@@ -39,24 +52,53 @@ class ExerciseTrend(BaseModel):
 # 🧠 Core Functions
 # ------------------------------------------------------------------------------
 
+def _parse_ts(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _pgrst_quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _filter_exercise(query, exercise_name: str):
+    """
+    Catalog exercises are matched on the indexed `exercise_id`; rows written
+    before migration 010 (no id yet) are matched on their known spellings.
+    Unknown exercises keep the exact-name match.
+    """
+    ex = exercise_catalog.lookup(exercise_name)
+    if ex is None:
+        return query.eq("exercise_name", exercise_name)
+    names = ",".join(_pgrst_quote(n) for n in exercise_catalog.spellings(ex))
+    return query.or_(f"exercise_id.eq.{ex.id},and(exercise_id.is.null,exercise_name.in.({names}))")
+
+
+async def _query_workout_rows(user_id: str, exercise_name: Optional[str] = None, window: int = 12) -> List[Dict[str, Any]]:
+    """
+    Raw Supabase rows (plain dicts, newest first) for a user / exercise.
+    """
+    query = supabase.table("workouts").select("*").eq("user_id", user_id)
+    if exercise_name:
+        query = _filter_exercise(query, exercise_name)
+    query = query.order("created_at", desc=True).limit(window)
+    resp = query.execute()
+    workouts = resp.data or []
+    note_history_size(len(workouts))
+    logger.debug("Fetched %d workouts for user %s", len(workouts), user_id)
+    return workouts
+
+
 async def fetch_raw_workouts(user_id: str, exercise_name: Optional[str] = None, window: int = 12) -> List[RawWorkoutRow]:
     """
     Fetch recent raw workouts for a user, optionally filtered by exercise_name.
     """
-    # print(f"Fetching workouts for user {user_id}, exercise {exercise_name}, window {window}", flush=True)
     try:
-        query = supabase.table("workouts").select("*").eq("user_id", user_id)
-        if exercise_name:
-            query = query.eq("exercise_name", exercise_name)
-        query = query.order("created_at", desc=True).limit(window)
-        resp = query.execute()
-        # print(f"Supabase response: {resp}", flush=True)
-        workouts = resp.data or []
-        # print(f"Workouts data: {workouts}", flush=True)
-        logger.info(f"Fetched {len(workouts)} workouts for user {user_id}")
-        items = [RawWorkoutRow.model_validate(r) for r in workouts]
-        # print(f"Parsed {items} workout rows", flush=True)
-        return items
+        workouts = await _query_workout_rows(user_id, exercise_name, window)
+        return [RawWorkoutRow.model_validate(r) for r in workouts]
+    except deadline.DeadlineExceeded:
+        raise  # not "no workouts": let the route answer 504
     except Exception as e:
         logger.exception(f"Failed to fetch workouts: {e}")
         return []
@@ -64,11 +106,22 @@ async def fetch_raw_workouts(user_id: str, exercise_name: Optional[str] = None,
 
 async def normalize_sets(raw_workout_row: RawWorkoutRow) -> List[WorkoutSet]:
     """
-    Materialize per-set detail from scalar columns:
-    - repeats `sets` times using the same reps/weight (DB stores one row per workout)
+    Materialize per-set detail:
+    - uses `sets_json` when the row carries real per-set data
+    - otherwise repeats `sets` times using the same reps/weight (scalar columns)
     - handles NULL weight (treats as 0.0)
     """
     try:
+        if raw_workout_row.sets_json:
+            return [
+                WorkoutSet(
+                    set_index=int(s.get("set_index") or i + 1),
+                    reps=int(s.get("reps") or 0),
+                    weight=float(s.get("weight_kg", s.get("weight")) or 0.0),
+                    rpe=float(s["rpe"]) if s.get("rpe") is not None else None,
+                )
+                for i, s in enumerate(raw_workout_row.sets_json)
+            ]
         sets_count = max(int(raw_workout_row.sets or 0), 0)
         reps_per_set = int(raw_workout_row.reps or 0)
         weight = float(raw_workout_row.weight) if raw_workout_row.weight is not None else 0.0
@@ -83,76 +136,414 @@ async def normalize_sets(raw_workout_row: RawWorkoutRow) -> List[WorkoutSet]:
         return []
 
 
+# ------------------------------------------------------------------------------
+# 🗜️ Compact session store (array-backed, no per-set objects)
+# ------------------------------------------------------------------------------
+
+class SessionStore:
+    """
+    Columnar view of a user's sessions for one exercise, sorted oldest → newest.
+
+    Per-set values live in flat NumPy buffers (CSR layout): the sets of session
+    ``i`` are ``reps[offsets[i]:offsets[i + 1]]`` (same for ``weight``/``rpe``).
+    Per-session metrics are computed once with vectorized reductions; per-set
+    dicts are only built by ``sets_for()`` when a caller asks for them.
+    """
+
+    __slots__ = (
+        "ids", "dates", "offsets", "reps", "weight", "rpe",
+        "total_volume", "max_set_weight", "avg_rpe",
+    )
+
+    def __init__(self, ids: List[str], dates: List[datetime], offsets: np.ndarray,
+                 reps: np.ndarray, weight: np.ndarray, rpe: np.ndarray):
+        self.ids = ids
+        self.dates = dates
+        self.offsets = offsets
+        self.reps = reps
+        self.weight = weight
+        self.rpe = rpe
+        self._reduce()
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "SessionStore":
+        """
+        Build the store in one pass over Supabase rows (any order).
+
+        Rows with a non-empty ``sets_json`` contribute their real per-set
+        reps/weight/RPE; other rows fall back to the scalar columns
+        (``sets`` copies of reps/weight, no RPE). Rows without sets are
+        dropped, matching the legacy normalize_sets path.
+        """
+        rows = sorted(
+            ((_parse_ts(r["created_at"]), r) for r in rows),
+            key=lambda dr: dr[0],
+        )
+        ids: List[str] = []
+        dates: List[datetime] = []
+        counts: List[int] = []
+        is_json: List[bool] = []
+        scalar_reps: List[float] = []
+        scalar_weight: List[float] = []
+        json_sets: List[Dict[str, Any]] = []
+        for d, r in rows:
+            detail = r.get("sets_json") or []
+            if detail:
+                n = len(detail)
+                json_sets.extend(detail)
+            else:
+                n = max(int(r.get("sets") or 0), 0)
+                if n == 0:
+                    continue
+                w = r.get("weight")
+                scalar_reps.append(float(r.get("reps") or 0))
+                scalar_weight.append(float(w) if w is not None else 0.0)
+            ids.append(str(r.get("id")))
+            dates.append(d)
+            counts.append(n)
+            is_json.append(bool(detail))
+
+        counts_arr = np.asarray(counts, dtype=np.int64)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts_arr, out=offsets[1:])
+        total = int(offsets[-1])
+
+        # Scatter both sources into one flat buffer: positions of json-backed
+        # sets keep the row order they were flattened in.
+        json_row = np.asarray(is_json, dtype=bool)
+        set_is_json = np.repeat(json_row, counts_arr)
+        reps_arr = np.empty(total, dtype=np.float64)
+        weight_arr = np.empty(total, dtype=np.float64)
+        rpe_arr = np.full(total, np.nan)
+        if json_sets:
+            reps_arr[set_is_json] = np.nan_to_num(
+                np.array([s.get("reps") for s in json_sets], dtype=np.float64), nan=0.0
+            )
+            weight_arr[set_is_json] = np.nan_to_num(
+                np.array([s.get("weight_kg", s.get("weight")) for s in json_sets], dtype=np.float64), nan=0.0
+            )
+            rpe_arr[set_is_json] = np.array([s.get("rpe") for s in json_sets], dtype=np.float64)
+        if scalar_reps:
+            scalar_counts = counts_arr[~json_row]
+            reps_arr[~set_is_json] = np.repeat(np.asarray(scalar_reps), scalar_counts)
+            weight_arr[~set_is_json] = np.repeat(np.asarray(scalar_weight), scalar_counts)
+        return cls(ids, dates, offsets, reps_arr, weight_arr, rpe_arr)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _reduce(self) -> None:
+        n = len(self.dates)
+        if n == 0:
+            self.total_volume = np.zeros(0)
+            self.max_set_weight = np.zeros(0)
+            self.avg_rpe = np.zeros(0)
+            return
+        starts = self.offsets[:-1]
+        self.total_volume = np.add.reduceat(self.reps * self.weight, starts)
+        self.max_set_weight = np.maximum.reduceat(self.weight, starts)
+        has_rpe = ~np.isnan(self.rpe)
+        rpe_sum = np.add.reduceat(np.where(has_rpe, self.rpe, 0.0), starts)
+        rpe_cnt = np.add.reduceat(has_rpe.astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.avg_rpe = np.where(rpe_cnt > 0, rpe_sum / np.maximum(rpe_cnt, 1), np.nan)
+
+    def sets_for(self, i: int) -> List[Dict[str, Any]]:
+        """Materialize the per-set dicts of session ``i`` (WorkoutSet-shaped)."""
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        return [
+            {
+                "set_index": k + 1,
+                "reps": int(self.reps[lo + k]),
+                "weight": float(self.weight[lo + k]),
+                "rpe": None if np.isnan(self.rpe[lo + k]) else float(self.rpe[lo + k]),
+            }
+            for k in range(hi - lo)
+        ]
+
+    def to_sessions(self, include_sets: bool = False) -> List[Dict[str, Any]]:
+        """Session payload dicts (chronological), optionally with per-set detail."""
+        vols = np.round(self.total_volume, 2).tolist()
+        tops = np.round(self.max_set_weight, 2).tolist()
+        rpes = np.round(self.avg_rpe, 2).tolist()
+        sessions: List[Dict[str, Any]] = []
+        for i, d in enumerate(self.dates):
+            session = {
+                "date": d,
+                "total_volume": vols[i],
+                "max_set_weight": tops[i],
+                "avg_rpe": None if rpes[i] != rpes[i] else rpes[i],  # NaN check
+            }
+            if include_sets:
+                session["sets"] = self.sets_for(i)
+            sessions.append(session)
+        return sessions
+
+
+async def load_session_store(user_id: str, exercise_name: Optional[str] = None, window: int = 12) -> SessionStore:
+    """
+    Like fetch_session_store, but read errors propagate: for writers that
+    must not mistake a failed query for an empty history.
+    """
+    rows = await _query_workout_rows(user_id, exercise_name, window)
+    return SessionStore.from_rows(rows)
+
+
+@traced()
+async def fetch_session_store(user_id: str, exercise_name: Optional[str] = None, window: int = 12) -> SessionStore:
+    """
+    Fetch recent workouts straight into a SessionStore (no per-row validation).
+    """
+    try:
+        return await load_session_store(user_id, exercise_name, window)
+    except deadline.DeadlineExceeded:
+        raise  # not "no workouts": let the caller skip the stage or answer 504
+    except Exception as e:
+        logger.exception(f"Failed to fetch workouts: {e}")
+        return SessionStore.from_rows([])
+
+
+@traced()
 async def aggregate_exercise_history(
     user_id: str,
     exercise_name: str,
     lookback_sessions: List[int] = [4, 8, 12],
+    include_sets: bool = False,
 ) -> ExerciseTrend:
     """
     Aggregate historical performance for a given exercise.
-    Returns per-session metrics for trend analysis.
+    Returns per-session metrics for trend analysis; per-set detail is only
+    included when `include_sets` is True.
     """
     window = max(lookback_sessions) if lookback_sessions else 12
-    raw_workouts = await fetch_raw_workouts(user_id, exercise_name, window)
-    sessions: List[Dict[str, Any]] = []
-    # print(f"Fetched {len(raw_workouts)} workouts for exercise {exercise_name}", flush=True)
-
-    for w in raw_workouts:
-        sets = await normalize_sets(w)
-        if not sets:
-            continue
-
-        total_volume = sum(s.weight * s.reps for s in sets)
-        max_weight = max((s.weight for s in sets), default=0.0)
-        avg_rpe = np.mean([s.rpe for s in sets if s.rpe is not None]) if any(s.rpe for s in sets) else None
-
-        sessions.append({
-            "date": w.created_at,                     # use created_at from schema
-            "total_volume": round(float(total_volume), 2),
-            "max_set_weight": round(float(max_weight), 2),
-            "avg_rpe": round(float(avg_rpe), 2) if avg_rpe is not None else None,
-            "sets": [s.dict() for s in sets],
-        })
-
-    # chronological for trend calc
-    sessions.sort(key=lambda x: x["date"])
-    # print(f"Normalized sessions for {exercise_name}: {sessions}", flush=True)
-    trend_metrics = await compute_trend_metrics(sessions)
-    # print(f"Computed trend metrics for {exercise_name}: {trend_metrics}", flush=True)
+    store = await fetch_session_store(user_id, exercise_name, window)
+    sessions = store.to_sessions(include_sets=include_sets)
+    trend_metrics = _trend_metrics_from_arrays(
+        np.round(store.total_volume, 2), np.round(store.max_set_weight, 2), np.round(store.avg_rpe, 2)
+    )
     return ExerciseTrend(exercise_name=exercise_name, sessions=sessions, trend_metrics=trend_metrics).model_dump()
 
 
-async def compute_trend_metrics(sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _trend_metrics_from_arrays(vols: np.ndarray, weights: np.ndarray, rpes: np.ndarray) -> Dict[str, Any]:
     """
-    Compute performance trends like slope of volume and weight progression.
+    Trend metrics over chronologically ordered per-session arrays
+    (missing RPE encoded as NaN).
     """
     try:
-        if len(sessions) < 2:
+        if len(vols) < 2:
             return {"volume_slope": 0, "weight_slope": 0, "rpe_trend": 0, "consistency": 0}
 
-        vols = np.array([float(s["total_volume"]) for s in sessions], dtype=float)
-        weights = np.array([float(s["max_set_weight"]) for s in sessions], dtype=float)
-        rpes = np.array([float(s["avg_rpe"]) if s["avg_rpe"] is not None else 0.0 for s in sessions], dtype=float)
+        vols = np.asarray(vols, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        rpes = np.asarray(rpes, dtype=float)
 
         x = np.arange(len(vols), dtype=float)
         volume_slope = float(np.polyfit(x, vols, 1)[0])
         weight_slope = float(np.polyfit(x, weights, 1)[0])
-        rpe_trend = float(np.polyfit(x, rpes, 1)[0]) if np.any(rpes) else 0.0
+        # RPE is only logged for some sessions: fit over the ones that have it
+        has_rpe = ~np.isnan(rpes)
+        rpe_trend = float(np.polyfit(x[has_rpe], rpes[has_rpe], 1)[0]) if has_rpe.sum() >= 2 else 0.0
 
         # Consistency = inverse of std deviation (guarded)
         consistency = round(float(1.0 / (np.std(vols) + 1e-6)), 3)
 
-        return {
+        metrics = {
             "volume_slope": round(volume_slope, 3),
             "weight_slope": round(weight_slope, 3),
             "rpe_trend": round(rpe_trend, 3),
             "consistency": consistency,
         }
+        # Mean RPE of the last few sessions that logged it (read by fitness_advisor._avg_rpe)
+        recent_rpes = rpes[has_rpe][-RECENT_RPE_SESSIONS:]
+        if recent_rpes.size:
+            metrics["avg_rpe"] = round(float(recent_rpes.mean()), 2)
+        return metrics
     except Exception as e:
         logger.error(f"Error computing trend metrics: {e}")
         return {}
 
 
+@traced()
+async def compute_trend_metrics(sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compute performance trends like slope of volume and weight progression.
+    """
+    try:
+        vols = np.array([float(s["total_volume"]) for s in sessions], dtype=float)
+        weights = np.array([float(s["max_set_weight"]) for s in sessions], dtype=float)
+        rpes = np.array([float(s["avg_rpe"]) if s["avg_rpe"] is not None else np.nan for s in sessions], dtype=float)
+    except Exception as e:
+        logger.error(f"Error computing trend metrics: {e}")
+        return {}
+    return await run_analytics(_trend_metrics_from_arrays, vols, weights, rpes, size=len(vols))
+
+
+# ------------------------------------------------------------------------------
+# 👤 User-scoped history (all exercises, one read)
+# ------------------------------------------------------------------------------
+
+def _fetch_all_pages(build_query) -> List[Dict[str, Any]]:
+    """
+    Run `build_query()` page by page until PostgREST returns a short page.
+    Rows come newest first, so when the request budget would not cover
+    another page, the older pages are dropped and the recent ones returned.
+    """
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        started = time.perf_counter()
+        page = build_query().range(start, start + HISTORY_PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < HISTORY_PAGE_SIZE:
+            return rows
+        if not deadline.has_budget(time.perf_counter() - started):
+            deadline.skip("history.older_pages")
+            return rows
+        start += HISTORY_PAGE_SIZE
+
+
+@traced()
+async def fetch_user_history_rows(user_id: str) -> List[Dict[str, Any]]:
+    """
+    Every workout row of a user in a single query (newest first). Only pages
+    further when a user has more rows than PostgREST returns per request.
+    """
+    rows = _fetch_all_pages(
+        lambda: supabase.table("workouts")
+        .select(HISTORY_COLUMNS)
+        .eq("user_id", user_id)
+        .order("created_at", desc=True)
+        .order("id")
+    )
+    note_history_size(len(rows))
+    logger.debug("Fetched %d workouts (all exercises) for user %s", len(rows), user_id)
+    return rows
+
+
+def fetch_history_rows_for_users(user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Full histories of many users in one paged query, grouped by user_id
+    (used by the offline precompute job).
+    """
+    rows = _fetch_all_pages(
+        lambda: supabase.table("workouts")
+        .select(HISTORY_COLUMNS + ",user_id")
+        .in_("user_id", user_ids)
+        .order("user_id")
+        .order("created_at", desc=True)
+        .order("id")
+    )
+    by_user: Dict[str, List[Dict[str, Any]]] = {uid: [] for uid in user_ids}
+    for r in rows:
+        by_user.setdefault(r["user_id"], []).append(r)
+    return by_user
+
+
+def history_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Columnar per-session frame over all exercises (and users, when rows of
+    several users are passed), oldest → newest: session_id, user_id, date,
+    exercise_key, exercise, total_volume, max_set_weight, avg_rpe (NaN when
+    not logged). Exercises are grouped by catalog key, so aliases / casing
+    variants of one exercise share a group.
+    """
+    store = SessionStore.from_rows(rows)
+    by_id = {str(r.get("id")): r for r in rows}
+    src = [by_id[i] for i in store.ids]
+    names = [r.get("exercise_name") or "" for r in src]
+    resolved = {n: (exercise_catalog.exercise_key(n), exercise_catalog.canonical_name(n)) for n in set(names)}
+    return pd.DataFrame({
+        "session_id": store.ids,
+        "user_id": [r.get("user_id") for r in src],
+        "date": pd.to_datetime(store.dates, utc=True),
+        "exercise_key": [resolved[n][0] for n in names],
+        "exercise": [resolved[n][1] for n in names],
+        "total_volume": np.round(store.total_volume, 2),
+        "max_set_weight": np.round(store.max_set_weight, 2),
+        "avg_rpe": np.round(store.avg_rpe, 2),
+    })
+
+
+def _grouped_slope(codes: np.ndarray, groups: int, x: np.ndarray, y: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Closed-form least-squares slope per group from bincount sums (0 when undefined)."""
+    sx = np.bincount(codes, x, groups)
+    sy = np.bincount(codes, y, groups)
+    sxx = np.bincount(codes, x * x, groups)
+    sxy = np.bincount(codes, x * y, groups)
+    den = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den != 0, (n * sxy - sx * sy) / np.where(den != 0, den, 1.0), 0.0)
+
+
+def grouped_trend_metrics(frame: pd.DataFrame, window: int = TREND_WINDOW,
+                          by: Union[str, List[str]] = "exercise_key") -> pd.DataFrame:
+    """
+    compute_trend_metrics for every group of a history frame in one
+    vectorized pass: the last `window` sessions of each group (per exercise
+    by default; ["user_id", "exercise_key"] for multi-user frames), slopes
+    from per-group sums instead of one polyfit per exercise.
+
+    Returns one row per group (columns: exercise, sessions, volume_slope,
+    weight_slope, rpe_trend, consistency, avg_rpe) with the same rounding
+    and < 2-session fallbacks as _trend_metrics_from_arrays.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    cols = ["exercise", "sessions", "volume_slope", "weight_slope", "rpe_trend", "consistency", "avg_rpe"]
+    if frame.empty:
+        return pd.DataFrame(columns=cols, index=pd.MultiIndex.from_tuples([], names=by) if len(by) > 1
+                            else pd.Index([], name=by[0]))
+
+    df = frame.sort_values(by + ["date"], kind="stable")
+    codes = df.groupby(by, sort=False, dropna=False).ngroup().to_numpy()
+    groups = int(codes[-1]) + 1
+    # Groups are contiguous after the sort: position within group from the start offsets
+    size = np.bincount(codes, minlength=groups)
+    start = np.concatenate(([0], np.cumsum(size)[:-1]))
+    pos = np.arange(len(df)) - start[codes]
+    keep = pos >= (size - window)[codes]
+    codes = codes[keep]
+    n = np.minimum(size, window).astype(float)
+    x = (pos[keep] - np.maximum(size - window, 0)[codes]).astype(float)
+
+    vol = df["total_volume"].to_numpy(dtype=float)[keep]
+    top = df["max_set_weight"].to_numpy(dtype=float)[keep]
+    rpe = df["avg_rpe"].to_numpy(dtype=float)[keep]
+    has_rpe = ~np.isnan(rpe)
+    rx = np.where(has_rpe, x, 0.0)
+    ry = np.where(has_rpe, rpe, 0.0)
+    rn = np.bincount(codes, has_rpe, groups)
+
+    volume_slope = _grouped_slope(codes, groups, x, vol, n)
+    weight_slope = _grouped_slope(codes, groups, x, top, n)
+    rpe_trend = np.where(rn >= 2, _grouped_slope(codes, groups, rx, ry, np.maximum(rn, 1.0)), 0.0)
+    mean_vol = np.bincount(codes, vol, groups) / n
+    std_vol = np.sqrt(np.bincount(codes, (vol - mean_vol[codes]) ** 2, groups) / n)
+    consistency = 1.0 / (std_vol + 1e-6)
+
+    # Mean of the last RECENT_RPE_SESSIONS logged RPEs per group
+    seen = np.cumsum(has_rpe)
+    seen_before = np.concatenate(([0], seen))[np.searchsorted(codes, np.arange(groups))]
+    recent = has_rpe & (rn[codes] - (seen - seen_before[codes]) < RECENT_RPE_SESSIONS)
+    recent_n = np.bincount(codes, recent, groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_rpe = np.where(recent_n > 0, np.bincount(codes, np.where(recent, rpe, 0.0), groups) / recent_n, np.nan)
+
+    short = n < 2
+    last_rows = df.iloc[np.cumsum(size) - 1]
+    index = (pd.MultiIndex.from_frame(last_rows[by]) if len(by) > 1
+             else pd.Index(last_rows[by[0]].to_numpy(), name=by[0]))
+    out = pd.DataFrame({
+        "exercise": last_rows["exercise"].to_numpy(),
+        "sessions": n.astype(int),
+        "volume_slope": np.where(short, 0.0, np.round(volume_slope, 3)),
+        "weight_slope": np.where(short, 0.0, np.round(weight_slope, 3)),
+        "rpe_trend": np.where(short, 0.0, np.round(rpe_trend, 3)),
+        "consistency": np.where(short, 0.0, np.round(consistency, 3)),
+        "avg_rpe": np.where(short, np.nan, np.round(avg_rpe, 2)),
+    }, index=index)
+    return out[cols]
+
+
 async def serialize_for_recommender(exercise_trend: ExerciseTrend) -> Dict[str, Any]:
     """
     Serialize the exercise trend for LLM consumption.
@@ -0,0 +1,310 @@
+# backend/app/ai/exercise_catalog.py
+"""
+Canonical exercise catalog.
+
+`workouts.exercise_name` is free text, so "Bicep Curl", "bicep curl" and
+"bicep_curl" used to be three different lifts. The catalog maps normalized
+names and aliases to a stable integer `exercise_id` (stored in
+`workouts.exercise_id`, migration 010) with precomputed body region,
+equipment and default load increment. It is built once at import and
+lookups are a dict hit.
+
+Only exact matches (normalized name or alias, in any word order) resolve to
+an id: that id is written to the database and groups history, trends and
+suggestions, so a near miss like "Hack Squat" ~ "Back Squat" must stay a
+separate free-text exercise. suggest() does the fuzzy "did you mean" match
+for read-time hints only; its result is never stored.
+
+IDs are persisted: never renumber or reuse them, only append.
+Names mirror frontend/src/constants/exercises.ts.
+"""
+import argparse
+import difflib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+FUZZY_CUTOFF = 0.88
+
+# body part (frontend grouping) -> region used by the advisor
+_REGION_BY_BODY_PART = {
+    "Chest": "upper", "Back": "upper", "Shoulders": "upper", "Arms": "upper",
+    "Legs": "lower", "Glutes": "lower", "Core": "core", "FullBody": "full",
+    "Cardio": "cardio", "Other": "other",
+}
+
+# (equipment, is_lower) -> default load increment in kg; None = no load to add
+_INCREMENT_KG = {
+    ("barbell", False): 2.5, ("barbell", True): 5.0,
+    ("machine", False): 2.5, ("machine", True): 5.0,
+    ("cable", False): 2.5, ("cable", True): 5.0,
+    ("dumbbell", False): 2.0, ("dumbbell", True): 2.0,
+    ("kettlebell", False): 4.0, ("kettlebell", True): 4.0,
+}
+
+# id, name, body part, equipment, aliases[, region override]
+_CATALOG: List[Tuple] = [
+    (1, "Barbell Bench Press", "Chest", "barbell", ("bench press", "bench", "flat bench", "bb bench")),
+    (2, "Dumbbell Bench Press", "Chest", "dumbbell", ("db bench", "db bench press")),
+    (3, "Incline Barbell Bench Press", "Chest", "barbell", ("incline bench", "incline bench press")),
+    (4, "Incline Dumbbell Bench Press", "Chest", "dumbbell", ("incline db press", "incline dumbbell press")),
+    (5, "Decline Bench Press", "Chest", "barbell", ()),
+    (6, "Push-Up", "Chest", "bodyweight", ("pushup", "press up")),
+    (7, "Weighted Push-Up", "Chest", "bodyweight", ()),
+    (8, "Chest Fly (Dumbbell)", "Chest", "dumbbell", ("dumbbell fly", "db fly")),
+    (9, "Chest Fly (Cable)", "Chest", "cable", ("cable fly",)),
+    (10, "Machine Chest Press", "Chest", "machine", ("chest press",)),
+    (11, "Cable Crossover", "Chest", "cable", ()),
+    (12, "Pull-Up", "Back", "bodyweight", ("pullup", "pull up")),
+    (13, "Chin-Up", "Back", "bodyweight", ("chinup", "chin up")),
+    (14, "Lat Pulldown", "Back", "cable", ("pulldown", "lat pull down")),
+    (15, "Seated Cable Row", "Back", "cable", ("cable row",)),
+    (16, "Bent-Over Barbell Row", "Back", "barbell", ("barbell row", "bent over row", "bb row")),
+    (17, "Bent-Over Dumbbell Row", "Back", "dumbbell", ("dumbbell row", "db row")),
+    (18, "Single-Arm Dumbbell Row", "Back", "dumbbell", ("one arm dumbbell row",)),
+    (19, "T-Bar Row", "Back", "barbell", ()),
+    (20, "Chest-Supported Row", "Back", "dumbbell", ()),
+    (21, "Inverted Row", "Back", "bodyweight", ()),
+    (22, "Face Pull", "Back", "cable", ()),
+    (23, "Overhead Barbell Press", "Shoulders", "barbell",
+     ("overhead press", "ohp", "military press", "shoulder press", "shoulder_press")),
+    (24, "Overhead Dumbbell Press", "Shoulders", "dumbbell", ("dumbbell shoulder press",)),
+    (25, "Seated Dumbbell Press", "Shoulders", "dumbbell", ()),
+    (26, "Arnold Press", "Shoulders", "dumbbell", ()),
+    (27, "Lateral Raise", "Shoulders", "dumbbell", ("side raise", "lateral raises")),
+    (28, "Front Raise", "Shoulders", "dumbbell", ()),
+    (29, "Rear Delt Fly", "Shoulders", "dumbbell", ("reverse fly",)),
+    (30, "Cable Lateral Raise", "Shoulders", "cable", ()),
+    (31, "Machine Shoulder Press", "Shoulders", "machine", ()),
+    (32, "Upright Row", "Shoulders", "barbell", ()),
+    (33, "Barbell Bicep Curl", "Arms", "barbell", ("bicep curl", "biceps curl", "barbell curl", "curl")),
+    (34, "Dumbbell Bicep Curl", "Arms", "dumbbell", ("dumbbell curl", "db curl")),
+    (35, "Hammer Curl", "Arms", "dumbbell", ()),
+    (36, "Preacher Curl", "Arms", "barbell", ()),
+    (37, "Cable Curl", "Arms", "cable", ()),
+    (38, "Concentration Curl", "Arms", "dumbbell", ()),
+    (39, "Tricep Pushdown", "Arms", "cable", ("triceps pushdown", "pushdown")),
+    (40, "Overhead Tricep Extension", "Arms", "dumbbell", ("overhead triceps extension",)),
+    (41, "Skullcrusher", "Arms", "barbell", ("skull crusher", "lying tricep extension")),
+    (42, "Close-Grip Bench Press", "Arms", "barbell", ("close grip bench", "cgbp")),
+    (43, "Dips", "Arms", "bodyweight", ("dip", "parallel bar dip")),
+    (44, "Bench Dips", "Arms", "bodyweight", ()),
+    (45, "Barbell Back Squat", "Legs", "barbell", ("squat", "back squat", "bb squat")),
+    (46, "Front Squat", "Legs", "barbell", ()),
+    (47, "Goblet Squat", "Legs", "dumbbell", ()),
+    (48, "Leg Press", "Legs", "machine", ()),
+    (49, "Walking Lunge", "Legs", "dumbbell", ("lunge", "lunges")),
+    (50, "Reverse Lunge", "Legs", "dumbbell", ()),
+    (51, "Bulgarian Split Squat", "Legs", "dumbbell", ("split squat", "bss")),
+    (52, "Romanian Deadlift", "Legs", "barbell", ("rdl", "romanian dl")),
+    (53, "Leg Extension", "Legs", "machine", ()),
+    (54, "Leg Curl", "Legs", "machine", ("hamstring curl",)),
+    (55, "Standing Calf Raise", "Legs", "machine", ("calf raise",)),
+    (56, "Seated Calf Raise", "Legs", "machine", ()),
+    (57, "Barbell Hip Thrust", "Glutes", "barbell", ("hip thrust",)),
+    (58, "Glute Bridge", "Glutes", "bodyweight", ()),
+    (59, "Cable Kickback", "Glutes", "cable", ("glute kickback",)),
+    (60, "Step-Up", "Glutes", "dumbbell", ("step up",)),
+    (61, "Sumo Deadlift", "Glutes", "barbell", ()),
+    (62, "Kettlebell Swing", "Glutes", "kettlebell", ("kb swing",)),
+    (63, "Curtsy Lunge", "Glutes", "bodyweight", ()),
+    (64, "Plank", "Core", "bodyweight", ()),
+    (65, "Side Plank", "Core", "bodyweight", ()),
+    (66, "Crunch", "Core", "bodyweight", ()),
+    (67, "Bicycle Crunch", "Core", "bodyweight", ()),
+    (68, "Hanging Leg Raise", "Core", "bodyweight", ()),
+    (69, "Knee Raise", "Core", "bodyweight", ()),
+    (70, "Russian Twist", "Core", "bodyweight", ()),
+    (71, "Cable Woodchop", "Core", "cable", ("woodchop",)),
+    (72, "Ab Wheel Rollout", "Core", "bodyweight", ("ab wheel",)),
+    (73, "Mountain Climber", "Core", "bodyweight", ()),
+    (74, "Dead Bug", "Core", "bodyweight", ()),
+    (75, "Deadlift", "FullBody", "barbell", ("conventional deadlift", "dl"), "lower"),
+    (76, "Sumo Deadlift High Pull", "FullBody", "barbell", ("sdhp",)),
+    (77, "Clean and Press", "FullBody", "barbell", ("clean & press",)),
+    (78, "Snatch", "FullBody", "barbell", ()),
+    (79, "Thruster", "FullBody", "barbell", ()),
+    (80, "Burpee", "FullBody", "bodyweight", ()),
+    (81, "Farmer's Walk", "FullBody", "dumbbell", ("farmer carry", "farmers carry")),
+    (82, "Kettlebell Clean", "FullBody", "kettlebell", ()),
+    (83, "Kettlebell Snatch", "FullBody", "kettlebell", ()),
+    (84, "Treadmill Run", "Cardio", "machine", ("treadmill",)),
+    (85, "Treadmill Walk", "Cardio", "machine", ()),
+    (86, "Stationary Bike", "Cardio", "machine", ("bike",)),
+    (87, "Spin Bike", "Cardio", "machine", ("spin",)),
+    (88, "Rowing Machine", "Cardio", "machine", ("rower", "erg")),
+    (89, "Elliptical", "Cardio", "machine", ()),
+    (90, "Stair Climber", "Cardio", "machine", ("stairmaster",)),
+    (91, "Jump Rope", "Cardio", "bodyweight", ("skipping",)),
+    (92, "Outdoor Run", "Cardio", "bodyweight", ("run", "running")),
+    (93, "Outdoor Walk", "Cardio", "bodyweight", ("walk", "walking")),
+    (94, "Swimming", "Cardio", "bodyweight", ("swim",)),
+    (95, "Band Pull-Apart", "Other", "band", ()),
+    (96, "Pallof Press", "Other", "cable", ()),
+    (97, "Sled Push", "Other", "sled", (), "lower"),
+    (98, "Sled Pull", "Other", "sled", (), "lower"),
+    (99, "Battle Ropes", "Other", "rope", ()),
+    (100, "Box Jump", "Other", "bodyweight", (), "lower"),
+    (101, "Medicine Ball Slam", "Other", "medicine_ball", ("ball slam",)),
+]
+
+
+@dataclass(frozen=True)
+class Exercise:
+    id: int
+    name: str
+    body_part: str
+    region: str
+    equipment: str
+    increment_kg: Optional[float]
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def is_lower_body(self) -> bool:
+        return self.region == "lower"
+
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Case/punctuation-insensitive key: "Bicep_Curls", "bicep-curl " and
+    "Bicep Curl" all become "bicep curl" (simple plural folding per token).
+    """
+    tokens = _NON_ALNUM.sub(" ", (name or "").lower().replace("'", "")).split()
+    return " ".join(t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t for t in tokens)
+
+
+def _build() -> Tuple[Dict[int, Exercise], Dict[str, int], Dict[str, int]]:
+    by_id: Dict[int, Exercise] = {}
+    by_key: Dict[str, int] = {}
+    by_sorted: Dict[str, int] = {}
+    for entry in _CATALOG:
+        ex_id, name, body_part, equipment, aliases = entry[:5]
+        region = entry[5] if len(entry) > 5 else _REGION_BY_BODY_PART[body_part]
+        by_id[ex_id] = Exercise(
+            id=ex_id, name=name, body_part=body_part, region=region, equipment=equipment,
+            increment_kg=_INCREMENT_KG.get((equipment, region == "lower")), aliases=tuple(aliases),
+        )
+        for key in (name, *aliases):
+            norm = normalize_name(key)
+            if by_key.setdefault(norm, ex_id) != ex_id:
+                raise ValueError(f"Duplicate exercise catalog key {norm!r}")
+            by_sorted.setdefault(" ".join(sorted(norm.split())), ex_id)
+    return by_id, by_key, by_sorted
+
+
+EXERCISES_BY_ID, _ID_BY_KEY, _ID_BY_SORTED_KEY = _build()
+_KEYS = list(_ID_BY_KEY)
+
+
+def _resolve(norm: str) -> Optional[int]:
+    ex_id = _ID_BY_KEY.get(norm)
+    if ex_id is not None or not norm:
+        return ex_id
+    # word order: "curl bicep" -> "bicep curl"
+    return _ID_BY_SORTED_KEY.get(" ".join(sorted(norm.split())))
+
+
+def lookup(name: Optional[str]) -> Optional[Exercise]:
+    """Catalog entry for a free-text exercise name (exact name or alias only)."""
+    ex_id = _resolve(normalize_name(name or ""))
+    return EXERCISES_BY_ID[ex_id] if ex_id is not None else None
+
+
+@lru_cache(maxsize=4096)
+def _closest(norm: str) -> Optional[int]:
+    match = difflib.get_close_matches(norm, _KEYS, n=1, cutoff=FUZZY_CUTOFF)
+    return _ID_BY_KEY[match[0]] if match else None
+
+
+def suggest(name: Optional[str]) -> Optional[Exercise]:
+    """
+    Closest catalog entry for a name lookup() doesn't know ("did you mean").
+    Read-time hints only: never store its id or group history by it.
+    """
+    ex = lookup(name)
+    if ex is not None:
+        return ex
+    norm = normalize_name(name or "")
+    ex_id = _closest(norm) if norm else None
+    return EXERCISES_BY_ID[ex_id] if ex_id is not None else None
+
+
+def exercise_id(name: Optional[str]) -> Optional[int]:
+    ex = lookup(name)
+    return ex.id if ex else None
+
+
+def canonical_name(name: Optional[str]) -> Optional[str]:
+    """Catalog name for known exercises; the trimmed input otherwise."""
+    ex = lookup(name)
+    if ex:
+        return ex.name
+    return name.strip() if name else name
+
+
+def exercise_key(name: Optional[str]) -> str:
+    """Grouping/cache key: the catalog id, or the normalized name for unknown exercises."""
+    ex = lookup(name)
+    return f"id:{ex.id}" if ex else f"name:{normalize_name(name or '')}"
+
+
+def spellings(ex: Exercise) -> List[str]:
+    """Raw spellings legacy rows (no exercise_id yet) are likely stored under."""
+    out = []
+    for base in (ex.name, *ex.aliases):
+        for variant in (base, base.lower(), base.title(), base.lower().replace(" ", "_")):
+            if variant not in out:
+                out.append(variant)
+    return out
+
+
+# ------------------------------------------------------------------------------
+# Backfill: python -m app.ai.exercise_catalog --backfill
+# ------------------------------------------------------------------------------
+
+def backfill_exercise_ids(page_size: int = 1000) -> int:
+    """
+    Set workouts.exercise_id on rows written before migration 010. Only
+    exact name/alias matches get an id; other rows stay NULL.
+    """
+    from app.services.supabase_client import supabase
+
+    updated = 0
+    last_id = ""
+    while True:
+        resp = (
+            supabase.table("workouts")
+            .select("id,exercise_name")
+            .is_("exercise_id", "null")
+            .gt("id", last_id or "00000000-0000-0000-0000-000000000000")
+            .order("id")
+            .limit(page_size)
+            .execute()
+        )
+        rows = resp.data or []
+        if not rows:
+            return updated
+        last_id = rows[-1]["id"]
+        by_id: Dict[int, List[str]] = {}
+        for r in rows:
+            ex_id = exercise_id(r.get("exercise_name"))
+            if ex_id is not None:
+                by_id.setdefault(ex_id, []).append(r["id"])
+        for ex_id, ids in by_id.items():
+            supabase.table("workouts").update({"exercise_id": ex_id}).in_("id", ids).execute()
+            updated += len(ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backfill", action="store_true", help="fill workouts.exercise_id for legacy rows")
+    parser.add_argument("--lookup", help="resolve a single exercise name")
+    args = parser.parse_args()
+    if args.lookup:
+        print(lookup(args.lookup) or f"not in the catalog; closest: {suggest(args.lookup)}")
+    if args.backfill:
+        print(f"Backfilled {backfill_exercise_ids()} workouts")
@@ -0,0 +1,180 @@
+# backend/app/ai/exercise_index.py
+"""
+Per-user exercise frequency / recency index.
+
+Built from one grouped query over the `user_exercise_frequency` view
+(migrations 009/010), keyed by catalog exercise id so spelling variants of
+one lift are merged, cached per user in-process and patched in place by the
+workout write hook. Both `/api/ai/exercises/{user_id}` and the next-workout
+candidate list read it without touching raw workouts.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from app.ai.data_prep import _parse_ts
+from app.ai.exercise_catalog import canonical_name, exercise_key, lookup
+from app.core.metrics import record_cache
+from app.core.tracing import traced
+from app.services.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+VIEW = "user_exercise_frequency"
+CACHE_TTL_SEC = 600
+CACHE_MAX_USERS = 10_000
+
+# Ranking weights: how often it is trained, whether it is still in the
+# user's rotation, and whether it is due given the usual gap between sessions.
+FREQUENCY_WEIGHT = 0.45
+RECENCY_WEIGHT = 0.35
+STALENESS_WEIGHT = 0.20
+RECENCY_HALF_LIFE_DAYS = 14.0
+
+
+class ExerciseUsage(BaseModel):
+    exercise_id: Optional[int] = None
+    exercise_name: str
+    session_count: int
+    first_performed_at: datetime
+    last_performed_at: datetime
+    score: Optional[float] = None
+
+
+_cache: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (expires_at, {exercise_key: ExerciseUsage})
+
+
+def _cache_get(user_id: str) -> Optional[Dict[str, ExerciseUsage]]:
+    hit = _cache.get(user_id)
+    if hit is None or hit[0] < time.monotonic():
+        return None
+    _cache.move_to_end(user_id)
+    return hit[1]
+
+
+def _cache_put(user_id: str, index: Dict[str, ExerciseUsage]) -> None:
+    _cache[user_id] = (time.monotonic() + CACHE_TTL_SEC, index)
+    _cache.move_to_end(user_id)
+    while len(_cache) > CACHE_MAX_USERS:
+        _cache.popitem(last=False)
+
+
+def invalidate(user_id: str) -> None:
+    _cache.pop(user_id, None)
+
+
+def _new_usage(name: str, count: int, first: datetime, last: datetime) -> ExerciseUsage:
+    ex = lookup(name)
+    return ExerciseUsage(
+        exercise_id=ex.id if ex else None,
+        exercise_name=ex.name if ex else canonical_name(name),
+        session_count=count,
+        first_performed_at=first,
+        last_performed_at=last,
+    )
+
+
+def _merge(index: Dict[str, ExerciseUsage], name: str, count: int, first: datetime, last: datetime) -> None:
+    key = exercise_key(name)
+    usage = index.get(key)
+    if usage is None:
+        index[key] = _new_usage(name, count, first, last)
+    else:
+        usage.session_count += count
+        usage.first_performed_at = min(usage.first_performed_at, first)
+        usage.last_performed_at = max(usage.last_performed_at, last)
+
+
+async def load_exercise_index(user_id: str) -> Dict[str, ExerciseUsage]:
+    """One grouped query: count / first / last session per exercise."""
+    resp = supabase.table(VIEW).select("*").eq("user_id", user_id).execute()
+    index: Dict[str, ExerciseUsage] = {}
+    for r in resp.data or []:
+        if r.get("exercise_name"):
+            _merge(index, r["exercise_name"], int(r["session_count"]),
+                   _parse_ts(r["first_performed_at"]), _parse_ts(r["last_performed_at"]))
+    return index
+
+
+async def get_exercise_index(user_id: str) -> Dict[str, ExerciseUsage]:
+    index = _cache_get(user_id)
+    if index is None:
+        record_cache("exercise_index", "miss")
+        index = await load_exercise_index(user_id)
+        _cache_put(user_id, index)
+    else:
+        record_cache("exercise_index", "hit")
+    return index
+
+
+def rank_exercises(usages: Sequence[ExerciseUsage], now: Optional[datetime] = None) -> List[ExerciseUsage]:
+    """
+    Order exercises by a blend of:
+      - frequency: log-scaled session count, relative to the user's most trained lift
+      - recency:   exponential decay of days since last session (still in rotation?)
+      - staleness: days since last session vs the exercise's usual interval (is it due?)
+    """
+    if not usages:
+        return []
+    now = now or datetime.now(timezone.utc)
+    max_log = max(math.log1p(u.session_count) for u in usages) or 1.0
+    ranked = []
+    for u in usages:
+        days_since = max((now - u.last_performed_at).total_seconds() / 86400.0, 0.0)
+        span_days = (u.last_performed_at - u.first_performed_at).total_seconds() / 86400.0
+        usual_gap = span_days / (u.session_count - 1) if u.session_count > 1 and span_days > 0 else 7.0
+        frequency = math.log1p(u.session_count) / max_log
+        recency = 0.5 ** (days_since / RECENCY_HALF_LIFE_DAYS)
+        staleness = min(days_since / usual_gap, 1.5) / 1.5
+        score = FREQUENCY_WEIGHT * frequency + RECENCY_WEIGHT * recency + STALENESS_WEIGHT * staleness
+        ranked.append(u.model_copy(update={"score": round(score, 4)}))
+    ranked.sort(key=lambda u: (-u.score, u.exercise_name))
+    return ranked
+
+
+@traced()
+async def get_top_exercises(user_id: str, limit: int = 5) -> List[str]:
+    index = await get_exercise_index(user_id)
+    return [u.exercise_name for u in rank_exercises(list(index.values()))[:limit]]
+
+
+def on_workouts_changed(user_id: str, before: Sequence[Dict[str, Any]], after: Sequence[Dict[str, Any]]) -> None:
+    """
+    Workout write hook: patch a cached index in place (nothing to do if the
+    user is not cached). Removing the first/last session of an exercise
+    cannot be patched exactly, so those drop the cache entry instead.
+    """
+    index = _cache_get(user_id)
+    if index is None:
+        return
+    # in-place edits that keep the exercise do not change counts or dates
+    def _ident(row):
+        return row.get("id"), exercise_key(row.get("exercise_name"))
+
+    unchanged = {_ident(r) for r in before} & {_ident(r) for r in after}
+    before = [r for r in before if _ident(r) not in unchanged]
+    after = [r for r in after if _ident(r) not in unchanged]
+    for row in before:
+        key = exercise_key(row.get("exercise_name"))
+        usage = index.get(key)
+        if usage is None:
+            continue
+        ts = _parse_ts(row["created_at"])
+        if usage.session_count <= 1:
+            index.pop(key)
+        elif ts in (usage.first_performed_at, usage.last_performed_at):
+            invalidate(user_id)
+            return
+        else:
+            usage.session_count -= 1
+    for row in after:
+        name = row.get("exercise_name")
+        if not name:
+            continue
+        ts = _parse_ts(row["created_at"])
+        _merge(index, name, 1, ts, ts)
@@ -1,24 +1,35 @@
 # backend/app/ai/fitness_advisor.py
 
-import os
 import json
 import logging
-import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional
-from app.ai.data_prep import serialize_for_recommender
+from app.ai import data_prep
+from app.ai.data_prep import grouped_trend_metrics, history_frame
+from app.ai import exercise_catalog, llm_client, prompts
+from app.ai.llm_client import LLM_LATENCY
 from app.schemas.ai import OverloadSuggestion
 from app.core.config import settings  # optional: handles default increment configs
+from app.core import deadline
+from app.core.analytics import PYTHON, run_analytics
+from app.core.tracing import traced
 
 # Setup logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 # --- CONFIG DEFAULTS ---
 DEFAULT_UPPER_INC_KG = 2.5
 DEFAULT_LOWER_INC_KG = 5.0
 DEFAULT_PERCENT_INC = 0.05  # 5%
 
+# Rationale texts (shared with the vectorized rule table in app/ai/rule_table.py)
+RATIONALE_INCREASE_WEIGHT = "Consistent performance with moderate RPE and non-declining volume — apply a small load increase."
+RATIONALE_INCREASE_REPS = "Stable effort and flat load trend — add 1 rep per set."
+RATIONALE_INCREASE_SETS = "Volume plateau with good consistency — add one extra set."
+RATIONALE_RECOVERY = "Recent trends indicate fatigue/under-recovery — suggest {status}."
+RATIONALE_VOLUME_DOWN = "Volume trending down — maintain load and focus on technique/sleep/nutrition."
+RATIONALE_MAINTAIN = "No clear overload signal — maintain and reassess next session."
+
 SYSTEM_PROMPT = """You are an expert strength and conditioning coach.
 Given structured training history, identify progressive overload opportunities, fatigue risks,
 and personalized next-session adjustments.
@@ -96,7 +107,7 @@ def should_increase_weight(trend_metrics: Dict[str, float]) -> bool:
     avg_rpe = _avg_rpe(trend_metrics) or 7.0
 
     decision = (slope_weight > 0.01) and (avg_rpe <= 7.0) and (slope_vol >= 0.0)
-    logger.debug(f"Weight increase check: weight_slope={slope_weight}, avg_rpe={avg_rpe}, volume_slope={slope_vol} => {decision}")
+    logger.debug("Weight increase check: weight_slope=%s, avg_rpe=%s, volume_slope=%s => %s", slope_weight, avg_rpe, slope_vol, decision)
     return decision
 
 
@@ -112,7 +123,7 @@ def should_increase_reps(trend_metrics: Dict[str, float]) -> bool:
     avg_rpe = _avg_rpe(trend_metrics) or 7.0
 
     decision = (abs(slope_weight) <= 0.005) and (avg_rpe <= 7.0) and (rpe_trend <= 0.0)
-    logger.debug(f"Reps increase check: weight_slope={slope_weight}, avg_rpe={avg_rpe}, rpe_trend={rpe_trend} => {decision}")
+    logger.debug("Reps increase check: weight_slope=%s, avg_rpe=%s, rpe_trend=%s => %s", slope_weight, avg_rpe, rpe_trend, decision)
     return decision
 
 
@@ -128,7 +139,7 @@ def should_increase_sets(trend_metrics: Dict[str, float]) -> bool:
     consistency = float(trend_metrics.get("consistency", 0.9))
 
     decision = (abs(slope_volume) < 0.005) and (avg_rpe <= 6.5) and (consistency >= 0.8)
-    logger.debug(f"Sets increase check: volume_slope={slope_volume}, avg_rpe={avg_rpe}, consistency={consistency} => {decision}")
+    logger.debug("Sets increase check: volume_slope=%s, avg_rpe=%s, consistency=%s => %s", slope_volume, avg_rpe, consistency, decision)
     return decision
 
 
@@ -141,7 +152,7 @@ def recovery_adjustment(trend_metrics: Dict[str, float]) -> str:
     rpe_trend = _tm(trend_metrics, "rpe_trend", 0.0)
     volume_slope = _tm(trend_metrics, "volume_slope", 0.0)
 
-    logger.debug(f"Recovery adjustment check: avg_rpe={avg_rpe}, rpe_trend={rpe_trend}, volume_slope={volume_slope}")
+    logger.debug("Recovery adjustment check: avg_rpe=%s, rpe_trend=%s, volume_slope=%s", avg_rpe, rpe_trend, volume_slope)
 
     # Strong decline in volume and no weight progress → likely need recovery/maintenance
     strong_decline = volume_slope < -0.5  # heuristic since units are raw slope per session index
@@ -161,12 +172,27 @@ def recovery_adjustment(trend_metrics: Dict[str, float]) -> str:
     return "maintain"
 
 
+_LOWER_MARKERS = ("squat", "deadlift", "leg", "lunge", "calf", "hip thrust", "glute", "hamstring", "quad")
+
+
 def _infer_is_lower_body(exercise_name: str) -> bool:
+    """Catalog region when the exercise is known; substring markers for free text."""
+    ex = exercise_catalog.lookup(exercise_name)
+    if ex is not None:
+        return ex.is_lower_body
     name = (exercise_name or "").lower()
-    lower_markers = ["squat", "deadlift", "leg", "lunge", "calf", "hip thrust", "glute", "hamstring", "quad","bicep curl"]
-    return any(m in name for m in lower_markers)
+    return any(m in name for m in _LOWER_MARKERS)
+
 
+def _base_increment(exercise_name: str, is_lower_body: bool) -> float:
+    """Catalog default increment (equipment-aware) or the upper/lower defaults."""
+    ex = exercise_catalog.lookup(exercise_name)
+    if ex is not None and ex.increment_kg is not None and ex.is_lower_body == is_lower_body:
+        return ex.increment_kg
+    return DEFAULT_LOWER_INC_KG if is_lower_body else DEFAULT_UPPER_INC_KG
 
+
+@traced()
 async def build_suggestion_payload(
     exercise_name: str,
     trend_metrics: Dict[str, float],
@@ -180,7 +206,7 @@ async def build_suggestion_payload(
     if is_lower_body is None:
         is_lower_body = _infer_is_lower_body(exercise_name)
 
-    base_inc = DEFAULT_LOWER_INC_KG if is_lower_body else DEFAULT_UPPER_INC_KG
+    base_inc = _base_increment(exercise_name, is_lower_body)
     percent_inc = DEFAULT_PERCENT_INC  # reserved for future use
 
     suggestion_type = "maintain"
@@ -190,28 +216,28 @@ async def build_suggestion_payload(
     if should_increase_weight(trend_metrics):
         suggestion_type = "increase_weight"
         value = round(base_inc, 2)
-        rationale = "Consistent performance with moderate RPE and non-declining volume — apply a small load increase."
+        rationale = RATIONALE_INCREASE_WEIGHT
     elif should_increase_reps(trend_metrics):
         suggestion_type = "increase_reps"
         value = 1
-        rationale = "Stable effort and flat load trend — add 1 rep per set."
+        rationale = RATIONALE_INCREASE_REPS
     elif should_increase_sets(trend_metrics):
         suggestion_type = "increase_sets"
         value = 1
-        rationale = "Volume plateau with good consistency — add one extra set."
+        rationale = RATIONALE_INCREASE_SETS
     else:
         fatigue_status = recovery_adjustment(trend_metrics)
         if fatigue_status != "maintain":
             suggestion_type = "recovery"
             value = None
-            rationale = f"Recent trends indicate fatigue/under-recovery — suggest {fatigue_status.replace('-', ' ')}."
+            rationale = RATIONALE_RECOVERY.format(status=fatigue_status.replace('-', ' '))
         else:
             # If volume is clearly declining, prefer maintain with caution
             vol_slope = _tm(trend_metrics, "volume_slope", 0.0)
             if vol_slope < -0.1:
-                rationale = "Volume trending down — maintain load and focus on technique/sleep/nutrition."
+                rationale = RATIONALE_VOLUME_DOWN
             else:
-                rationale = "No clear overload signal — maintain and reassess next session."
+                rationale = RATIONALE_MAINTAIN
 
     confidence = 0.9 if suggestion_type.startswith("increase") else (0.8 if suggestion_type == "recovery" else 0.7)
 
@@ -222,7 +248,7 @@ async def build_suggestion_payload(
         confidence_score=confidence,
         rationale=rationale,
     )
-    logger.info(f"Suggestion for {exercise_name}: {suggestion_type} ({value}), conf={confidence}")
+    logger.debug("Suggestion for %s: %s (%s), conf=%s", exercise_name, suggestion_type, value, confidence)
     return suggestion.model_dump()
 
 
@@ -241,42 +267,84 @@ def summarize_recent_data(df: pd.DataFrame) -> str:
     return "; ".join(summary_parts)
 
 
-async def generate_ai_recommendations() -> Dict[str, Any]:
+def trend_suggestions(trends: pd.DataFrame) -> list:
+    """Rule-table suggestions for every row of a grouped_trend_metrics() frame."""
+    from app.ai import rule_table  # rule_table imports this module
+
+    if trends.empty:
+        return []
+    names = trends["exercise"].to_numpy(dtype=object)
+    columns = {
+        k: trends[k].to_numpy(dtype=float)
+        for k in ("volume_slope", "weight_slope", "rpe_trend", "consistency", "avg_rpe")
+    }
+    result = rule_table.evaluate(columns, rule_table.increments_for(names))
+    return rule_table.to_payloads(names, result)
+
+
+async def _history_rows(user_id: str) -> list:
+    try:
+        return await data_prep.fetch_user_history_rows(user_id)
+    except deadline.DeadlineExceeded:
+        raise
+    except Exception as e:
+        logger.exception(f"Failed to fetch workouts: {e}")
+        return []
+
+
+def _llm_context(rows: list) -> Optional[Dict[str, Any]]:
+    """CPU part of generate_ai_recommendations (runs off the event loop for big histories)."""
+    df = history_frame(rows)
+    if df.empty:
+        return None
+    trends = grouped_trend_metrics(df)
+    latest_df = df.groupby("exercise_key", sort=False).tail(1).set_index("exercise_key")
+    latest_df = latest_df.join(trends.drop(columns=["exercise"]))
+    return {
+        "text_summary": summarize_recent_data(df),
+        "stats_json": latest_df.drop(columns=["session_id", "user_id"]).to_dict(orient="records"),
+    }
+
+
+@traced()
+async def generate_ai_recommendations(user_id: str) -> Dict[str, Any]:
     """
     Unified AI workflow:
-    - Load and preprocess data
+    - Load the user's history once (all exercises)
     - Summarize into LLM-readable context
     - Query LLM for intelligent recommendations
     """
-    from openai import AsyncOpenAI
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-    df = serialize_for_recommender()
-    if df.empty:
+    rows = await _history_rows(user_id)
+    if not deadline.has_budget(LLM_LATENCY.value):
+        deadline.skip("llm")
+        return await _rule_based(rows)
+    context = await run_analytics(_llm_context, rows, size=len(rows), kind=PYTHON)
+    if context is None:
         return {"error": "No workout data found."}
 
-    text_summary = summarize_recent_data(df)
-    latest_df = df.sort_values("date").groupby("exercise").tail(1)
-    stats_json = latest_df.to_dict(orient="records")
-
+    # latest row per exercise, compacted; exercises past the token budget are left out
+    stats_json, kept = prompts.fit_records(context["stats_json"], settings.LLM_ADVISOR_PROMPT_TOKEN_BUDGET)
+    if kept < len(context["stats_json"]):
+        logger.debug("AI recommendations for %s: %d of %d exercises fit the prompt budget",
+                     user_id, kept, len(context["stats_json"]))
     user_prompt = f"""
 User workout summary for analysis:
-{text_summary}
+{context["text_summary"]}
 
 Detailed recent data (JSON):
-{json.dumps(stats_json, indent=2)}
+{stats_json}
 
 Generate recommendations in JSON format as per schema.
 """
 
-    response = await client.chat.completions.create(
+    response = await llm_client.chat_completion(
         model="gpt-4-turbo",
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
         temperature=0.4,
-        max_tokens=800
+        max_tokens=800,
     )
 
     raw_output = response.choices[0].message.content
@@ -292,31 +360,34 @@ Generate recommendations in JSON format as per schema.
 # ============== HYBRID ENTRYPOINT (RULE + LLM) ===========
 # =========================================================
 
+def _hybrid_suggestions(rows: list) -> list:
+    """CPU part of hybrid_recommendation_pipeline: frame -> grouped trends -> rule table."""
+    df = history_frame(rows)
+    if df.empty:
+        return []
+    trends = grouped_trend_metrics(df)
+    results = trend_suggestions(trends)
+    metrics = trends.drop(columns=["exercise"]).astype(object).where(trends.notna(), None)
+    for payload, row in zip(results, metrics.to_dict(orient="records")):
+        payload["trend_metrics"] = row
+    return results
+
+
+@traced()
 async def hybrid_recommendation_pipeline(user_id: str) -> Dict[str, Any]:
     """
-    Step 1: Generate deterministic rule-based suggestions.
-    Step 2: Optionally enhance with LLM reasoning.
+    Deterministic rule-based suggestions for every exercise of a user:
+    one history read, one grouped trend pass (same metrics as
+    compute_trend_metrics over the last 12 sessions per exercise), one
+    vectorized rule-table evaluation.
     """
-    df = serialize_for_recommender()
-    if df.empty:
-        return {"error": "No workout data available."}
+    return await _rule_based(await _history_rows(user_id))
+
 
-    # Compute simple trend metrics (kept for compatibility with legacy path)
-    results = []
-    for ex, sub in df.groupby("exercise"):
-        sub = sub.sort_values("date")
-        slope_vol = np.polyfit(range(len(sub)), sub["total_volume"], 1)[0] / (sub["total_volume"].mean() + 1e-6)
-        slope_weight = np.polyfit(range(len(sub)), sub["weight"], 1)[0] / (sub["weight"].mean() + 1e-6)
-        avg_rpe = sub.get("avg_rpe", pd.Series([7]*len(sub))).tail(4).mean() if "avg_rpe" in sub else 7.0
-        trend_metrics = {
-            "volume_slope": slope_vol,
-            "weight_slope": slope_weight,
-            "avg_rpe": float(avg_rpe),
-            "rpe_trend": 0.0,
-            "consistency": 0.9,
-        }
-        suggestion = await build_suggestion_payload(ex, trend_metrics)
-        results.append(suggestion.dict())
+async def _rule_based(rows: list) -> Dict[str, Any]:
+    results = await run_analytics(_hybrid_suggestions, rows, size=len(rows), kind=PYTHON)
+    if not results:
+        return {"error": "No workout data available."}
 
     return {"recommendations": results, "summary": "Rule-based overload analysis complete."}
 
@@ -326,4 +397,4 @@ if __name__ == "__main__":
     # Example: the direct call you mentioned
     example_tm = {"volume_slope": -45.0, "weight_slope": 0.0, "rpe_trend": 0.0, "consistency": 0.024}
     sug = asyncio.run(build_suggestion_payload("Bicep Curl", example_tm))
-    print(json.dumps(sug.dict(), indent=2))
+    print(json.dumps(sug, indent=2))
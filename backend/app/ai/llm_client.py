@@ -0,0 +1,217 @@
+# backend/app/ai/llm_client.py
+"""
+The one OpenAI client for the app, plus hedged chat completions.
+
+All LLM calls (recommender, fitness_advisor) go through chat_completion(),
+so they share one keep-alive connection pool instead of opening a client
+(and TLS handshake) per call. The pool has explicit limits and
+connect/read timeouts from LLM_* settings, and uses HTTP/2 when
+LLM_HTTP2 is set and `h2` is installed. The SDK's own retries are
+disabled: callers retry themselves, within the request deadline
+(app/core/deadline.py).
+
+Hedging: the recent latencies of each model are kept. When a call is
+still running after their LLM_HEDGE_QUANTILE (p95), one duplicate is
+started, and whichever returns a valid response first wins. Only the
+slowest ~5% of calls get a duplicate, and only once LLM_HEDGE_MIN_SAMPLES
+latencies are known. A winning hedge leaves the primary running until it
+finishes, so openai_hedge_gain_seconds records the real latency saved.
+Hedge rate = openai_hedged_calls_total / openai_calls_total.
+
+Each attempt holds a slot of the priority dispatcher
+(app/ai/llm_dispatcher.py) while it runs. A hedge is only fired when a
+slot is free and no other call is waiting for one.
+
+Clients are bound to the event loop that created them (one per worker,
+one per test loop); the lifespan closes the worker's client.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI
+from openai._exceptions import APIStatusError
+
+from app.ai import llm_dispatcher, prompts
+from app.core import deadline
+from app.core.config import settings
+from app.core.metrics import OPENAI_DURATION, Counter, Histogram, record_openai_usage
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 200
+
+# Expected chat-completion latency; LLM stages are skipped when the request budget is smaller
+LLM_LATENCY = deadline.LatencyEstimate(settings.LLM_EXPECTED_LATENCY_SEC)
+
+CALLS = Counter("openai_calls_total", "Logical OpenAI calls (a hedged call counts once).", ("model",))
+HEDGED = Counter("openai_hedged_calls_total", "Calls that fired a hedge, by the attempt that answered first "
+                 "(primary / hedge / none).", ("model", "winner"))
+HEDGE_GAIN = Histogram("openai_hedge_gain_seconds", "Latency saved when the hedge answered first.", ("model",))
+
+_clients: "weakref.WeakKeyDictionary[Any, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_latencies: Dict[str, Deque[float]] = {}
+
+
+def _http2() -> bool:
+    if not settings.LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx's HTTP/2 support)
+    except ImportError:
+        logger.warning("LLM_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+        return False
+    return True
+
+
+def _timeout(read: float) -> httpx.Timeout:
+    return httpx.Timeout(read, connect=min(settings.LLM_CONNECT_TIMEOUT_SEC, read))
+
+
+def get_client() -> AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        http = httpx.AsyncClient(
+            http2=_http2(),
+            timeout=_timeout(settings.LLM_READ_TIMEOUT_SEC),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SEC,
+            ),
+        )
+        client = _clients[loop] = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=http,
+            timeout=_timeout(settings.LLM_READ_TIMEOUT_SEC),
+            max_retries=0,
+        )
+    return client
+
+
+async def aclose() -> None:
+    """Close this loop's client (lifespan shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def llm_timeout() -> Dict[str, Any]:
+    """Per-call `timeout=` that ends at the request deadline (client timeouts otherwise)."""
+    left = deadline.remaining()
+    if left is None or left >= settings.LLM_READ_TIMEOUT_SEC:
+        return {}
+    return {"timeout": _timeout(max(left, 0.01))}
+
+
+def _observe_latency(model: str, seconds: float) -> None:
+    LLM_LATENCY.observe(seconds)
+    window = _latencies.get(model)
+    if window is None:
+        window = _latencies[model] = deque(maxlen=LATENCY_WINDOW)
+    window.append(seconds)
+
+
+def hedge_delay(model: str) -> Optional[float]:
+    """Observed LLM_HEDGE_QUANTILE latency of `model`; None = don't hedge (disabled / too few samples)."""
+    window = _latencies.get(model)
+    if not settings.LLM_HEDGE or window is None or len(window) < settings.LLM_HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(window)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * settings.LLM_HEDGE_QUANTILE))]
+
+
+async def _attempt(kwargs: Dict[str, Any], validate: Optional[Callable[[Any], Any]], hedge: bool) -> Any:
+    """
+    One chat.completions.create with latency (by outcome) and token accounting.
+    Waits for a dispatcher slot first; a hedge arrives with its slot already taken.
+    """
+    model = kwargs.get("model", "")
+    slots, cls = llm_dispatcher.dispatcher(), llm_dispatcher.current_class()
+    if not hedge:
+        try:
+            await slots.acquire(cls, timeout=deadline.remaining())
+        except llm_dispatcher.QueueTimeout:
+            deadline.skip(f"llm_queue:{cls}")
+            raise
+    started = time.perf_counter()
+    outcome = "error"
+    with span("openai.chat.completions", model=model, hedge=hedge, priority=cls) as s:
+        try:
+            if s.recording:
+                s.set_attribute("llm.prompt_tokens_estimate",
+                                prompts.estimate_message_tokens(kwargs.get("messages", ())))
+            resp = await get_client().chat.completions.create(**kwargs, **llm_timeout())
+            outcome = "ok"
+            _observe_latency(model, time.perf_counter() - started)
+            record_openai_usage(model, resp)
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                s.set_attribute("llm.prompt_tokens", usage.prompt_tokens)
+                s.set_attribute("llm.completion_tokens", usage.completion_tokens)
+        except APIStatusError as e:
+            outcome = str(e.status_code)
+            raise
+        finally:
+            slots.release(cls)
+            OPENAI_DURATION.observe(time.perf_counter() - started, model, outcome)
+    return validate(resp) if validate is not None else resp
+
+
+def _record_gain(model: str, answered_at: float):
+    def done(task: "asyncio.Task") -> None:
+        if not task.cancelled() and task.exception() is None:
+            HEDGE_GAIN.observe(time.perf_counter() - answered_at, model)
+    return done
+
+
+async def chat_completion(*, validate: Optional[Callable[[Any], Any]] = None, hedge: bool = True,
+                          **kwargs: Any) -> Any:
+    """
+    chat.completions.create(**kwargs) on the shared client, hedged past the
+    observed p95. `validate(resp)` turns a response into the caller's result
+    and raises when it is unusable, so a malformed answer doesn't win a race.
+    """
+    model = kwargs.get("model", "")
+    CALLS.inc(model)
+    delay = hedge_delay(model) if hedge else None
+    if delay is None:
+        return await _attempt(kwargs, validate, hedge=False)
+
+    primary = asyncio.ensure_future(_attempt(kwargs, validate, hedge=False))
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done or not deadline.has_budget(LLM_LATENCY.value):
+            return await primary
+        if not llm_dispatcher.dispatcher().try_acquire(llm_dispatcher.current_class()):
+            return await primary  # hedges only use spare capacity
+
+        backup = asyncio.ensure_future(_attempt(kwargs, validate, hedge=True))
+        pending.add(backup)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = error or task.exception()
+                    continue
+                if task is backup:
+                    HEDGED.inc(model, "hedge")
+                    if primary in pending:  # let it finish, only to measure the gain
+                        primary.add_done_callback(_record_gain(model, time.perf_counter()))
+                        pending.discard(primary)
+                else:
+                    HEDGED.inc(model, "primary")
+                return task.result()
+        HEDGED.inc(model, "none")
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,201 @@
+# backend/app/ai/llm_dispatcher.py
+"""
+Priority dispatch of OpenAI calls.
+
+Every chat completion (app/ai/llm_client.py) takes a slot here before it
+goes out. A slot belongs to one of three classes:
+
+    interactive  a user is waiting on this answer (/ai/analyze-exercise)
+    prefetch     bulk enrichment behind a page load (/ai/next-workout)
+    batch        jobs and other background enrichment
+
+Up to LLM_MAX_CONCURRENCY calls run at once. On top of that each class
+has its own cap (LLM_CONCURRENCY_<CLASS>), so background work can never
+hold the slots interactive calls need. When calls queue, the next free
+slot goes by weighted fair queuing (start-time fair queuing over WEIGHTS):
+interactive gets 8 slots for every 3 prefetch and 1 batch while all
+three are backlogged. An idle class gets no credit for the time it sat
+out. Starvation protection: a call that has waited LLM_STARVATION_SEC
+is served next, whatever its weight. Hedges only use spare capacity
+(try_acquire) and never queue.
+
+The class comes from a context var. It defaults to interactive and is
+set per route (dependencies=[llm_priority(PREFETCH)]) or per block:
+
+    with priority(BATCH):
+        await llm_enhance_suggestion(...)
+
+Queue waits are in llm_queue_wait_seconds{class}, and
+llm_dispatcher_slots{class, state} reports in_flight / queued / limit.
+"""
+import asyncio
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from fastapi import Depends
+
+from app.core.config import settings
+from app.core.metrics import Gauge, Histogram, LabelValues
+
+INTERACTIVE, PREFETCH, BATCH = "interactive", "prefetch", "batch"
+CLASSES = (INTERACTIVE, PREFETCH, BATCH)
+WEIGHTS = {INTERACTIVE: 8.0, PREFETCH: 3.0, BATCH: 1.0}
+
+QUEUE_WAIT = Histogram("llm_queue_wait_seconds", "Time an OpenAI call waited for a dispatcher slot.", ("class",),
+                       buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+class QueueTimeout(Exception):
+    """No slot freed up before the request deadline."""
+
+
+def current_class() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def priority(cls: str) -> Iterator[None]:
+    if cls not in CLASSES:
+        raise ValueError(f"Unknown LLM priority class {cls!r}")
+    token = _priority.set(cls)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def llm_priority(cls: str):
+    """Route dependency: LLM calls made by this route run in `cls`."""
+    if cls not in CLASSES:
+        raise ValueError(f"Unknown LLM priority class {cls!r}")
+
+    async def dependency() -> None:   # async: runs in the request's own context
+        _priority.set(cls)
+    return Depends(dependency)
+
+
+class PriorityDispatcher:
+    def __init__(self, capacity: int, limits: Dict[str, int], weights: Dict[str, float] = WEIGHTS,
+                 starvation_sec: float = 10.0):
+        self.capacity = capacity
+        self.limits = limits
+        self.weights = weights
+        self.starvation_sec = starvation_sec
+        self.in_flight = {c: 0 for c in CLASSES}
+        self.total = 0
+        self.queues: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {c: deque() for c in CLASSES}
+        self._finish = {c: 0.0 for c in CLASSES}   # virtual finish tag of each class's last grant
+        self._clock = 0.0                           # virtual time = start tag of the last grant
+
+    def queued(self, cls: str) -> int:
+        return sum(1 for _, f in self.queues[cls] if not f.done())
+
+    def _grant(self, cls: str) -> None:
+        start = max(self._finish[cls], self._clock)
+        self._finish[cls] = start + 1.0 / self.weights[cls]
+        self._clock = start
+        self.in_flight[cls] += 1
+        self.total += 1
+
+    def _eligible(self) -> list:
+        out = []
+        for c in CLASSES:
+            q = self.queues[c]
+            while q and q[0][1].done():   # cancelled / timed-out waiters
+                q.popleft()
+            if q and self.in_flight[c] < self.limits[c]:
+                out.append(c)
+        return out
+
+    def _pick(self) -> Optional[str]:
+        eligible = self._eligible()
+        if not eligible:
+            return None
+        now = time.monotonic()
+        starving = [c for c in eligible if now - self.queues[c][0][0] >= self.starvation_sec]
+        if starving:
+            return min(starving, key=lambda c: self.queues[c][0][0])
+        # smallest start tag first; ties go to the heavier class
+        return min(eligible, key=lambda c: (max(self._finish[c], self._clock), -self.weights[c]))
+
+    def _dispatch(self) -> None:
+        while self.total < self.capacity:
+            cls = self._pick()
+            if cls is None:
+                return
+            _, fut = self.queues[cls].popleft()
+            self._grant(cls)
+            fut.set_result(None)
+
+    async def acquire(self, cls: str, timeout: Optional[float] = None) -> None:
+        enqueued = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        entry = (enqueued, fut)
+        self.queues[cls].append(entry)
+        self._dispatch()
+        try:
+            if not fut.done():
+                await asyncio.wait_for(fut, timeout) if timeout is not None else await fut
+        except asyncio.TimeoutError:
+            raise QueueTimeout(f"No {cls} LLM slot within {timeout:.2f}s") from None
+        except BaseException:
+            if fut.done() and not fut.cancelled():   # granted just as we were cancelled
+                self.release(cls)
+            raise
+        finally:
+            if not fut.done():
+                fut.cancel()
+        QUEUE_WAIT.observe(time.monotonic() - enqueued, cls)
+
+    def try_acquire(self, cls: str) -> bool:
+        """A slot only if one is free and nobody eligible is waiting (hedges)."""
+        if self._eligible() or self.total >= self.capacity or self.in_flight[cls] >= self.limits[cls]:
+            return False
+        self._grant(cls)
+        return True
+
+    def release(self, cls: str) -> None:
+        self.in_flight[cls] -= 1
+        self.total -= 1
+        self._dispatch()
+
+
+# Futures are bound to the event loop that created them (one per worker, one per test loop).
+_dispatchers: "weakref.WeakKeyDictionary[Any, PriorityDispatcher]" = weakref.WeakKeyDictionary()
+_current: Optional[PriorityDispatcher] = None
+
+
+def dispatcher() -> PriorityDispatcher:
+    global _current
+    loop = asyncio.get_running_loop()
+    d = _dispatchers.get(loop)
+    if d is None:
+        d = _dispatchers[loop] = PriorityDispatcher(
+            settings.LLM_MAX_CONCURRENCY,
+            {c: int(getattr(settings, f"LLM_CONCURRENCY_{c.upper()}")) for c in CLASSES},
+            starvation_sec=settings.LLM_STARVATION_SEC,
+        )
+        _current = d
+    return d
+
+
+def _slot_stats() -> Dict[LabelValues, float]:
+    d = _current
+    out: Dict[LabelValues, float] = {}
+    if d is None:
+        return out
+    for c in CLASSES:
+        out[(c, "in_flight")] = d.in_flight[c]
+        out[(c, "queued")] = d.queued(c)
+        out[(c, "limit")] = d.limits[c]
+    return out
+
+
+SLOTS = Gauge("llm_dispatcher_slots", "OpenAI call slots by class and state (in_flight / queued / limit).",
+              ("class", "state"), fn=_slot_stats)
@@ -0,0 +1,123 @@
+# backend/app/ai/prompts.py
+"""
+Compact LLM prompt payloads and local token estimates.
+
+Prompt size drives LLM latency and cost. Pretty-printed JSON
+(`indent=2`) spends a large share of the tokens on whitespace and on
+digits nobody reads (`"volume_slope": -45.123456789`), and the full
+profile row adds ids, emails and timestamps the coach has no use for.
+Payloads therefore go through compact_json():
+
+  - canonical JSON: sorted keys, no whitespace
+  - floats rounded to FLOAT_DIGITS
+  - None / empty values dropped
+
+Only PROFILE_FIELDS are taken from the profile.
+
+estimate_tokens() counts tokens with tiktoken when it is installed.
+Otherwise it uses a BPE-like heuristic: a word piece is about 4
+characters, each punctuation mark is one token, and so is each line
+break with its indentation. fit_sections() keeps
+a prompt under its budget by dropping the optional sections first.
+Actual prompt/completion tokens per call come from the API usage
+(app/core/metrics.py: openai_call_tokens).
+"""
+import json
+import math
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional: heuristic fallback
+    tiktoken = None
+
+FLOAT_DIGITS = 2
+# What the coach needs from the profile; never ids, emails or timestamps
+PROFILE_FIELDS = ("age", "gender", "height", "weight", "training_experience")
+
+# word pieces, punctuation, and line breaks / indentation runs (single spaces merge into the next word)
+_PIECES = re.compile(r"\w+|[^\w\s]|\n\s*| {2,}")
+_encoding = None
+
+
+def compact(obj: Any, ndigits: int = FLOAT_DIGITS) -> Any:
+    """Round floats and drop None / empty values, recursively."""
+    if type(obj).__module__ == "numpy":  # numpy scalars from DataFrame.to_dict
+        obj = obj.item()
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            v = compact(v, ndigits)
+            if v is not None and v != "" and v != [] and v != {}:
+                out[str(k)] = v
+        return out
+    if isinstance(obj, (list, tuple)):
+        return [compact(v, ndigits) for v in obj]
+    if isinstance(obj, bool):
+        return obj
+    if isinstance(obj, (float, Decimal)):
+        f = float(obj)
+        if math.isnan(f) or math.isinf(f):
+            return None
+        r = round(f, ndigits)
+        return int(r) if r.is_integer() else r
+    return obj
+
+
+def compact_json(obj: Any, ndigits: int = FLOAT_DIGITS) -> str:
+    return json.dumps(compact(obj, ndigits), sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+                      default=str)
+
+
+def profile_context(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {k: profile[k] for k in PROFILE_FIELDS if profile and profile.get(k) not in (None, "")}
+
+
+def estimate_tokens(text: str) -> int:
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return sum(max(1, math.ceil(len(p) / 4)) if p[0].isalnum() or p[0] == "_" else 1
+               for p in _PIECES.findall(text))
+
+
+def estimate_message_tokens(messages: Sequence[Dict[str, str]]) -> int:
+    """Chat format adds ~4 tokens per message plus 3 for the reply primer."""
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages) + 3
+
+
+def fit_sections(sections: List[Tuple[str, str, bool]], render, budget: int) -> Tuple[Optional[str], List[str]]:
+    """
+    `sections` are (name, text, optional) in the order optional ones may be
+    dropped; `render(texts_by_name)` builds the prompt. Returns the prompt
+    (None if even the required sections exceed `budget`) and the dropped names.
+    """
+    texts = {name: text for name, text, _ in sections}
+    dropped: List[str] = []
+    prompt = render(texts)
+    for name, _, optional in sections:
+        if estimate_tokens(prompt) <= budget:
+            return prompt, dropped
+        if optional:
+            texts[name] = "{}"
+            dropped.append(name)
+            prompt = render(texts)
+    return (prompt if estimate_tokens(prompt) <= budget else None), dropped
+
+
+def fit_records(records: List[Any], budget: int) -> Tuple[str, int]:
+    """Compact JSON of the longest prefix of `records` within `budget` tokens, and how many fit."""
+    parts: List[str] = []
+    used = 2
+    for rec in records:
+        text = compact_json(rec)
+        cost = estimate_tokens(text) + 1
+        if used + cost > budget:
+            break
+        parts.append(text)
+        used += cost
+    return "[" + ",".join(parts) + "]", len(parts)
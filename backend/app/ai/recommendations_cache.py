@@ -0,0 +1,118 @@
+# backend/app/ai/recommendations_cache.py
+"""
+Precomputed next-workout suggestions (`recommendations_cache`, migration 011).
+
+Rows are written by the offline job (python -m app.jobs.precompute_recommendations)
+and served by `/api/ai/next-workout` when RECOMMENDATIONS_CACHE is enabled and
+the row is still current. Cached suggestions are the rule-based ones (no LLM
+enrichment), ordered like get_top_exercises.
+
+Freshness: a trigger on `workouts` bumps user_data_versions.workouts_version
+on every insert, edit and delete. The job stores the version it read before
+fetching the history as `data_version`, and a row is only served while the
+two are equal. Writes made while the job is running, or handled by another
+worker, are therefore never hidden behind an older snapshot.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from app.ai.data_prep import grouped_trend_metrics, history_frame
+from app.ai.exercise_index import ExerciseUsage, rank_exercises
+from app.ai.fitness_advisor import trend_suggestions
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.services.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+TABLE = "recommendations_cache"
+VERSIONS = "user_data_versions"
+
+
+def score_histories(histories: Dict[str, List[Dict[str, Any]]],
+                    now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Pure CPU step of the job: raw workout rows of many users -> cache rows.
+    One history frame, one grouped trend pass and one rule-table evaluation
+    for the whole batch; per user, suggestions for every exercise ranked by
+    frequency/recency/staleness. Users without usable sessions are skipped.
+    """
+    now = now or datetime.now(timezone.utc)
+    rows = [dict(r, user_id=user_id) for user_id, user_rows in histories.items() for r in user_rows]
+    frame = history_frame(rows)
+    if frame.empty:
+        return []
+    by = ["user_id", "exercise_key"]
+    trends = grouped_trend_metrics(frame, by=by)
+    payloads = trend_suggestions(trends)
+    usage = frame.groupby(by, sort=False)["date"].agg(["size", "min", "max"]).reindex(trends.index)
+
+    per_user: Dict[str, List[tuple]] = {}
+    for (user_id, _key), payload, (n, first, last) in zip(trends.index, payloads, usage.itertuples(index=False)):
+        usage_row = ExerciseUsage(exercise_name=payload["exercise"], session_count=int(n),
+                                  first_performed_at=first.to_pydatetime(), last_performed_at=last.to_pydatetime())
+        per_user.setdefault(user_id, []).append((usage_row, payload))
+
+    out = []
+    for user_id, entries in per_user.items():
+        by_name = {u.exercise_name: p for u, p in entries}
+        ranked = rank_exercises([u for u, _ in entries], now=now)
+        out.append({
+            "user_id": user_id,
+            "suggestions": [
+                {
+                    "user_id": user_id,
+                    "exercise_name": u.exercise_name,
+                    "base_suggestion": by_name[u.exercise_name],
+                    "enriched_suggestion": by_name[u.exercise_name],
+                }
+                for u in ranked
+            ],
+            "last_workout_at": max(u.last_performed_at for u, _ in entries).isoformat(),
+            "computed_at": now.isoformat(),
+        })
+    return out
+
+
+def score_user_history(user_id: str, rows: List[Dict[str, Any]],
+                       now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    scored = score_histories({user_id: rows}, now=now)
+    return scored[0] if scored else None
+
+
+def fetch_data_versions(user_ids: Iterable[str]) -> Dict[str, int]:
+    """Current workouts_version per user (0 = never written since migration 011)."""
+    ids = list(user_ids)
+    resp = supabase.table(VERSIONS).select("user_id,workouts_version").in_("user_id", ids).execute()
+    versions = {user_id: 0 for user_id in ids}
+    versions.update({r["user_id"]: int(r["workouts_version"]) for r in resp.data or []})
+    return versions
+
+
+def upsert_rows(rows: Sequence[Dict[str, Any]]) -> None:
+    if rows:
+        supabase.table(TABLE).upsert(list(rows), on_conflict="user_id").execute()
+
+
+async def get_fresh_suggestions(user_id: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Cached suggestions when the row was computed from the user's current
+    workouts version; None means "compute live".
+    """
+    if not settings.RECOMMENDATIONS_CACHE:
+        return None
+    try:
+        resp = supabase.table(TABLE).select("suggestions,data_version").eq("user_id", user_id).limit(1).execute()
+        if not resp.data:
+            record_cache(TABLE, "miss")
+            return None
+        row = resp.data[0]
+        if int(row["data_version"]) != fetch_data_versions([user_id])[user_id]:
+            record_cache(TABLE, "stale")
+            return None
+        record_cache(TABLE, "hit")
+        return row["suggestions"][:limit]
+    except Exception as e:
+        logger.warning(f"recommendations_cache read failed for {user_id}: {e}")
+        return None
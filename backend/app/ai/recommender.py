@@ -1,14 +1,21 @@
-import os
 import asyncio,json,re,time
 import logging
-from openai import AsyncOpenAI,OpenAIError
+from openai import OpenAIError
 from openai._exceptions import APIStatusError
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
 
-from app.ai.data_prep import aggregate_exercise_history
+from app.ai import llm_client, prompts
+from app.ai.llm_client import LLM_LATENCY
+from app.ai.trend_stats import get_trend_metrics
+from app.core.metrics import OPENAI_RETRIES, Counter, Gauge
+from app.core import deadline
+from app.core.config import settings
+from app.core.tracing import span, traced
+from app.ai.exercise_index import get_top_exercises
+from app.services import profile_service
 from app.ai.fitness_advisor import (
     should_increase_weight,
     should_increase_reps,
@@ -21,10 +28,7 @@ from app.ai.fitness_advisor import (
 # Setup & Configuration
 # ---------------------------------------------------
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-client = AsyncOpenAI(api_key=api_key)
 
 # ---------------------------------------------------
 # Pydantic Schemas for Validation
@@ -98,10 +102,40 @@ def quota_blocked() -> bool:
 def trip_quota_fuse():
     global _QUOTA_FUSE_UNTIL
     _QUOTA_FUSE_UNTIL = time.time() + _QUOTA_COOLDOWN_SEC
+    QUOTA_FUSE_TRIPS.inc()
+
+QUOTA_FUSE_OPEN = Gauge("openai_quota_fuse_open", "1 while the insufficient_quota fuse blocks LLM calls.",
+                        fn=lambda: 1.0 if quota_blocked() else 0.0)
+QUOTA_FUSE_TRIPS = Counter("openai_quota_fuse_trips_total", "Times the insufficient_quota fuse was tripped.")
+LLM_MODEL = "gpt-4o-mini"
 
 # ---------------------------------------------------
 # Core Orchestration Functions
 # ---------------------------------------------------
+LLM_ATTEMPTS = 3
+
+
+async def _backoff_sleep(seconds: float, attempt: int) -> None:
+    with span("llm.backoff", seconds=seconds, attempt=attempt):
+        await asyncio.sleep(seconds)
+
+
+async def _retry_after_backoff(seconds: float, attempt: int, exercise: str) -> bool:
+    """Sleep before the next attempt, or give up when it could not finish within the request budget."""
+    if attempt + 1 >= LLM_ATTEMPTS:
+        return False
+    if not deadline.has_budget(seconds + LLM_LATENCY.value):
+        deadline.skip(f"llm_retry:{exercise}")
+        return False
+    await _backoff_sleep(seconds, attempt)
+    return True
+
+
+def _parse_suggestion(resp) -> Dict[str, Any]:
+    data = json.loads(resp.choices[0].message.content)
+    return OverloadSuggestion(**data).model_dump()
+
+@traced()
 async def llm_enhance_suggestion(
     base_payload: Dict[str, Any],
     exercise_trend: Dict[str, Any],
@@ -109,27 +143,46 @@ async def llm_enhance_suggestion(
 ) -> Optional[Dict[str, Any]]:
     """
     Refine rule-based suggestions with an LLM for nuance and coaching cues.
-    Returns a validated JSON response or None if LLM fails.
+    Returns a validated JSON response, or the base payload when the LLM
+    fails or the request budget can't cover a call (or another retry).
     """
     if quota_blocked():
         logger.warning("LLM disabled due to recent insufficient_quota; returning base payload.")
         return base_payload
+    exercise = base_payload.get("exercise", "")
+    if not deadline.has_budget(LLM_LATENCY.value):
+        deadline.skip(f"llm:{exercise}")
+        return base_payload
 
     # (1) Align the prompt with YOUR pydantic model's fields
     # If your OverloadSuggestion expects these keys:
     #   exercise, suggestion_type, value, confidence_score, rationale
     # then ask the model for EXACTLY these keys.
-    prompt = USER_PROMPT_TEMPLATE.format(
-        EXERCISE_TREND_JSON=json.dumps(exercise_trend, indent=2),
-        BASE_PAYLOAD_JSON=json.dumps(base_payload, indent=2),
-        USER_PROFILE_JSON=json.dumps(user_profile, indent=2)
+    # Compact canonical JSON, whitelisted profile; the profile goes first if over budget.
+    prompt, dropped = prompts.fit_sections(
+        [
+            ("profile", prompts.compact_json(prompts.profile_context(user_profile)), True),
+            ("trend", prompts.compact_json(exercise_trend), False),
+            ("base", prompts.compact_json(base_payload), False),
+        ],
+        lambda t: USER_PROMPT_TEMPLATE.format(
+            EXERCISE_TREND_JSON=t["trend"], BASE_PAYLOAD_JSON=t["base"], USER_PROFILE_JSON=t["profile"]
+        ),
+        settings.LLM_PROMPT_TOKEN_BUDGET,
     )
+    if prompt is None:
+        logger.warning("Prompt for %s exceeds %d tokens; returning base payload.", exercise,
+                       settings.LLM_PROMPT_TOKEN_BUDGET)
+        return base_payload
+    if dropped:
+        logger.debug("Prompt for %s over budget; dropped %s", exercise, dropped)
 
     backoff = 1.0
-    for attempt in range(3):
+    for attempt in range(LLM_ATTEMPTS):
         try:
-            resp = await client.chat.completions.create(
-                model="gpt-4o-mini",
+            return await llm_client.chat_completion(
+                validate=_parse_suggestion,
+                model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
@@ -138,8 +191,6 @@ async def llm_enhance_suggestion(
                 max_tokens=400,
                 response_format={"type": "json_object"},
             )
-            data = json.loads(resp.choices[0].message.content)
-            return OverloadSuggestion(**data).model_dump()
 
         except APIStatusError as e:
             # 429 covers rate limit AND insufficient_quota; check payload to branch
@@ -155,7 +206,9 @@ async def llm_enhance_suggestion(
                     trip_quota_fuse()
                     return base_payload  # degrade gracefully
                 # true rate limit: backoff + retry
-                await asyncio.sleep(backoff)
+                OPENAI_RETRIES.inc("rate_limit")
+                if not await _retry_after_backoff(backoff, attempt, exercise):
+                    break
                 backoff *= 2
                 continue
             else:
@@ -164,18 +217,32 @@ async def llm_enhance_suggestion(
 
         except OpenAIError as e:
             logger.error(f"OpenAIError: {e}")
-            await asyncio.sleep(backoff)
+            OPENAI_RETRIES.inc("openai_error")
+            if not await _retry_after_backoff(backoff, attempt, exercise):
+                break
             backoff *= 2
 
         except Exception as e:
             logger.error(f"Unexpected LLM error: {e}")
-            await asyncio.sleep(backoff)
+            OPENAI_RETRIES.inc("unexpected")
+            if not await _retry_after_backoff(backoff, attempt, exercise):
+                break
             backoff *= 2
 
     # if all attempts fail for transient reasons, fall back
     return base_payload
 
 
+async def _profile_context(user_id: str) -> Dict[str, Any]:
+    """Cached profile row for the prompt; the suggestion still works without it."""
+    try:
+        return await profile_service.get_profile(user_id)
+    except Exception as e:
+        logger.warning("No profile context for user %s: %s", user_id, e)
+        return {}
+
+
+@traced()
 async def generate_recommendation_for_exercise(user_id: str, exercise_name: str,
                                                user_profile: Optional[Dict[str, Any]] = None) -> NextWorkoutSuggestion:
     """
@@ -183,26 +250,25 @@ async def generate_recommendation_for_exercise(user_id: str, exercise_name: str,
     2. Apply deterministic rule-based logic.
     3. Optionally enhance with LLM.
     """
-    resp = await aggregate_exercise_history(user_id, exercise_name)
-    # print(f"Aggregated trend for {resp['exercise_name']}: {resp['trend_metrics']}", flush=True)
-    # metrics = trend.get("metrics", {})
-    
+    trend_metrics = await get_trend_metrics(user_id, exercise_name)
 
     # Step 1: Base rule-based suggestion
-    base_suggestion = await build_suggestion_payload(resp['exercise_name'], resp['trend_metrics'])
+    base_suggestion = await build_suggestion_payload(exercise_name, trend_metrics)
     # print(f"Base suggestion for {exercise_name}: {base_suggestion}", flush=True)
 
     # Step 2: Optionally call LLM if confidence < threshold or maintain
     enriched_suggestion = None
     if base_suggestion["confidence_score"] < 0.75 or base_suggestion["suggestion_type"] == "maintain":
-        logger.info(f"Skipping LLM for {exercise_name} (low priority suggestion)")
+        logger.debug("Skipping LLM for %s (low priority suggestion)", exercise_name)
     else:
-        enriched_suggestion = await llm_enhance_suggestion(base_suggestion, resp['trend_metrics'], user_profile or {})
+        if user_profile is None:
+            user_profile = await _profile_context(user_id)
+        enriched_suggestion = await llm_enhance_suggestion(base_suggestion, trend_metrics, user_profile)
 
     # Step 3: Fallback handling
     if not enriched_suggestion:
         enriched_suggestion = base_suggestion
-    print(f"Generated recommendation for {exercise_name}: {enriched_suggestion}", flush=True)
+    logger.debug("Generated recommendation for %s: %s", exercise_name, enriched_suggestion.get("suggestion_type"))
 
     return NextWorkoutSuggestion(
         user_id=user_id,
@@ -212,22 +278,26 @@ async def generate_recommendation_for_exercise(user_id: str, exercise_name: str,
     )
 
 
+@traced()
 async def get_next_workout_suggestions_for_user(user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
     """
-    Pulls user's most recent exercises and generates top-N suggestions.
+    Generates suggestions for the user's top-N exercises, ranked by
+    frequency, recency and staleness from the cached exercise index.
     """
-    # TODO: integrate with DB or cached list of user's frequent exercises
-    # recent_exercises = ["Bicep Curl","bench_press", "squat", "pull_up", "shoulder_press", "deadlift"][:limit]
-
-
     results = []
-    for ex in ["Bicep Curl"]:
+    exercises = await get_top_exercises(user_id, limit)
+    for i, ex in enumerate(exercises):
         try:
             suggestion = await generate_recommendation_for_exercise(user_id, ex)
             results.append(suggestion.model_dump())
+        except deadline.DeadlineExceeded:
+            # out of time: return what is done rather than nothing
+            for rest in exercises[i:]:
+                deadline.skip(f"suggestion:{rest}")
+            break
         except Exception as e:
             logger.error(f"Failed to generate suggestion for {ex}: {e}")
-    print("Generated next workout suggestions:", results)
+    logger.info("Generated %d next workout suggestions for user %s", len(results), user_id)
     return results
 
 
@@ -0,0 +1,186 @@
+# backend/app/ai/rolling.py
+"""
+Rolling-window summaries (4/8/12 sessions) per user/exercise.
+
+Replaces the `exercise_performance_rolling` view from migration 006, which
+re-scanned every prior session with correlated LATERAL subqueries (O(n²) per
+user/exercise). Here every window average — for the latest session or for
+every session in the history — comes from one prefix-sum pass over the
+chronologically sorted SessionStore arrays.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.ai.data_prep import SessionStore, fetch_session_store, load_session_store
+from app.ai.exercise_catalog import canonical_name
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.schemas.ai import RollingWindowSummary
+from app.services.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOWS = (4, 8, 12)
+TABLE = "exercise_rolling_summaries"
+
+
+class _Prefix:
+    """Prefix sums of the per-session columns (index k = sum of first k sessions)."""
+
+    __slots__ = ("volume", "weight", "rpe", "rpe_count")
+
+    def __init__(self, volumes: np.ndarray, top_weights: np.ndarray, rpes: np.ndarray):
+        has_rpe = ~np.isnan(rpes)
+        self.volume = np.concatenate(([0.0], np.cumsum(volumes)))
+        self.weight = np.concatenate(([0.0], np.cumsum(top_weights)))
+        self.rpe = np.concatenate(([0.0], np.cumsum(np.where(has_rpe, rpes, 0.0))))
+        self.rpe_count = np.concatenate(([0], np.cumsum(has_rpe)))
+
+
+def _pct_change(cur: np.ndarray, prev: np.ndarray, prev_n: np.ndarray) -> List[Optional[float]]:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = (cur - prev) / prev * 100.0
+    ok = (prev_n > 0) & (prev != 0)
+    return [round(float(p), 2) if k else None for p, k in zip(pct, ok)]
+
+
+def _window_columns(prefix: _Prefix, ends: np.ndarray, w: int) -> Dict[str, Any]:
+    """
+    Window statistics for several reference points at once.
+    `ends` are exclusive end indices (reference session index + 1).
+    """
+    lo = np.maximum(ends - w, 0)
+    n = ends - lo
+    prev_hi = lo
+    prev_lo = np.maximum(ends - 2 * w, 0)
+    prev_n = prev_hi - prev_lo
+
+    def avg(p, a, b, cnt):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (p[b] - p[a]) / np.maximum(cnt, 1)
+
+    avg_vol = avg(prefix.volume, lo, ends, n)
+    avg_w = avg(prefix.weight, lo, ends, n)
+    rpe_n = prefix.rpe_count[ends] - prefix.rpe_count[lo]
+    avg_rpe = avg(prefix.rpe, lo, ends, rpe_n)
+    return {
+        "occurrences": n,
+        "avg_total_volume": avg_vol,
+        "avg_max_weight": avg_w,
+        "avg_rpe": np.where(rpe_n > 0, avg_rpe, np.nan),
+        "trend_volume_pct_change": _pct_change(avg_vol, avg(prefix.volume, prev_lo, prev_hi, prev_n), prev_n),
+        "trend_max_weight_pct_change": _pct_change(avg_w, avg(prefix.weight, prev_lo, prev_hi, prev_n), prev_n),
+    }
+
+
+def _summaries_at(store: SessionStore, prefix: _Prefix, ends: np.ndarray,
+                  windows: Sequence[int]) -> List[List[RollingWindowSummary]]:
+    out: List[List[RollingWindowSummary]] = [[] for _ in range(len(ends))]
+    for w in sorted(windows):
+        cols = _window_columns(prefix, ends, w)
+        for j, end in enumerate(ends.tolist()):
+            rpe = cols["avg_rpe"][j]
+            out[j].append(RollingWindowSummary(
+                window_size=w,
+                occurrences=int(cols["occurrences"][j]),
+                avg_total_volume=round(float(cols["avg_total_volume"][j]), 2),
+                avg_max_weight=round(float(cols["avg_max_weight"][j]), 2),
+                avg_rpe=None if np.isnan(rpe) else round(float(rpe), 2),
+                trend_volume_pct_change=cols["trend_volume_pct_change"][j],
+                trend_max_weight_pct_change=cols["trend_max_weight_pct_change"][j],
+                last_performed_at=store.dates[end - 1],
+            ))
+    return out
+
+
+def compute_rolling_summaries(store: SessionStore,
+                              windows: Sequence[int] = DEFAULT_WINDOWS) -> List[RollingWindowSummary]:
+    """
+    Rolling summaries as of the most recent session, ordered by window size.
+    Pct changes compare each window with the `w` sessions right before it.
+    """
+    if len(store) == 0:
+        return []
+    prefix = _Prefix(store.total_volume, store.max_set_weight, store.avg_rpe)
+    return _summaries_at(store, prefix, np.array([len(store)]), windows)[0]
+
+
+def compute_rolling_series(store: SessionStore,
+                           windows: Sequence[int] = DEFAULT_WINDOWS) -> List[List[RollingWindowSummary]]:
+    """
+    Rolling summaries with every session as the reference point — what the
+    old view returned per row — in O(n · len(windows)).
+    """
+    if len(store) == 0:
+        return []
+    prefix = _Prefix(store.total_volume, store.max_set_weight, store.avg_rpe)
+    return _summaries_at(store, prefix, np.arange(1, len(store) + 1), windows)
+
+
+# ------------------------------------------------------------------------------
+# Optional persistence (settings.ROLLING_SUMMARY_PERSIST)
+# ------------------------------------------------------------------------------
+
+async def refresh_rolling_summaries(user_id: str, exercise_name: str,
+                                    windows: Sequence[int] = DEFAULT_WINDOWS) -> List[RollingWindowSummary]:
+    """
+    Recompute the summaries for one user/exercise and upsert them into the
+    materialized table. Needs 2x the largest window to get pct changes.
+    A failed read raises: the stored rows are only deleted when the history
+    really is empty.
+    """
+    exercise_name = canonical_name(exercise_name)
+    store = await load_session_store(user_id, exercise_name, 2 * max(windows))
+    summaries = compute_rolling_summaries(store, windows)
+    if not summaries:
+        supabase.table(TABLE).delete().eq("user_id", user_id).eq("exercise_name", exercise_name).execute()
+        return []
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {"user_id": user_id, "exercise_name": exercise_name, "updated_at": now, **s.model_dump(mode="json")}
+        for s in summaries
+    ]
+    supabase.table(TABLE).upsert(rows, on_conflict="user_id,exercise_name,window_size").execute()
+    return summaries
+
+
+async def on_workouts_changed(user_id: str, exercise_names: Sequence[str]) -> None:
+    """Workout write hook: keep the materialized summaries current (if enabled)."""
+    if not settings.ROLLING_SUMMARY_PERSIST:
+        return
+    for name in {canonical_name(n) for n in exercise_names if n}:
+        try:
+            await refresh_rolling_summaries(user_id, name)
+        except Exception as e:
+            logger.error(f"Failed to refresh rolling summaries for {name}: {e}")
+
+
+async def get_rolling_summaries(user_id: str, exercise_name: str,
+                                windows: Sequence[int] = DEFAULT_WINDOWS) -> List[RollingWindowSummary]:
+    """
+    Read the materialized summaries when persistence is on, otherwise compute
+    them on the fly from the last 2x max(windows) sessions.
+    """
+    exercise_name = canonical_name(exercise_name)
+    if settings.ROLLING_SUMMARY_PERSIST:
+        try:
+            resp = (
+                supabase.table(TABLE)
+                .select("*")
+                .eq("user_id", user_id)
+                .eq("exercise_name", exercise_name)
+                .in_("window_size", list(windows))
+                .order("window_size")
+                .execute()
+            )
+            if resp.data:
+                record_cache(TABLE, "hit")
+                return [RollingWindowSummary.model_validate(r) for r in resp.data]
+            record_cache(TABLE, "miss")
+        except Exception as e:
+            logger.error(f"Failed to read rolling summaries: {e}")
+    store = await fetch_session_store(user_id, exercise_name, 2 * max(windows))
+    return compute_rolling_summaries(store, windows)
@@ -0,0 +1,197 @@
+# backend/app/ai/rule_table.py
+"""
+Declarative, vectorized form of the rule-based advisor.
+
+`fitness_advisor.build_suggestion_payload` runs one Python call chain per
+exercise. Here the same rules are a decision table (first matching row wins)
+compiled into boolean NumPy masks, so a whole matrix of trend metrics —
+users × exercises, or any other shape — is scored in one shot. Outputs
+(suggestion type, value, confidence, rationale) are identical to
+build_suggestion_payload; tests/test_rule_table.py checks that.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.ai.fitness_advisor import (
+    DEFAULT_UPPER_INC_KG,
+    RATIONALE_INCREASE_REPS,
+    RATIONALE_INCREASE_SETS,
+    RATIONALE_INCREASE_WEIGHT,
+    RATIONALE_MAINTAIN,
+    RATIONALE_RECOVERY,
+    RATIONALE_VOLUME_DOWN,
+    _base_increment,
+    _infer_is_lower_body,
+)
+
+Cond = Tuple[str, str, float]  # (column, operator, threshold)
+
+_OPS = {
+    ">": np.greater, ">=": np.greater_equal,
+    "<": np.less, "<=": np.less_equal,
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    suggestion_type: str
+    when: Tuple[Tuple[Cond, ...], ...]   # OR of AND-clauses
+    value: Union[str, float, None]       # "increment" = per-exercise load step
+    confidence: float
+    rationale: str
+
+
+def _all(*conds: Cond) -> Tuple[Tuple[Cond, ...], ...]:
+    return (tuple(conds),)
+
+
+def _any(*clauses: Tuple[Cond, ...]) -> Tuple[Tuple[Cond, ...], ...]:
+    return tuple(clauses)
+
+
+# Mirrors should_increase_weight / _reps / _sets and recovery_adjustment, in
+# the order build_suggestion_payload tries them. `avg_rpe` is the value
+# _avg_rpe() resolves (heuristic when missing); `avg_rpe_gate` additionally
+# applies the `or 7.0` used by the increase checks.
+DECISION_TABLE: Tuple[Rule, ...] = (
+    Rule("increase_weight",
+         _all(("weight_slope", ">", 0.01), ("avg_rpe_gate", "<=", 7.0), ("volume_slope", ">=", 0.0)),
+         "increment", 0.9, RATIONALE_INCREASE_WEIGHT),
+    Rule("increase_reps",
+         _all(("abs_weight_slope", "<=", 0.005), ("avg_rpe_gate", "<=", 7.0), ("rpe_trend", "<=", 0.0)),
+         1.0, 0.9, RATIONALE_INCREASE_REPS),
+    Rule("increase_sets",
+         _all(("abs_volume_slope", "<", 0.005), ("avg_rpe_gate", "<=", 6.5), ("consistency", ">=", 0.8)),
+         1.0, 0.9, RATIONALE_INCREASE_SETS),
+    Rule("recovery",
+         _any((("avg_rpe", ">=", 9.0),), (("rpe_trend", ">", 0.2), ("avg_rpe", ">=", 8.5))),
+         None, 0.8, RATIONALE_RECOVERY.format(status="deload")),
+    Rule("recovery",
+         _any((("avg_rpe", ">=", 8.0),), (("volume_slope", "<", -0.5), ("rpe_trend", ">=", 0.0))),
+         None, 0.8, RATIONALE_RECOVERY.format(status="add rest day")),
+    Rule("recovery",
+         _all(("avg_rpe", "<=", 5.0), ("rpe_trend", "<", -0.1)),
+         None, 0.8, RATIONALE_RECOVERY.format(status="reduce intensity")),
+    Rule("maintain", _all(("volume_slope", "<", -0.1)), None, 0.7, RATIONALE_VOLUME_DOWN),
+    Rule("maintain", ((),), None, 0.7, RATIONALE_MAINTAIN),  # default row
+)
+
+METRIC_DEFAULTS = {"volume_slope": 0.0, "weight_slope": 0.0, "rpe_trend": 0.0, "consistency": 0.9}
+
+
+@dataclass
+class RuleResult:
+    rule_index: np.ndarray       # index into DECISION_TABLE
+    suggestion_type: np.ndarray  # str
+    value: np.ndarray            # float, NaN = None
+    confidence: np.ndarray
+    rationale: np.ndarray        # str
+
+
+def _derive(columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    cols = {k: np.asarray(columns.get(k, d), dtype=float) for k, d in METRIC_DEFAULTS.items()}
+    shape = np.broadcast_shapes(*(c.shape for c in cols.values()),
+                                np.shape(columns.get("avg_rpe", np.nan)))
+    cols = {k: np.broadcast_to(v, shape) for k, v in cols.items()}
+    raw_rpe = np.broadcast_to(np.asarray(columns.get("avg_rpe", np.nan), dtype=float), shape)
+    avg_rpe = np.where(np.isnan(raw_rpe), np.where(cols["rpe_trend"] < -0.2, 6.0, 7.0), raw_rpe)
+    cols["avg_rpe"] = avg_rpe
+    cols["avg_rpe_gate"] = np.where(avg_rpe == 0.0, 7.0, avg_rpe)
+    cols["abs_weight_slope"] = np.abs(cols["weight_slope"])
+    cols["abs_volume_slope"] = np.abs(cols["volume_slope"])
+    return cols
+
+
+@lru_cache(maxsize=None)
+def _compiled(table: Tuple[Rule, ...]):
+    """Per rule, a list of AND-clauses of (ufunc, column, threshold)."""
+    return [
+        [[(_OPS[op], col, thr) for col, op, thr in clause] for clause in rule.when]
+        for rule in table
+    ]
+
+
+def evaluate(columns: Mapping[str, Any], increments: Any = None,
+             table: Tuple[Rule, ...] = DECISION_TABLE) -> RuleResult:
+    """
+    Score every cell of the metric arrays in `columns` (keys as in
+    compute_trend_metrics; avg_rpe NaN = missing). `increments` broadcasts
+    against them (e.g. one value per exercise column).
+    """
+    cols = _derive(columns)
+    shape = cols["volume_slope"].shape
+    masks = []
+    for clauses in _compiled(table):
+        rule_mask = np.zeros(shape, dtype=bool)
+        for clause in clauses:
+            m = np.ones(shape, dtype=bool)
+            for op, col, thr in clause:
+                m &= op(cols[col], thr)
+            rule_mask |= m
+        masks.append(rule_mask)
+    idx = np.select(masks, np.arange(len(table)), default=len(table) - 1)
+
+    inc = np.broadcast_to(np.asarray(
+        increments if increments is not None else DEFAULT_UPPER_INC_KG, dtype=float), shape)
+    fixed = np.array([r.value if isinstance(r.value, float) else np.nan for r in table])
+    is_inc = np.array([r.value == "increment" for r in table])
+    value = np.where(is_inc[idx], np.round(inc, 2), fixed[idx])
+    return RuleResult(
+        rule_index=idx,
+        suggestion_type=np.array([r.suggestion_type for r in table])[idx],
+        value=value,
+        confidence=np.array([r.confidence for r in table])[idx],
+        rationale=np.array([r.rationale for r in table], dtype=object)[idx],
+    )
+
+
+# ------------------------------------------------------------------------------
+# Helpers for dict-shaped callers
+# ------------------------------------------------------------------------------
+
+def columns_from_metrics(metrics: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Stack trend-metric dicts into column arrays (missing keys -> defaults / NaN)."""
+    cols = {k: np.array([float(m.get(k, d)) for m in metrics], dtype=float) for k, d in METRIC_DEFAULTS.items()}
+    cols["avg_rpe"] = np.array(
+        [float(m["avg_rpe"]) if m.get("avg_rpe") is not None else np.nan for m in metrics], dtype=float
+    )
+    return cols
+
+
+def increments_for(exercise_names: Sequence[str], is_lower_body: Optional[Sequence[bool]] = None) -> np.ndarray:
+    """Per-exercise load increment, resolved once per distinct name."""
+    names = np.asarray(exercise_names, dtype=object)
+    if is_lower_body is None:
+        uniq, inverse = np.unique(names, return_inverse=True)
+        inc = np.array([_base_increment(n, _infer_is_lower_body(n)) for n in uniq], dtype=float)
+        return inc[inverse].reshape(names.shape)
+    return np.array([_base_increment(n, bool(low)) for n, low in zip(names, is_lower_body)], dtype=float)
+
+
+def to_payloads(exercise_names: Sequence[str], result: RuleResult) -> List[Dict[str, Any]]:
+    """OverloadSuggestion-shaped dicts, as build_suggestion_payload returns."""
+    values = result.value.ravel().tolist()
+    return [
+        {
+            "exercise": name,
+            "suggestion_type": str(t),
+            "value": None if v != v else v,
+            "confidence_score": float(c),
+            "rationale": r,
+        }
+        for name, t, v, c, r in zip(
+            np.asarray(exercise_names, dtype=object).ravel(), result.suggestion_type.ravel(),
+            values, result.confidence.ravel(), result.rationale.ravel(),
+        )
+    ]
+
+
+def score_exercises(exercise_names: Sequence[str], metrics: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Vectorized build_suggestion_payload over parallel name/metrics lists."""
+    if not metrics:
+        return []
+    result = evaluate(columns_from_metrics(metrics), increments_for(exercise_names))
+    return to_payloads(exercise_names, result)
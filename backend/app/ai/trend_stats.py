@@ -0,0 +1,401 @@
+# backend/app/ai/trend_stats.py
+"""
+Running sufficient statistics for per-(user, exercise) trend metrics.
+
+`compute_trend_metrics` refits three regressions over the last 12 sessions on
+every call. `TrendStats` keeps, for the same window:
+
+  - regression sums (n, Σx, Σx², Σy, Σxy) for volume, top-set weight and RPE,
+    with x = a per-exercise session ordinal (slopes are shift-invariant, so
+    this equals polyfit over arange(n) while ordinals are consecutive),
+  - Welford mean / M2 of volume (for `consistency`), with exact removal,
+  - EWMA variants of volume / weight / RPE over the whole stream,
+  - the window itself (≤ 12 small tuples) so the oldest session can be
+    subtracted when a new one pushes it out.
+
+Appends and in-window value edits are O(1). Deleting or moving a session that
+is inside the window needs the next-older session from the DB, so those
+rebuild the state from the last `window` rows (bounded work).
+
+State is persisted in `exercise_trend_stats` (keyed by the catalog's canonical
+exercise name) when TREND_STATS_PERSIST is on;
+`verify_trend_stats` compares it with a full recomputation. Each row carries
+a `version`: a save only succeeds if the row is still at the version it was
+loaded at, so concurrent writes for one exercise (other workers, overlapping
+requests) reload and re-apply their change instead of losing one.
+"""
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.ai.exercise_catalog import canonical_name
+from app.ai.data_prep import (
+    RECENT_RPE_SESSIONS,
+    SessionStore,
+    _parse_ts,
+    _trend_metrics_from_arrays,
+    fetch_session_store,
+    load_session_store,
+)
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
+from app.core.metrics import record_cache
+from app.core.tracing import traced
+from app.services.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+TABLE = "exercise_trend_stats"
+TREND_WINDOW = 12
+SAVE_ATTEMPTS = 3  # optimistic load/apply/save rounds before giving up on a write
+EWMA_ALPHAS = {"fast": 0.5, "slow": 2.0 / (TREND_WINDOW + 1)}  # spans 3 and 12
+
+_ZERO_METRICS = {"volume_slope": 0, "weight_slope": 0, "rpe_trend": 0, "consistency": 0}
+
+
+class _Regression:
+    """Σ-sums for an ordinary least-squares slope with add/remove."""
+
+    __slots__ = ("n", "sx", "sxx", "sy", "sxy")
+
+    def __init__(self, n=0, sx=0.0, sxx=0.0, sy=0.0, sxy=0.0):
+        self.n, self.sx, self.sxx, self.sy, self.sxy = n, sx, sxx, sy, sxy
+
+    def add(self, x: float, y: float, sign: int = 1) -> None:
+        self.n += sign
+        self.sx += sign * x
+        self.sxx += sign * x * x
+        self.sy += sign * y
+        self.sxy += sign * x * y
+
+    def slope(self) -> float:
+        denom = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or denom == 0:
+            return 0.0
+        return (self.n * self.sxy - self.sx * self.sy) / denom
+
+    def to_list(self) -> List[float]:
+        return [self.n, self.sx, self.sxx, self.sy, self.sxy]
+
+
+class _Welford:
+    """Running mean / M2 supporting removal of a previously added value."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    def add(self, y: float) -> None:
+        self.n += 1
+        d = y - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (y - self.mean)
+
+    def remove(self, y: float) -> None:
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        new_mean = (self.n * self.mean - y) / (self.n - 1)
+        self.m2 = max(self.m2 - (y - self.mean) * (y - new_mean), 0.0)
+        self.mean = new_mean
+        self.n -= 1
+
+    def pstd(self) -> float:
+        return math.sqrt(self.m2 / self.n) if self.n else 0.0
+
+
+class TrendStats:
+    """
+    Windowed trend state for one user/exercise.
+    `entries` hold [ordinal, session_id, performed_at_iso, volume, top_weight, rpe|None],
+    oldest first.
+    """
+
+    __slots__ = ("window", "next_ordinal", "entries", "volume", "weight", "rpe", "welford", "ewma")
+
+    def __init__(self, window: int = TREND_WINDOW):
+        self.window = window
+        self.next_ordinal = 0
+        self.entries: List[List[Any]] = []
+        self.volume = _Regression()
+        self.weight = _Regression()
+        self.rpe = _Regression()
+        self.welford = _Welford()
+        self.ewma: Dict[str, Optional[float]] = {}
+
+    # ---- construction ----------------------------------------------------
+
+    @classmethod
+    def from_store(cls, store: SessionStore, window: int = TREND_WINDOW) -> "TrendStats":
+        stats = cls(window)
+        for values in _session_values(store):
+            stats.append(*values)
+        return stats
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "TrendStats":
+        stats = cls(int(state.get("window", TREND_WINDOW)))
+        stats.next_ordinal = int(state.get("next_ordinal", 0))
+        stats.entries = [list(e) for e in state.get("entries", [])]
+        stats.volume = _Regression(*state["volume"])
+        stats.weight = _Regression(*state["weight"])
+        stats.rpe = _Regression(*state["rpe"])
+        stats.welford = _Welford(*state["welford"])
+        stats.ewma = dict(state.get("ewma", {}))
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "next_ordinal": self.next_ordinal,
+            "entries": self.entries,
+            "volume": self.volume.to_list(),
+            "weight": self.weight.to_list(),
+            "rpe": self.rpe.to_list(),
+            "welford": [self.welford.n, self.welford.mean, self.welford.m2],
+            "ewma": self.ewma,
+        }
+
+    # ---- updates ---------------------------------------------------------
+
+    def _apply(self, entry: List[Any], sign: int) -> None:
+        x, _, _, vol, top, rpe = entry
+        self.volume.add(x, vol, sign)
+        self.weight.add(x, top, sign)
+        if rpe is not None:
+            self.rpe.add(x, rpe, sign)
+        if sign > 0:
+            self.welford.add(vol)
+        else:
+            self.welford.remove(vol)
+
+    def _update_ewma(self, vol: float, top: float, rpe: Optional[float]) -> None:
+        for label, alpha in EWMA_ALPHAS.items():
+            for metric, y in (("volume", vol), ("weight", top), ("rpe", rpe)):
+                if y is None:
+                    continue
+                key = f"{metric}_{label}"
+                prev = self.ewma.get(key)
+                self.ewma[key] = y if prev is None else alpha * y + (1 - alpha) * prev
+
+    def append(self, session_id: str, performed_at: str, volume: float, top_weight: float,
+               rpe: Optional[float]) -> None:
+        """Add the newest session; evicts the oldest one once the window is full."""
+        entry = [self.next_ordinal, session_id, performed_at, volume, top_weight, rpe]
+        self.next_ordinal += 1
+        self.entries.append(entry)
+        self._apply(entry, +1)
+        self._update_ewma(volume, top_weight, rpe)
+        while len(self.entries) > self.window:
+            self._apply(self.entries.pop(0), -1)
+
+    def replace(self, session_id: str, performed_at: str, volume: float, top_weight: float,
+                rpe: Optional[float]) -> bool:
+        """Swap the values of an in-window session in place. False if not in window."""
+        for i, entry in enumerate(self.entries):
+            if entry[1] == session_id:
+                self._apply(entry, -1)
+                self.entries[i] = [entry[0], session_id, performed_at, volume, top_weight, rpe]
+                self._apply(self.entries[i], +1)
+                return True
+        return False
+
+    def contains(self, session_id: str) -> bool:
+        return any(e[1] == session_id for e in self.entries)
+
+    # ---- reads -----------------------------------------------------------
+
+    def metrics(self) -> Dict[str, Any]:
+        """Same keys and rounding as data_prep.compute_trend_metrics, in O(window) worst case."""
+        if len(self.entries) < 2:
+            return dict(_ZERO_METRICS)
+        metrics = {
+            "volume_slope": round(self.volume.slope(), 3),
+            "weight_slope": round(self.weight.slope(), 3),
+            "rpe_trend": round(self.rpe.slope(), 3) if self.rpe.n >= 2 else 0.0,
+            "consistency": round(1.0 / (self.welford.pstd() + 1e-6), 3),
+        }
+        recent = [e[5] for e in self.entries if e[5] is not None][-RECENT_RPE_SESSIONS:]
+        if recent:
+            metrics["avg_rpe"] = round(sum(recent) / len(recent), 2)
+        return metrics
+
+
+def _session_values(store: SessionStore):
+    """(session_id, performed_at, volume, top_weight, rpe) per session, rounded like the trend pipeline."""
+    vols = np.round(store.total_volume, 2).tolist()
+    tops = np.round(store.max_set_weight, 2).tolist()
+    rpes = np.round(store.avg_rpe, 2).tolist()
+    for i, sid in enumerate(store.ids):
+        yield sid, store.dates[i].isoformat(), vols[i], tops[i], (None if rpes[i] != rpes[i] else rpes[i])
+
+
+# ------------------------------------------------------------------------------
+# Persistence + workout write hook
+# ------------------------------------------------------------------------------
+
+async def load_versioned_trend_stats(user_id: str, exercise_name: str) -> Tuple[Optional[TrendStats], Optional[int]]:
+    """Stored state and its row version; (None, None) when there is no row."""
+    resp = (
+        supabase.table(TABLE)
+        .select("state,version")
+        .eq("user_id", user_id)
+        .eq("exercise_name", exercise_name)
+        .maybe_single()
+        .execute()
+    )
+    data = getattr(resp, "data", None) if resp is not None else None
+    if not data:
+        return None, None
+    return TrendStats.from_dict(data["state"]), int(data["version"])
+
+
+async def load_trend_stats(user_id: str, exercise_name: str) -> Optional[TrendStats]:
+    return (await load_versioned_trend_stats(user_id, exercise_name))[0]
+
+
+async def save_trend_stats(user_id: str, exercise_name: str, stats: TrendStats,
+                           version: Optional[int] = None) -> bool:
+    """
+    Compare-and-set: write `stats` only if the row is still at `version`
+    (None = there must be no row yet). False when another writer got there first.
+    """
+    row = {"state": stats.to_dict(), "updated_at": datetime.now(timezone.utc).isoformat()}
+    if version is None:
+        resp = supabase.table(TABLE).upsert(
+            {"user_id": user_id, "exercise_name": exercise_name, "version": 1, **row},
+            on_conflict="user_id,exercise_name",
+            ignore_duplicates=True,
+        ).execute()
+    else:
+        resp = (
+            supabase.table(TABLE)
+            .update({**row, "version": version + 1})
+            .eq("user_id", user_id)
+            .eq("exercise_name", exercise_name)
+            .eq("version", version)
+            .execute()
+        )
+    return bool(resp.data)
+
+
+async def rebuild_trend_stats(user_id: str, exercise_name: str) -> TrendStats:
+    """Recompute the state from the last TREND_WINDOW rows (a failed read raises)."""
+    store = await load_session_store(user_id, exercise_name, TREND_WINDOW)
+    return TrendStats.from_store(store)
+
+
+def _apply_changes(stats: Optional[TrendStats], before: List[Dict[str, Any]],
+                   after: List[Dict[str, Any]]) -> Optional[TrendStats]:
+    """
+    Fold one write into the state. Returns None when the change cannot be
+    applied incrementally and the state must be rebuilt from the DB.
+    """
+    if stats is None:
+        return None
+    after_ids = {str(r.get("id")) for r in after}
+    for row in before:
+        sid = str(row.get("id"))
+        if sid not in after_ids and stats.contains(sid):
+            return None  # left the window: the next-older session must slide in
+    for row in after:
+        values = next(_session_values(SessionStore.from_rows([row])), None)
+        if stats.contains(str(row.get("id"))):
+            if values is None:
+                return None
+            stats.replace(*values)
+            continue
+        if values is None:
+            continue
+        performed_at = _parse_ts(values[1])
+        if not stats.entries or performed_at >= _parse_ts(stats.entries[-1][2]):
+            stats.append(*values)
+        elif len(stats.entries) < stats.window or performed_at > _parse_ts(stats.entries[0][2]):
+            return None  # back-dated into the window
+    return stats
+
+
+async def on_workouts_changed(user_id: str, before: Sequence[Dict[str, Any]],
+                              after: Sequence[Dict[str, Any]]) -> None:
+    """
+    Workout write hook. `before` = rows as they were (update/delete),
+    `after` = rows as written (insert/update).
+    """
+    if not settings.TREND_STATS_PERSIST:
+        return
+    def _name(row):
+        return canonical_name(row.get("exercise_name"))
+
+    names = {_name(r) for r in list(before) + list(after) if r.get("exercise_name")}
+    for name in names:
+        try:
+            b = [r for r in before if _name(r) == name]
+            a = [r for r in after if _name(r) == name]
+            for _ in range(SAVE_ATTEMPTS):
+                stored, version = await load_versioned_trend_stats(user_id, name)
+                stats = _apply_changes(stored, b, a)
+                if stats is None:
+                    stats = await rebuild_trend_stats(user_id, name)
+                if await save_trend_stats(user_id, name, stats, version):
+                    break
+            else:
+                logger.error(f"Trend stats for {name} kept changing under this write; "
+                             f"run verify_trend_stats(repair=True)")
+        except Exception as e:
+            logger.error(f"Failed to update trend stats for {name}: {e}")
+
+
+@traced()
+async def get_trend_metrics(user_id: str, exercise_name: str) -> Dict[str, Any]:
+    """
+    Trend metrics for one exercise: from the stored running statistics when
+    TREND_STATS_PERSIST is on (no raw rows read), else recomputed from the DB.
+    """
+    exercise_name = canonical_name(exercise_name)
+    if settings.TREND_STATS_PERSIST:
+        try:
+            stats = await load_trend_stats(user_id, exercise_name)
+            record_cache(TABLE, "miss" if stats is None else "hit")
+            if stats is None:
+                stats = await rebuild_trend_stats(user_id, exercise_name)
+                await save_trend_stats(user_id, exercise_name, stats)
+            return stats.metrics()
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Trend stats unavailable for {exercise_name}, recomputing: {e}")
+    store = await fetch_session_store(user_id, exercise_name, TREND_WINDOW)
+    return _trend_metrics_from_arrays(
+        np.round(store.total_volume, 2), np.round(store.max_set_weight, 2), np.round(store.avg_rpe, 2)
+    )
+
+
+async def verify_trend_stats(user_id: str, exercise_name: str, repair: bool = False,
+                             tolerance: float = 1e-3) -> Dict[str, Any]:
+    """
+    Consistency check: stored running statistics vs a full recomputation.
+    Returns {"ok", "stored", "expected", "diffs", "repaired"}; with `repair`,
+    rewrites the state unless it changed while being verified.
+    """
+    exercise_name = canonical_name(exercise_name)
+    stored, version = await load_versioned_trend_stats(user_id, exercise_name)
+    store = await load_session_store(user_id, exercise_name, TREND_WINDOW)
+    expected = _trend_metrics_from_arrays(
+        np.round(store.total_volume, 2), np.round(store.max_set_weight, 2), np.round(store.avg_rpe, 2)
+    )
+    got = stored.metrics() if stored else {}
+    diffs = {}
+    for key in set(expected) | set(got):
+        a, b = got.get(key), expected.get(key)
+        if a is None or b is None or not math.isclose(a, b, rel_tol=1e-6, abs_tol=tolerance):
+            if a != b:
+                diffs[key] = {"stored": a, "expected": b}
+    if stored is not None and [e[1] for e in stored.entries] != store.ids:
+        diffs["window_sessions"] = {"stored": [e[1] for e in stored.entries], "expected": store.ids}
+    repaired = bool(diffs and repair) and await save_trend_stats(
+        user_id, exercise_name, TrendStats.from_store(store), version)
+    return {"ok": not diffs, "stored": got, "expected": expected, "diffs": diffs, "repaired": repaired}
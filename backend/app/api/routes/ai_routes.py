@@ -1,5 +1,6 @@
 # backend/app/api/routes/ai_routes.py
 
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional, Any
@@ -8,10 +9,29 @@ from app.ai.recommender import (
     generate_recommendation_for_exercise
 )
 from app.core.auth import get_current_user  # assuming it returns a dict with 'id'
+from app.core.conditional import SHORT_LIVED, cache_validated
+from app.core.deadline import DeadlineExceeded, deadline_budget, skipped_stages
+from app.core.rate_limit import rate_limited
 from app.ai.data_prep import aggregate_exercise_history
+from app.ai.exercise_index import get_top_exercises
+from app.ai.recommendations_cache import get_fresh_suggestions
+from app.ai.llm_dispatcher import INTERACTIVE, PREFETCH, llm_priority
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["AI Recommender"])
 
+# Route time budgets (seconds); X-Request-Timeout can only shorten them.
+# LLM enrichment is skipped, not awaited, once the budget runs low.
+# next-workout enriches several exercises in bulk, so its LLM calls queue
+# behind analyze-exercise's (app/ai/llm_dispatcher.py).
+NEXT_WORKOUT_BUDGET_SEC = 10.0
+ANALYZE_EXERCISE_BUDGET_SEC = 8.0
+# Rate-limit tokens per call (RATE_LIMIT_BURST / RATE_LIMIT_PER_MIN per user):
+# next-workout fans out over up to `limit` exercises, analyze-exercise does one
+NEXT_WORKOUT_COST = 5
+ANALYZE_EXERCISE_COST = 2
+
 # ---------------------------------------------------
 # Pydantic Response Models
 # ---------------------------------------------------
@@ -27,6 +47,7 @@ class OverloadSuggestionResponse(BaseModel):
     confidence: float
     rationale: str
     coaching_cues: Optional[List[str]]
+    skipped_stages: List[str] = []
 
 class ExerciseTrend(BaseModel):
     exercise_name: str
@@ -43,7 +64,10 @@ class NextWorkoutSuggestionResponse(BaseModel):
 # Routes
 # ---------------------------------------------------
 
-@router.get("/next-workout", response_model=List[NextWorkoutSuggestionResponse])
+@router.get("/next-workout", response_model=List[NextWorkoutSuggestionResponse],
+            dependencies=[cache_validated("workouts", "profile", cache_control=SHORT_LIVED, per_day=True),
+                          rate_limited(NEXT_WORKOUT_COST),
+                          deadline_budget(NEXT_WORKOUT_BUDGET_SEC), llm_priority(PREFETCH)])
 async def get_next_workout(
     limit: int = Query(5, description="Number of exercises to suggest"),
     current_user: dict = Depends(get_current_user),
@@ -51,19 +75,26 @@ async def get_next_workout(
     """
     Generate next-workout recommendations across top exercises.
     """
-    print("Current user:", current_user['id'],flush=True)
+    logger.debug("next-workout for user %s (limit=%d)", current_user['id'], limit)
     # if current_user["id"] != user_id:
     #     raise HTTPException(status_code=403, detail="Not authorized to view this user’s data.")
 
     try:
+        cached = await get_fresh_suggestions(current_user['id'], limit)
+        if cached is not None:
+            return cached
         suggestions = await get_next_workout_suggestions_for_user(current_user['id'], limit=limit)
-        print("Suggestions:", suggestions)
+        logger.debug("next-workout: %d fresh suggestions for user %s", len(suggestions), current_user['id'])
         return suggestions
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/analyze-exercise", response_model=OverloadSuggestionResponse)
+@router.post("/analyze-exercise", response_model=OverloadSuggestionResponse,
+             dependencies=[rate_limited(ANALYZE_EXERCISE_COST),
+                           deadline_budget(ANALYZE_EXERCISE_BUDGET_SEC), llm_priority(INTERACTIVE)])
 async def analyze_exercise(
     payload: dict,
     current_user: Any = Depends(get_current_user),
@@ -97,24 +128,28 @@ async def analyze_exercise(
             confidence=enriched["confidence_score"],
             rationale=enriched["rationale"],
             coaching_cues=enriched.get("coaching_cues", []),
+            skipped_stages=skipped_stages(),
         )
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/exercises/{user_id}", response_model=List[str])
+@router.get("/exercises/{user_id}", response_model=List[str],
+            dependencies=[cache_validated("workouts", per_day=True)])
 async def get_user_exercises(
     user_id: str,
+    limit: int = Query(10, ge=1, le=50, description="Number of exercises to return"),
     current_user: Any = Depends(get_current_user)
 ):
     """
-    (Optional) Return user's most frequent or recent exercises.
+    Return the user's exercises ranked by frequency, recency and staleness.
     """
     if current_user["id"] != user_id:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
     try:
-        # Placeholder logic (later can use Supabase query)
-        return ["bench_press", "squat", "pull_up", "deadlift"]
+        return await get_top_exercises(user_id, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
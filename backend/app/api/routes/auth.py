@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request, HTTPException, Header
 from app.services.supabase_client import supabase
+from app.core.executors import offload
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -9,6 +10,7 @@ def preflight_test():
     return {"status": "ok"}
 
 @router.get("/test")
+@offload("auth")
 def test_auth(request: Request, authorization: str = Header(None)):
     """
     Test Supabase Auth by validating the user's access token.
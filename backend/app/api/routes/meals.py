@@ -4,7 +4,11 @@ from datetime import date, datetime
 from uuid import UUID
 
 from app.services.supabase_client import supabase
+from app.core import conditional
 from app.core.auth import get_current_user
+from app.core.conditional import cache_validated
+from app.core.executors import offload
+from app.core.responses import trusted_list_response
 from app.schemas.meal import MealCreate, MealUpdate, MealOut
 
 router = APIRouter(prefix="/meals", tags=["meals"])
@@ -14,6 +18,7 @@ router = APIRouter(prefix="/meals", tags=["meals"])
 # CREATE
 # --------------------------
 @router.post("/", response_model=MealOut, status_code=status.HTTP_201_CREATED)
+@offload("crud")
 def create_meal(
     payload: MealCreate,
     current_user: dict = Depends(get_current_user)
@@ -28,6 +33,7 @@ def create_meal(
         res = supabase.table("meals").insert(data).execute()
         if not res.data:
             raise HTTPException(status_code=500, detail="Failed to create meal")
+        conditional.bump(current_user["id"], "meals")
         return res.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -36,7 +42,8 @@ def create_meal(
 # --------------------------
 # READ ALL (with filters)
 # --------------------------
-@router.get("", response_model=List[MealOut])
+@router.get("", response_model=List[MealOut], dependencies=[cache_validated("meals")])
+@offload("crud")
 def list_meals(
     current_user: dict = Depends(get_current_user),
     date_: Optional[date] = Query(None, alias="date"),
@@ -53,7 +60,7 @@ def list_meals(
 
     try:
         res = query.order("date", desc=True).execute()
-        return res.data or []
+        return trusted_list_response(MealOut, res.data or [])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -61,7 +68,8 @@ def list_meals(
 # --------------------------
 # READ SINGLE
 # --------------------------
-@router.get("/{meal_id}", response_model=MealOut)
+@router.get("/{meal_id}", response_model=MealOut, dependencies=[cache_validated("meals")])
+@offload("crud")
 def get_meal(meal_id: UUID, current_user: dict = Depends(get_current_user)):
     """Retrieve a single meal entry by ID (only if owned by the user)."""
     res = supabase.table("meals").select("*").eq("id", str(meal_id)).execute()
@@ -79,6 +87,7 @@ def get_meal(meal_id: UUID, current_user: dict = Depends(get_current_user)):
 # UPDATE
 # --------------------------
 @router.put("/{meal_id}", response_model=MealOut)
+@offload("crud")
 def update_meal(
     meal_id: UUID,
     updates: MealUpdate,
@@ -96,6 +105,7 @@ def update_meal(
     try:
         updated_data = updates.dict(exclude_unset=True)
         result = supabase.table("meals").update(updated_data).eq("id", str(meal_id)).execute()
+        conditional.bump(current_user["id"], "meals")
         return result.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -105,6 +115,7 @@ def update_meal(
 # DELETE
 # --------------------------
 @router.delete("/{meal_id}", status_code=status.HTTP_204_NO_CONTENT)
+@offload("crud")
 def delete_meal(meal_id: UUID, current_user: dict = Depends(get_current_user)):
     """Delete a meal entry (only by the owner)."""
     res = supabase.table("meals").select("*").eq("id", str(meal_id)).execute()
@@ -117,5 +128,6 @@ def delete_meal(meal_id: UUID, current_user: dict = Depends(get_current_user)):
 
     try:
         supabase.table("meals").delete().eq("id", str(meal_id)).execute()
+        conditional.bump(current_user["id"], "meals")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,10 +3,13 @@ from typing import Dict, Optional
 from datetime import date, timedelta
 from app.services.supabase_client import supabase
 from app.core.auth import get_current_user
+from app.core.conditional import cache_validated
+from app.core.executors import offload
 
 router = APIRouter(prefix="/nutrition", tags=["nutrition"])
 
-@router.get("/daily-totals")
+@router.get("/daily-totals", dependencies=[cache_validated("meals")])
+@offload("analytics")
 def get_daily_totals(
     current_user: dict = Depends(get_current_user),
     start: Optional[date] = Query(None),
@@ -36,7 +39,8 @@ def get_daily_totals(
     ]
 
 
-@router.get("/rolling-averages")
+@router.get("/rolling-averages", dependencies=[cache_validated("meals", per_day=True)])
+@offload("analytics")
 def get_rolling_averages(
     window: int = Query(7, ge=1, le=60),
     current_user: dict = Depends(get_current_user)
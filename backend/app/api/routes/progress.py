@@ -1,11 +1,17 @@
 # backend/app/api/routes/progress.py
 
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List
 from datetime import date, datetime
 from ...schemas.progress import ProgressCreate, ProgressRead
 from ...services import progress_service
 from ...core.auth import get_current_user
+from ...core.conditional import cache_validated
+from ...core.log import Lazy
+from ...core.responses import trusted_list_response
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/progress", tags=["progress"])
 
@@ -17,23 +23,24 @@ async def create_progress(payload: ProgressCreate, user=Depends(get_current_user
     data = payload.model_dump()
     if isinstance(data.get("recorded_at"), (date, datetime)):
         data["recorded_at"] = data["recorded_at"].isoformat()
-    print("progress post data:", data)
+    logger.debug("Creating progress record for user %s (fields: %s)", user["id"], Lazy(lambda: ",".join(sorted(data))))
     try:
         return await progress_service.insert_progress(user["id"], data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/", response_model=List[ProgressRead])
+@router.get("/", response_model=List[ProgressRead], dependencies=[cache_validated("progress")])
 async def list_progress(skip: int = 0, limit: int = 50, user=Depends(get_current_user)):
     """
     List all progress records for the current user, with pagination.
     """
     try:
-        return await progress_service.fetch_progress(user["id"], skip=skip, limit=limit)
+        rows = await progress_service.fetch_progress(user["id"], skip=skip, limit=limit)
+        return trusted_list_response(ProgressRead, rows)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/{progress_id}", response_model=ProgressRead)
+@router.get("/{progress_id}", response_model=ProgressRead, dependencies=[cache_validated("progress")])
 async def get_progress(progress_id: str, user=Depends(get_current_user)):
     """
     Retrieve a single progress record by ID for the current user.
@@ -1,49 +1,25 @@
-# backend/routers/recommendations.py
+# backend/app/api/routes/recommendations.py
 from fastapi import APIRouter, Depends, HTTPException, Query
-from app.services.workout_service import fetch_workouts
-from app.services.meal_service import get_rolling_averages  # New helper
-from .profile import get_profile as fetch_profile
 from app.core.auth import get_current_user
-from app.ai.recommender import generate_recommendation_for_exercise
+from app.core.conditional import cache_validated
+from app.services.recommendation_service import build_recommendations
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
-@router.get("/")
+@router.get("/", dependencies=[cache_validated("workouts", "meals", "profile", per_day=True)])
 async def get_recommendations(
     nutrition_window_days: int = Query(14, ge=3, le=60),
+    limit: int = Query(5, ge=1, le=20, description="Number of exercises to cover"),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Returns AI-driven training/nutrition/recovery recommendations.
-    Integrates rolling averages from meal logs and workout history.
+    Returns training recommendations for the user's top exercises (trend
+    metrics + rule table), adjusted for and alongside rolling nutrition.
     """
-    user_id = current_user["sub"]
-
-    # --- Fetch user data ---
-    workouts = await fetch_workouts(user_id)
-    if not workouts:
-        raise HTTPException(status_code=404, detail="No workouts found")
-
-    profile = await fetch_profile(user_id)
-    if not profile:
-        raise HTTPException(status_code=404, detail="User profile not found")
-
-    rolling_averages = await get_rolling_averages(user_id, window_days=nutrition_window_days)
-
-    body_weight = profile.get("weight") or 70.0  # fallback
-    maintenance_calories = profile.get("maintenance_calories") or (body_weight * 32)  # rough TDEE estimate
-
-    result = generate_recommendation_for_exercise(
-        workouts=workouts,
-        rolling_averages=rolling_averages,
-        body_weight=body_weight,
-        maintenance_calories=maintenance_calories,
+    result = await build_recommendations(
+        current_user["id"], current_user.get("email"),
+        window_days=nutrition_window_days, limit=limit,
     )
-
-    return {
-        "user_id": user_id,
-        "nutrition_window_days": nutrition_window_days,
-        **result,
-    }
-
-
+    if result is None:
+        raise HTTPException(status_code=404, detail="No workouts found")
+    return result
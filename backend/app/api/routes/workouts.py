@@ -1,9 +1,14 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.services import workout_service
 from app.core.auth import get_current_user
+from app.core.conditional import cache_validated
+from app.core.responses import trusted_list_response
 from typing import List
 from app.schemas.workout import WorkoutCreate, WorkoutResponse, WorkoutUpdate
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/workouts", tags=["workouts"])
 
 
@@ -12,8 +17,7 @@ async def log_workout(workout: WorkoutCreate, user: dict = Depends(get_current_u
     """
     Log a new workout for the authenticated user.
     """
-    print("Logging workout for user:", user)
-    print("Workout data:", workout.model_dump())
+    logger.debug("Logging workout for user %s: %s", user["id"], workout.exercise_name)
     try:
         return await workout_service.insert_workout(user["id"], workout.model_dump())
     except Exception as e:
@@ -25,7 +29,7 @@ from fastapi import Query
 
 
 # Support both /workouts/ and /workouts (no trailing slash)
-@router.get("/", response_model=List[WorkoutResponse])
+@router.get("/", response_model=List[WorkoutResponse], dependencies=[cache_validated("workouts")])
 async def get_workouts(
     user: dict = Depends(get_current_user),
     date_filter: str = Query(None, description="Filter workouts by date (YYYY-MM-DD)")
@@ -33,13 +37,14 @@ async def get_workouts(
     """
     Fetch all workouts for the authenticated user, optionally filtered by date.
     """
-    print("Fetching workouts for user:", user["id"], "with date_filter:", date_filter)
+    logger.debug("Fetching workouts for user %s with date_filter=%s", user["id"], date_filter)
     try:
-        return await workout_service.fetch_workouts(user["id"], date_filter)
+        rows = await workout_service.fetch_workouts(user["id"], date_filter)
+        return trusted_list_response(WorkoutResponse, rows)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{workout_id}", response_model=WorkoutResponse)
+@router.get("/{workout_id}", response_model=WorkoutResponse, dependencies=[cache_validated("workouts")])
 async def get_workout(workout_id: str, user: dict = Depends(get_current_user)):
     """
     Fetch a single workout by ID for the authenticated user.
@@ -0,0 +1,141 @@
+# backend/app/core/analytics.py
+"""
+Keeps CPU-bound analytics (NumPy / pandas) off the uvicorn event loop.
+
+run_analytics() picks where a function runs from the size of its input:
+  - below ANALYTICS_THREAD_MIN_ROWS: inline (a pool hand-off costs more than it saves)
+  - kind="numpy": thread pool — vectorized NumPy releases the GIL
+  - kind="python": process pool above ANALYTICS_PROCESS_MIN_ROWS (pure-Python /
+    pandas object work holds the GIL, so a thread would still stall the loop);
+    the thread pool in between. Functions and arguments must be picklable.
+    Pool processes are started with forkserver (spawn where unavailable):
+    forking this multi-threaded server (loop-lag monitor, trace exporter,
+    log listener, invalidation thread) could copy a lock some other
+    thread holds into the child.
+
+LoopLagMonitor measures how late the loop wakes up from a fixed sleep, which
+is the delay every other request in the worker sees.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import Gauge
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+NUMPY = "numpy"
+PYTHON = "python"
+
+_threads: Optional[ThreadPoolExecutor] = None
+_processes: Optional[ProcessPoolExecutor] = None
+
+
+def _thread_pool() -> ThreadPoolExecutor:
+    global _threads
+    if _threads is None:
+        _threads = ThreadPoolExecutor(max_workers=settings.ANALYTICS_THREAD_WORKERS,
+                                      thread_name_prefix="analytics")
+    return _threads
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _processes
+    if _processes is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _processes = ProcessPoolExecutor(max_workers=settings.ANALYTICS_PROCESS_WORKERS,
+                                         mp_context=multiprocessing.get_context(method))
+    return _processes
+
+
+def choose_pool(size: int, kind: str = NUMPY) -> Optional[str]:
+    """'thread', 'process' or None (inline) for an input of `size` rows."""
+    if size < settings.ANALYTICS_THREAD_MIN_ROWS:
+        return None
+    if kind == PYTHON and settings.ANALYTICS_PROCESS_WORKERS > 0 and size >= settings.ANALYTICS_PROCESS_MIN_ROWS:
+        return "process"
+    return "thread"
+
+
+async def run_analytics(fn: Callable[..., Any], *args: Any, size: int, kind: str = NUMPY, **kwargs: Any) -> Any:
+    """Run `fn(*args, **kwargs)` inline or on the pool chosen for `size` / `kind`."""
+    pool = choose_pool(size, kind)
+    with span(f"analytics.{getattr(fn, '__name__', 'call')}", pool=pool or "inline", size=size):
+        if pool is None:
+            return fn(*args, **kwargs)
+        executor = _process_pool() if pool == "process" else _thread_pool()
+        return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown() -> None:
+    global _threads, _processes
+    if _threads is not None:
+        _threads.shutdown(wait=False, cancel_futures=True)
+        _threads = None
+    if _processes is not None:
+        _processes.shutdown(wait=False, cancel_futures=True)
+        _processes = None
+
+
+# ------------------------------------------------------------------------------
+# Event-loop lag
+# ------------------------------------------------------------------------------
+
+class LoopLagMonitor:
+    """Sleeps `interval` seconds in a loop and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.25, warn_ms: float = 100.0, alpha: float = 0.1):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.alpha = alpha
+        self.last_ms = 0.0
+        self.ewma_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, lag_ms: float) -> None:
+        self.last_ms = lag_ms
+        self.ewma_ms = lag_ms if self.samples == 0 else self.ewma_ms + self.alpha * (lag_ms - self.ewma_ms)
+        self.max_ms = max(self.max_ms, lag_ms)
+        self.samples += 1
+        if lag_ms >= self.warn_ms:
+            logger.warning(f"Event loop lag {lag_ms:.1f} ms (blocking work on the loop?)")
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max((time.perf_counter() - started - self.interval) * 1000.0, 0.0))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, float]:
+        return {"last_ms": round(self.last_ms, 3), "ewma_ms": round(self.ewma_ms, 3),
+                "max_ms": round(self.max_ms, 3), "samples": self.samples}
+
+
+loop_lag = LoopLagMonitor(settings.LOOP_LAG_INTERVAL_SEC, settings.LOOP_LAG_WARN_MS)
+
+LOOP_LAG = Gauge(
+    "event_loop_lag_seconds", "Event-loop wake-up delay (last sample, EWMA, max since start).", ("stat",),
+    fn=lambda: {("last",): loop_lag.last_ms / 1000.0, ("ewma",): loop_lag.ewma_ms / 1000.0,
+                ("max",): loop_lag.max_ms / 1000.0},
+)
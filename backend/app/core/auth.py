@@ -6,6 +6,8 @@ from jwt import PyJWKClient
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from app.core.config import settings
+from app.core.executors import offload
+from app.core.tracing import traced
 
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
@@ -62,6 +64,8 @@ def _diagnose_token(jwt_token: str):
     except Exception as e:
         logger.warning("AUTH DIAG: failed to inspect JWT: %s", e)
 
+@offload("auth")
+@traced()
 def get_current_user(token = Depends(security)):
     """
     Validate Supabase JWT (ES256 or RS256) and extract user info.
@@ -0,0 +1,109 @@
+# backend/app/core/compression.py
+"""
+Pure-ASGI response compression negotiated from Accept-Encoding.
+
+Uses brotli when the client accepts `br` and the optional `brotli`
+package is installed, and gzip otherwise. Only single-message bodies of
+at least COMPRESSION_MIN_SIZE bytes are compressed, which covers every
+JSON endpoint. Streaming responses, bodies that are already encoded,
+and small bodies pass through untouched. A strong ETag on a compressed
+response gets a "-gzip"/"-br" suffix (app/core/conditional.py strips it
+when matching If-None-Match).
+"""
+import gzip
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" / "gzip" from an Accept-Encoding value (q=0 excludes a coding)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = None
+        for k, v in scope["headers"]:
+            if k == b"accept-encoding":
+                encoding = choose_encoding(v.decode("latin-1"))
+                break
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                return await send(message)
+            if start is None:  # body already started (shouldn't happen); don't touch it
+                return await send(message)
+
+            body = message.get("body", b"")
+            headers: Headers = list(start.get("headers", ()))
+            already_encoded = any(k.lower() == b"content-encoding" for k, _ in headers)
+            if message.get("more_body") or already_encoded or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                return await send(message)
+
+            body = compress(body, encoding)
+            out, vary = [], b"Accept-Encoding"
+            for k, v in headers:
+                lk = k.lower()
+                if lk == b"content-length":
+                    continue
+                if lk == b"vary":
+                    vary = v + b", Accept-Encoding"
+                    continue
+                if lk == b"etag" and v.endswith(b'"'):  # strong ETags are per representation
+                    v = v[:-1] + b"-" + encoding.encode() + b'"'
+                out.append((k, v))
+            out += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", vary),
+            ]
+            await send({**start, "headers": out})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
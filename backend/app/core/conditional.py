@@ -0,0 +1,182 @@
+# backend/app/core/conditional.py
+"""
+Conditional GETs (ETag / Last-Modified -> 304) from per-user data versions.
+
+Every user has a version token per data domain (workouts, meals, progress,
+profile). The write paths bump it (workout_service hook, meals routes,
+progress_service, profile PUT). A read route declares which domains its
+payload depends on:
+
+    @router.get("/", dependencies=[cache_validated("workouts")])
+
+The dependency runs right after auth, before the route body, so a
+matching If-None-Match (or If-Modified-Since) becomes a 304 without any
+Supabase query or LLM call. Otherwise the ETag, Last-Modified and the
+route's Cache-Control are put on the 200 response by
+ConditionalHeadersMiddleware. This works even when the route returns a
+Response object itself.
+
+The ETag hashes the path, the query string, the domain tokens, and the
+day for routes that depend on today's date. Tokens live in this process
+and start from a random per-process epoch, so another worker never
+matches them. A write handled by another worker is only seen here when
+it is broadcast: with DATABASE_URL set, bumps go to every worker
+(app/core/invalidation.py), which drop their token right away, and tokens
+live for ETAG_VERSION_TTL_SEC. The same lifetime applies to a single
+worker (WEB_CONCURRENCY=1). Otherwise another worker's write can go
+unnoticed until the token expires, so tokens only live for
+ETAG_UNSYNCED_TTL_SEC (a few seconds).
+"""
+import hashlib
+import itertools
+import os
+import time
+from collections import OrderedDict
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request
+
+from app.core.auth import get_current_user
+from app.core import invalidation
+from app.core.config import settings
+
+DOMAINS = ("workouts", "meals", "progress", "profile")
+
+# Cache-Control policies
+REVALIDATE = "private, no-cache"                    # always ask; cheap 304 when unchanged
+SHORT_LIVED = "private, max-age=60, must-revalidate"  # expensive, slow-changing (AI suggestions)
+
+_MAX_ENTRIES = 50_000
+_EPOCH = os.urandom(4).hex()
+_counter = itertools.count(1)
+_versions: "OrderedDict[Tuple[str, str], Tuple[str, int, float]]" = OrderedDict()  # -> (token, last_modified, expires_at)
+
+
+def token_ttl() -> float:
+    """Token lifetime: long only when no write can bypass this worker's tokens."""
+    if invalidation.enabled() or settings.WEB_CONCURRENCY == 1:
+        return settings.ETAG_VERSION_TTL_SEC
+    return min(settings.ETAG_UNSYNCED_TTL_SEC, settings.ETAG_VERSION_TTL_SEC)
+
+
+def _mint(key: Tuple[str, str], last_modified: int) -> Tuple[str, int, float]:
+    entry = (f"{_EPOCH}.{next(_counter)}", last_modified, time.monotonic() + token_ttl())
+    _versions[key] = entry
+    _versions.move_to_end(key)
+    while len(_versions) > _MAX_ENTRIES:
+        _versions.popitem(last=False)
+    return entry
+
+
+def _entry(user_id: str, domain: str) -> Tuple[str, int, float]:
+    key = (user_id, domain)
+    entry = _versions.get(key)
+    if entry is None or entry[2] < time.monotonic():
+        return _mint(key, int(time.time()))
+    return entry
+
+
+def bump(user_id: str, *domains: str) -> None:
+    """Call after a write: every cached representation of these domains is now stale."""
+    now = int(time.time())
+    for domain in domains:
+        prev = _versions.get((user_id, domain))
+        # Last-Modified has 1 s resolution; never reuse the previous second
+        _mint((user_id, domain), max(now, prev[1] + 1) if prev else now)
+        invalidation.publish("data_version", f"{user_id}|{domain}")
+
+
+def _drop(key: str) -> None:
+    """Another worker bumped this (user, domain): forget our token so the next read mints a new one."""
+    user_id, _, domain = key.rpartition("|")
+    _versions.pop((user_id, domain), None)
+
+
+invalidation.subscribe("data_version", _drop)
+
+
+def validators(user_id: str, domains: Tuple[str, ...], basis: str) -> Tuple[str, int]:
+    """(strong ETag, Last-Modified epoch seconds) for this user's view of `domains`."""
+    entries = [_entry(user_id, d) for d in domains]
+    raw = "|".join([basis, user_id] + [e[0] for e in entries])
+    etag = '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+    return etag, max(e[1] for e in entries)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        # CompressionMiddleware tags encoded representations ("<etag>-gzip")
+        for suffix in ('-gzip"', '-br"'):
+            if candidate.endswith(suffix):
+                candidate = candidate[: -len(suffix)] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, last_modified: int) -> bool:
+    try:
+        return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def cache_validated(*domains: str, cache_control: str = REVALIDATE, per_day: bool = False):
+    """Route dependency: 304 on a matching validator, else tag the 200 with ETag/Last-Modified/Cache-Control."""
+    unknown = set(domains) - set(DOMAINS)
+    if unknown:
+        raise ValueError(f"Unknown data domains: {sorted(unknown)}")
+
+    async def dependency(request: Request, current_user: dict = Depends(get_current_user)) -> None:
+        basis = f"{request.url.path}?{request.url.query}"
+        if per_day:
+            basis += f"|{date.today().isoformat()}"
+        etag, last_modified = validators(current_user["id"], domains, basis)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Cache-Control": cache_control,
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            fresh = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            fresh = bool(if_modified_since) and _not_modified_since(if_modified_since, last_modified)
+        if fresh:
+            raise HTTPException(status_code=304, headers=headers)
+        request.state.cache_headers = headers
+
+    return Depends(dependency)
+
+
+class ConditionalHeadersMiddleware:
+    """Copies the validators set by cache_validated onto successful responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                cache_headers: Optional[Dict[str, str]] = scope.get("state", {}).get("cache_headers")
+                if cache_headers:
+                    names = {k.lower().encode() for k in cache_headers}
+                    headers: List[Tuple[bytes, bytes]] = [
+                        (k, v) for k, v in message.get("headers", ()) if k.lower() not in names
+                    ]
+                    headers += [(k.lower().encode(), v.encode("latin-1")) for k, v in cache_headers.items()]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
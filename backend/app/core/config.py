@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 import os 
 
 class Settings(BaseSettings):
@@ -8,6 +9,96 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
 
+    # Materialize 4/8/12-session rolling summaries on every workout write
+    ROLLING_SUMMARY_PERSIST: bool = False
+    # Keep per-exercise running trend statistics in exercise_trend_stats
+    TREND_STATS_PERSIST: bool = False
+    # Serve /ai/next-workout from recommendations_cache (app.jobs.precompute_recommendations)
+    RECOMMENDATIONS_CACHE: bool = False
+
+    # Analytics offload (app/core/analytics.py): inline below THREAD_MIN_ROWS,
+    # process pool for pure-Python/pandas work from PROCESS_MIN_ROWS (0 workers = never)
+    ANALYTICS_THREAD_MIN_ROWS: int = 200
+    ANALYTICS_PROCESS_MIN_ROWS: int = 5000
+    ANALYTICS_THREAD_WORKERS: int = 4
+    ANALYTICS_PROCESS_WORKERS: int = 2
+    LOOP_LAG_INTERVAL_SEC: float = 0.25
+    LOOP_LAG_WARN_MS: float = 100.0
+
+    # Tracing (app/core/tracing.py): "none" | "console" | "file"
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE: str = "traces.jsonl"
+    TRACE_SAMPLE_RATE: float = 0.1
+
+    # Isolated thread pools for blocking work (app/core/executors.py); DEFAULT = AnyIO's shared limiter
+    THREADPOOL_AUTH: int = 8
+    THREADPOOL_CRUD: int = 24
+    THREADPOOL_ANALYTICS: int = 8
+    THREADPOOL_DEFAULT: int = 40
+
+    # Request profiler (app/core/profiling.py): installed only when PROFILE_DIR is set
+    PROFILE_DIR: Optional[str] = None
+    PROFILE_ADMIN_TOKEN: Optional[str] = None
+    PROFILE_SAMPLE_RATE: float = 0.0
+
+    # Response compression (app/core/compression.py); brotli needs the optional `brotli` package
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 5
+    BROTLI_QUALITY: int = 4
+
+    # Direct Postgres DSN; enables cross-worker cache invalidation via LISTEN/NOTIFY
+    DATABASE_URL: Optional[str] = None
+
+    # Per-user data version tokens behind ETags (app/core/conditional.py): lifetime when every worker
+    # sees every write (invalidation broadcast on, or a single worker), and the short lifetime otherwise
+    ETAG_VERSION_TTL_SEC: int = 300
+    ETAG_UNSYNCED_TTL_SEC: float = 5.0
+    # Worker processes per instance (uvicorn / gunicorn read the same variable); 0 = unknown
+    WEB_CONCURRENCY: int = 0
+
+    # Request deadlines (app/core/deadline.py): default budget, cap on X-Request-Timeout,
+    # and the LLM latency assumed until real calls have been observed
+    REQUEST_TIMEOUT_SEC: float = 30.0
+    REQUEST_TIMEOUT_MAX_SEC: float = 60.0
+    LLM_EXPECTED_LATENCY_SEC: float = 3.0
+
+    # Shared OpenAI client (app/ai/llm_client.py): timeouts, keep-alive pool, HTTP/2 (needs `h2`),
+    # and hedging past the observed LLM_HEDGE_QUANTILE latency
+    LLM_CONNECT_TIMEOUT_SEC: float = 5.0
+    LLM_READ_TIMEOUT_SEC: float = 30.0
+    LLM_MAX_CONNECTIONS: int = 32
+    LLM_MAX_KEEPALIVE: int = 16
+    LLM_KEEPALIVE_EXPIRY_SEC: float = 60.0
+    LLM_HTTP2: bool = False
+    LLM_HEDGE: bool = True
+    LLM_HEDGE_QUANTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    # LLM priority dispatcher (app/ai/llm_dispatcher.py): calls in flight in total and per class;
+    # a call queued this long is served next regardless of class weight
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_CONCURRENCY_INTERACTIVE: int = 16
+    LLM_CONCURRENCY_PREFETCH: int = 8
+    LLM_CONCURRENCY_BATCH: int = 4
+    LLM_STARVATION_SEC: float = 10.0
+    # Prompt token budgets (app/ai/prompts.py estimate): per-exercise enrichment / full-history advice
+    LLM_PROMPT_TOKEN_BUDGET: int = 600
+    LLM_ADVISOR_PROMPT_TOKEN_BUDGET: int = 3000
+
+    # Per-user token buckets on expensive routes (app/core/rate_limit.py): "memory" | "supabase"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_PER_MIN: float = 30.0
+    RATE_LIMIT_BURST: float = 20.0
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # Browsers may cache CORS preflight responses for this many seconds
+    CORS_MAX_AGE: int = 600
+
+    # Logging (app/core/log.py): "json" | "text"; LOG_SAMPLING="app.services=0.1,app.api=0.05"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLING: str = ""
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
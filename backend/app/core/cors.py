@@ -0,0 +1,103 @@
+# backend/app/core/cors.py
+"""
+Pure-ASGI CORS middleware.
+
+Origins are matched against a frozenset of exact origins, then one
+precompiled regex (e.g. the Codespaces pattern). Allowed origins are
+reflected with credentials, so responses carry `Vary: Origin`.
+
+Preflights (OPTIONS) are answered here without touching the app. The
+header block for each allowed origin is built once and cached, and
+carries Access-Control-Max-Age so browsers stop re-sending preflights for
+that long.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+ALLOW_HEADERS = "Authorization,Content-Type,X-Request-Timeout"
+EXPOSE_HEADERS = "X-Skipped-Stages"
+ALLOW_METHODS = "GET,POST,PUT,PATCH,DELETE,OPTIONS"
+_PREFLIGHT_CACHE_SIZE = 256
+
+
+class OriginMatcher:
+    def __init__(self, origins: Iterable[str], origin_regex: Optional[str] = None):
+        self.exact = frozenset(origins)
+        self.regex = re.compile(origin_regex) if origin_regex else None
+
+    def __call__(self, origin: str) -> bool:
+        if origin in self.exact:
+            return True
+        return bool(self.regex and self.regex.fullmatch(origin))
+
+
+class CORSMiddleware:
+    def __init__(self, app, origins: Iterable[str], origin_regex: Optional[str] = None, max_age: int = 600):
+        self.app = app
+        self.allowed = OriginMatcher(origins, origin_regex)
+        self._preflight_tail: Headers = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-allow-headers", ALLOW_HEADERS.encode()),
+            (b"access-control-allow-methods", ALLOW_METHODS.encode()),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"vary", b"Origin"),
+            (b"content-length", b"0"),
+        ]
+        self._preflights: Dict[bytes, Headers] = {}
+
+    def _preflight_headers(self, origin: bytes) -> Headers:
+        headers = self._preflights.get(origin)
+        if headers is None:
+            headers = [(b"access-control-allow-origin", origin)] + self._preflight_tail
+            if len(self._preflights) >= _PREFLIGHT_CACHE_SIZE:
+                self._preflights.clear()
+            self._preflights[origin] = headers
+        return headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        origin = None
+        for k, v in scope["headers"]:
+            if k == b"origin":
+                origin = v
+                break
+        allowed = origin is not None and self.allowed(origin.decode("latin-1"))
+
+        if scope["method"] == "OPTIONS":
+            if allowed:
+                await send({"type": "http.response.start", "status": 200, "headers": self._preflight_headers(origin)})
+                await send({"type": "http.response.body", "body": b""})
+            else:
+                body = b"CORS origin not allowed"
+                await send({"type": "http.response.start", "status": 400, "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                ]})
+                await send({"type": "http.response.body", "body": body})
+            return
+
+        if not allowed:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                headers, vary = [], b"Origin"
+                for k, v in message.get("headers", ()):
+                    if k.lower() == b"vary":
+                        vary = v + b", Origin"
+                    else:
+                        headers.append((k, v))
+                headers += [
+                    (b"access-control-allow-origin", origin),
+                    (b"access-control-allow-credentials", b"true"),
+                    (b"access-control-expose-headers", EXPOSE_HEADERS.encode()),
+                    (b"vary", vary),
+                ]
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,193 @@
+# backend/app/core/deadline.py
+"""
+Per-request deadlines carried through context vars.
+
+DeadlineMiddleware gives every request a time budget: the X-Request-Timeout
+header (seconds) when present, else REQUEST_TIMEOUT_SEC, and never more
+than REQUEST_TIMEOUT_MAX_SEC. A route can tighten its own budget:
+
+    @router.get("/next-workout", dependencies=[deadline_budget(8.0)])
+
+The budget follows the request into gathered tasks and pool threads
+(context vars are copied), so any stage can ask how much time is left:
+
+    if not deadline.has_budget(LLM_LATENCY.value):
+        deadline.skip("llm")            # degrade, don't start what can't finish
+    deadline.check("supabase workouts.select")   # raise DeadlineExceeded instead
+
+Skipped stages are collected per request and returned in the
+X-Skipped-Stages response header. Routes can also add them to the body.
+DeadlineExceeded becomes a 504 (exception handler in main.py). Code
+running outside a request (jobs, CLI) has no deadline, and every check
+passes. Work that must finish once started (the derived-data updates
+after a committed workout write) runs inside `suspended()`.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from fastapi import Depends, Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"x-request-timeout"
+SKIPPED_HEADER = b"x-skipped-stages"
+
+
+class DeadlineExceeded(Exception):
+    """A stage that cannot degrade ran out of request budget."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded before {stage}")
+        self.stage = stage
+
+
+class _Budget:
+    __slots__ = ("expires_at", "skipped")
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at   # time.monotonic()
+        self.skipped: List[str] = []
+
+
+_budget: ContextVar[Optional[_Budget]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request (None = no deadline)."""
+    b = _budget.get()
+    return None if b is None else b.expires_at - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def has_budget(seconds: float) -> bool:
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def check(stage: str) -> None:
+    if expired():
+        skip(stage)
+        raise DeadlineExceeded(stage)
+
+
+def skip(stage: str) -> None:
+    """Record a stage dropped for lack of budget (shows up in X-Skipped-Stages)."""
+    b = _budget.get()
+    if b is not None and stage not in b.skipped:
+        b.skipped.append(stage)
+    s = current_span()
+    if s is not None:
+        s.add_event("deadline.skip", stage=stage, remaining=remaining())
+    logger.debug("Deadline: skipped %s (%.3fs left)", stage, remaining() or 0.0)
+
+
+def skipped_stages() -> List[str]:
+    b = _budget.get()
+    return list(b.skipped) if b is not None else []
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Run a block under a fresh deadline (tests, jobs that want one)."""
+    token = _budget.set(_Budget(time.monotonic() + seconds))
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+@contextmanager
+def suspended() -> Iterator[None]:
+    """Run a block with no deadline, e.g. follow-up writes that must not stop halfway."""
+    token = _budget.set(None)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+def tighten(seconds: float) -> None:
+    """Shorten the current deadline to at most `seconds` from now."""
+    b = _budget.get()
+    expires_at = time.monotonic() + seconds
+    if b is None:
+        _budget.set(_Budget(expires_at))
+    elif expires_at < b.expires_at:
+        b.expires_at = expires_at
+
+
+def deadline_budget(seconds: float):
+    """Route dependency: cap this route's budget (a client header can only shorten it further)."""
+    async def dependency() -> None:   # async: runs in the request's own context
+        tighten(seconds)
+    return Depends(dependency)
+
+
+class LatencyEstimate:
+    """Smoothed latency of a stage (EWMA), used as its expected cost."""
+
+    def __init__(self, initial: float, alpha: float = 0.2):
+        self.value = initial
+        self.alpha = alpha
+
+    def observe(self, seconds: float) -> None:
+        self.value += self.alpha * (seconds - self.value)
+
+
+def parse_timeout(value: Optional[str]) -> float:
+    """X-Request-Timeout -> budget in seconds, clamped to (0, REQUEST_TIMEOUT_MAX_SEC]."""
+    budget = settings.REQUEST_TIMEOUT_SEC
+    if value:
+        try:
+            requested = float(value)
+        except ValueError:
+            requested = 0.0
+        if requested > 0:
+            budget = requested
+    return min(budget, settings.REQUEST_TIMEOUT_MAX_SEC)
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded) -> JSONResponse:
+    return JSONResponse(status_code=504, content={"detail": str(exc), "skipped_stages": skipped_stages()})
+
+
+class DeadlineMiddleware:
+    """Starts the request budget and reports skipped stages on the response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        header = None
+        for k, v in scope.get("headers", ()):
+            if k == HEADER:
+                header = v.decode("latin-1")
+                break
+        budget = _Budget(time.monotonic() + parse_timeout(header))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and budget.skipped:
+                headers = list(message.get("headers", ()))
+                headers.append((SKIPPED_HEADER, ",".join(budget.skipped).encode("latin-1", "replace")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _budget.set(budget)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _budget.reset(token)
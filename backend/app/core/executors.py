@@ -0,0 +1,110 @@
+# backend/app/core/executors.py
+"""
+Isolated thread capacity for blocking work.
+
+FastAPI runs every sync `def` handler and dependency on AnyIO's single
+default limiter (40 threads). A burst of slow meals queries can then hold
+every thread and leave JWT verification for all other routes waiting.
+Blocking work is split into named pools, each with its own CapacityLimiter:
+
+    auth       get_current_user (JWKS lookup + signature check)
+    crud       Supabase reads/writes from handlers and services
+    analytics  nutrition aggregations and other heavy sync handlers
+
+    @router.get("/meals")
+    @offload("crud")                # sync handler, runs under the crud limiter
+    def list_meals(...): ...
+
+    rows = await run_sync("crud", query.execute)
+
+Sizes come from THREADPOOL_<POOL>, and THREADPOOL_DEFAULT resizes AnyIO's
+default limiter for whatever still uses it. The time each call waits for
+a thread is recorded in threadpool_queue_wait_seconds{pool}, and
+threadpool_threads{pool, state} reports busy, waiting and capacity.
+(CPU-bound NumPy/pandas work goes through app/core/analytics.py, which
+has its own executors.)
+"""
+import asyncio
+import functools
+import time
+import weakref
+from typing import Any, Callable, Dict, TypeVar
+
+import anyio
+import anyio.to_thread
+from anyio import CapacityLimiter
+
+from app.core.config import settings
+from app.core.metrics import Gauge, Histogram, LabelValues
+
+T = TypeVar("T")
+
+POOLS = ("auth", "crud", "analytics")
+
+# Queue waits are normally ~0; the interesting range is ms to seconds.
+QUEUE_WAIT = Histogram("threadpool_queue_wait_seconds", "Time a blocking call waited for a pool thread.",
+                       ("pool",), buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+
+# Limiters are bound to the event loop that created them (one per worker, one per test loop).
+_limiters: "weakref.WeakKeyDictionary[Any, Dict[str, CapacityLimiter]]" = weakref.WeakKeyDictionary()
+_current: Dict[str, CapacityLimiter] = {}
+
+
+def pool_size(pool: str) -> int:
+    return int(getattr(settings, f"THREADPOOL_{pool.upper()}"))
+
+
+def limiter(pool: str) -> CapacityLimiter:
+    if pool not in POOLS:
+        raise ValueError(f"Unknown thread pool {pool!r}")
+    loop = asyncio.get_running_loop()
+    pools = _limiters.get(loop)
+    if pools is None:
+        pools = _limiters[loop] = {}
+    lim = pools.get(pool)
+    if lim is None:
+        lim = pools[pool] = CapacityLimiter(pool_size(pool))
+        _current[pool] = lim
+    return lim
+
+
+def _thread_stats() -> Dict[LabelValues, float]:
+    out: Dict[LabelValues, float] = {}
+    for pool, lim in list(_current.items()):
+        out[(pool, "busy")] = lim.borrowed_tokens
+        out[(pool, "waiting")] = lim.statistics().tasks_waiting
+        out[(pool, "capacity")] = lim.total_tokens
+    return out
+
+
+THREADS = Gauge("threadpool_threads", "Pool threads by state (busy / waiting / capacity).", ("pool", "state"),
+                fn=_thread_stats)
+
+
+async def run_sync(pool: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on `pool`'s threads (context vars, e.g. the trace span, are carried over)."""
+    submitted = time.perf_counter()
+
+    def call() -> T:
+        QUEUE_WAIT.observe(time.perf_counter() - submitted, pool)
+        return fn(*args, **kwargs)
+
+    return await anyio.to_thread.run_sync(call, limiter=limiter(pool))
+
+
+def offload(pool: str):
+    """Decorator: sync handler / dependency -> async one that runs under `pool`'s limiter."""
+    if pool not in POOLS:
+        raise ValueError(f"Unknown thread pool {pool!r}")
+
+    def decorate(fn: Callable[..., T]) -> Callable[..., Any]:
+        @functools.wraps(fn)  # FastAPI reads the parameters through __wrapped__
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await run_sync(pool, fn, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def configure_default_limiter() -> None:
+    """Resize AnyIO's default limiter (startup, inside the running loop)."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_DEFAULT
@@ -0,0 +1,126 @@
+# backend/app/core/invalidation.py
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+In-process caches (profiles, data versions, ...) subscribe a handler per
+kind. A write publishes (kind, key), and every other worker runs the
+handler for that key:
+
+    invalidation.subscribe("profile", _cache.pop_user)
+    invalidation.publish("profile", user_id)
+
+Only active when DATABASE_URL (a direct Postgres DSN) is set; otherwise
+publish() is a no-op and each worker relies on its TTLs. A single daemon
+thread owns the psycopg2 connection. It LISTENs, sends queued NOTIFYs,
+and hands received keys to the event loop with call_soon_threadsafe, so
+publish() never blocks the request path. The connection is re-opened
+with backoff if it drops.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import select
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "fitfusion_invalidate"
+ORIGIN = os.urandom(6).hex()  # this worker; its own notifications are ignored
+
+_handlers: Dict[str, List[Callable[[str], None]]] = {}
+_outbox: "queue.SimpleQueue[Optional[Tuple[str, str]]]" = queue.SimpleQueue()
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def subscribe(kind: str, handler: Callable[[str], None]) -> None:
+    _handlers.setdefault(kind, []).append(handler)
+
+
+def enabled() -> bool:
+    return _thread is not None
+
+
+def publish(kind: str, key: str) -> None:
+    """Tell the other workers that `key` of `kind` changed (no-op without DATABASE_URL)."""
+    if _thread is not None:
+        _outbox.put((kind, key))
+
+
+def _dispatch(kind: str, key: str) -> None:
+    for handler in _handlers.get(kind, ()):
+        try:
+            handler(key)
+        except Exception as e:
+            logger.warning("Invalidation handler for %s failed: %s", kind, e)
+
+
+def _run(loop: asyncio.AbstractEventLoop) -> None:
+    import psycopg2  # only needed when DATABASE_URL is configured
+
+    backoff = 1.0
+    while not _stop.is_set():
+        conn = None
+        try:
+            conn = psycopg2.connect(settings.DATABASE_URL)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            logger.info("Listening for cache invalidations on %s", CHANNEL)
+            backoff = 1.0
+            while not _stop.is_set():
+                if select.select([conn], [], [], 0.2) != ([], [], []):
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        try:
+                            msg = json.loads(note.payload)
+                        except ValueError:
+                            continue
+                        if msg.get("origin") != ORIGIN:
+                            loop.call_soon_threadsafe(_dispatch, msg.get("kind"), msg.get("key"))
+                while True:
+                    try:
+                        item = _outbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        return
+                    payload = json.dumps({"origin": ORIGIN, "kind": item[0], "key": item[1]})
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload))
+        except Exception as e:
+            logger.warning("Invalidation listener error (retrying in %.0fs): %s", backoff, e)
+            _stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+def start() -> None:
+    """Start the listener thread (app startup, inside the running loop)."""
+    global _thread
+    if _thread is not None or not settings.DATABASE_URL:
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, args=(asyncio.get_running_loop(),), name="cache-invalidation", daemon=True)
+    _thread.start()
+
+
+def stop(timeout: float = 2.0) -> None:
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _outbox.put(None)
+    _thread.join(timeout)
+    _thread = None
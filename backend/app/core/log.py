@@ -0,0 +1,143 @@
+# backend/app/core/log.py
+"""
+Structured, sampled, non-blocking logging.
+
+setup_logging() routes the root logger through a QueueHandler: the request
+path only enqueues the LogRecord, and a QueueListener thread formats it
+(JSON lines or plain text) and writes it to stderr. Unlike the stdlib
+QueueHandler, records are not pre-formatted on the caller's thread, so
+%-style arguments stay lazy until the listener renders them:
+
+    logger.debug("Fetched %d workouts for user %s", len(rows), user_id)
+
+Per-logger sampling (LOG_SAMPLING="app.services=0.1,app.api=0.05") keeps
+that fraction of DEBUG/INFO records of the logger and its children;
+WARNING and above are never sampled out. Structured fields go in
+`extra={"fields": {...}}` and the current trace id is attached to every
+record.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.tracing import current_trace_id
+
+_listener: Optional[QueueListener] = None
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """"app.services=0.1,app.api=0.5" -> {"app.services": 0.1, "app.api": 0.5}"""
+    rates: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        name, sep, rate = part.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of the sub-WARNING records of each configured logger prefix."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate, probe = 1.0, name
+            while probe:
+                if probe in self.rates:
+                    rate = self.rates[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Enqueue the record as-is (no formatting on the caller's thread), tagged with the trace id."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.trace_id = current_trace_id()
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            payload["trace_id"] = trace_id
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class Lazy:
+    """Defers an expensive log argument until the record is actually rendered."""
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self._fn = fn
+
+    def __str__(self) -> str:
+        return str(self._fn())
+
+    __repr__ = __str__
+
+
+def setup_logging(stream=None) -> None:
+    """Idempotent: (re)install the queue handler on the root logger."""
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(stream or sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _LazyQueueHandler(q)
+    handler.addFilter(SamplingFilter(parse_sampling(settings.LOG_SAMPLING)))
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = QueueListener(q, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,287 @@
+# backend/app/core/metrics.py
+"""
+In-process metrics exposed at /metrics in the Prometheus text format (0.0.4).
+
+Counter / Gauge / Histogram keep their samples in plain dicts keyed by the
+label-value tuple; recording is a dict lookup plus a short lock, rendering
+happens only when /metrics is scraped. Label values are passed positionally
+in the order of `labelnames`:
+
+    HTTP_REQUESTS.inc("GET", "/api/workouts", "200")
+    SUPABASE_DURATION.observe(0.012, "workouts", "select")
+
+Metrics are per worker process; scrape each worker (or run one worker)
+as with any multi-process Python deployment.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a ~1 ms Supabase hit up to a slow LLM call.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+GaugeFn = Callable[[], Union[float, Dict[LabelValues, float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional["_Metric"]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in items]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+
+class Gauge(_Metric):
+    """Set/inc/dec gauge, or a callback gauge (`fn`) evaluated at scrape time."""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), fn: Optional[GaugeFn] = None,
+                 registry: Optional[Registry] = REGISTRY):
+        super().__init__(name, help, labelnames, registry)
+        self._fn = fn
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        if self._fn is None:
+            return super().samples()
+        try:
+            result = self._fn()
+        except Exception:
+            return []
+        if not isinstance(result, dict):
+            result = {(): result}
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in result.items()]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[Registry] = REGISTRY):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        out: List[str] = []
+        for key, counts, total, n in items:
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                le = 'le="' + _fmt(bound) + '"'
+                out.append(f"{self.name}_bucket{self._labels(key, le)} {running}")
+            out.append(f"{self.name}_sum{self._labels(key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{self._labels(key)} {n}")
+        return out
+
+
+class _Timer:
+    __slots__ = ("_hist", "_labels", "_start")
+
+    def __init__(self, hist: Histogram, labels: LabelValues):
+        self._hist = hist
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._hist.observe(time.perf_counter() - self._start, *self._labels)
+
+
+# ------------------------------------------------------------------------------
+# Shared metrics
+# ------------------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by method, route template and status.",
+                        ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency by method and route template.",
+                          ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+
+SUPABASE_DURATION = Histogram("supabase_request_duration_seconds", "Supabase (PostgREST) call latency.",
+                              ("table", "operation"))
+SUPABASE_ERRORS = Counter("supabase_request_errors_total", "Supabase calls that raised.", ("table", "operation"))
+
+OPENAI_DURATION = Histogram("openai_request_duration_seconds", "OpenAI call latency by model and outcome.",
+                            ("model", "outcome"))
+OPENAI_TOKENS = Counter("openai_tokens_total", "OpenAI tokens by model and kind (prompt / completion).",
+                        ("model", "kind"))
+OPENAI_RETRIES = Counter("openai_retries_total", "OpenAI call retries by reason.", ("reason",))
+
+
+OPENAI_CALL_TOKENS = Histogram("openai_call_tokens", "Tokens per OpenAI call by model and kind (prompt / completion).",
+                               ("model", "kind"), buckets=(50, 100, 200, 400, 800, 1600, 3200, 6400, 12800))
+
+
+def record_openai_usage(model: str, response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        prompt = float(getattr(usage, "prompt_tokens", 0) or 0)
+        completion = float(getattr(usage, "completion_tokens", 0) or 0)
+        OPENAI_TOKENS.inc(model, "prompt", amount=prompt)
+        OPENAI_TOKENS.inc(model, "completion", amount=completion)
+        OPENAI_CALL_TOKENS.observe(prompt, model, "prompt")
+        OPENAI_CALL_TOKENS.observe(completion, model, "completion")
+
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result (hit / miss / stale).",
+                         ("cache", "result"))
+
+
+def _cache_hit_ratios() -> Dict[LabelValues, float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), n in list(CACHE_REQUESTS._values.items()):
+        t = totals.setdefault(cache, [0.0, 0.0])
+        t[1] += n
+        if result == "hit":
+            t[0] += n
+    return {(cache,): hits / n for cache, (hits, n) in totals.items() if n}
+
+
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Hits / lookups per cache since process start.", ("cache",),
+                        fn=_cache_hit_ratios)
+
+
+def record_cache(cache: str, result: str) -> None:
+    CACHE_REQUESTS.inc(cache, result)
+
+
+# ------------------------------------------------------------------------------
+# ASGI middleware
+# ------------------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    Pure ASGI: per-route latency / status / in-flight. The route label is the
+    matched path template (FastAPI puts the route in the scope), so path
+    parameters do not explode cardinality; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec(method)
+            route = scope.get("route")
+            label = getattr(route, "path", None) or "<unmatched>"
+            HTTP_DURATION.observe(elapsed, method, label)
+            HTTP_REQUESTS.inc(method, label, status)
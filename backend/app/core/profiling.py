@@ -0,0 +1,110 @@
+# backend/app/core/profiling.py
+"""
+Opt-in per-request profiler.
+
+Only installed when PROFILE_DIR is set, so it costs nothing otherwise. A
+request is profiled when it carries the admin token (`X-Profile: <token>`
+header or `?profile=<token>`), or at random with PROFILE_SAMPLE_RATE. The
+request runs under cProfile and a pstats file is written to PROFILE_DIR:
+
+    <utc time>_<METHOD>_<route>_h<history rows>_<trace id>.pstats
+
+Open it with `python -m pstats`, snakeviz, or turn it into a flamegraph
+(e.g. flameprof). Data fetchers report the history size they loaded
+through note_history_size(); the largest value is used in the file name.
+
+cProfile is per-thread and records everything the event loop runs while
+it is enabled, so one request is profiled at a time per worker;
+concurrent requests in that window also show up in the profile.
+"""
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+from app.core.tracing import current_trace_id
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"x-profile"
+QUERY_PARAM = "profile"
+
+_history_sizes: ContextVar[Optional[List[int]]] = ContextVar("profile_history_sizes", default=None)
+_active = threading.Lock()
+
+
+def note_history_size(rows: int) -> None:
+    """Record how many history rows the current request loaded (no-op unless profiled)."""
+    sizes = _history_sizes.get()
+    if sizes is not None:
+        sizes.append(rows)
+
+
+def _token_ok(candidate: Optional[str]) -> bool:
+    token = settings.PROFILE_ADMIN_TOKEN
+    return bool(token and candidate) and hmac.compare_digest(candidate.encode(), token.encode())
+
+
+def _requested(scope) -> bool:
+    for k, v in scope.get("headers", ()):
+        if k == HEADER:
+            return _token_ok(v.decode("latin-1"))
+    qs = scope.get("query_string", b"")
+    if qs and QUERY_PARAM.encode() in qs:
+        values = parse_qs(qs.decode("latin-1")).get(QUERY_PARAM)
+        return bool(values) and _token_ok(values[0])
+    return False
+
+
+def _slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+
+
+def profile_path(method: str, route: str, history_rows: int, trace_id: Optional[str]) -> str:
+    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    name = f"{ts}_{method}_{_slug(route)}_h{history_rows}_{(trace_id or 'notrace')[:16]}.pstats"
+    return os.path.join(settings.PROFILE_DIR, name)
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        forced = _requested(scope)
+        if not forced and not (settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE):
+            return await self.app(scope, receive, send)
+        if not _active.acquire(blocking=False):  # another request is being profiled
+            return await self.app(scope, receive, send)
+
+        sizes: List[int] = []
+        token = _history_sizes.set(sizes)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.disable()
+        finally:
+            _history_sizes.reset(token)
+            _active.release()
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            path = profile_path(scope["method"], route, max(sizes, default=0), current_trace_id())
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, profiler.dump_stats, path)
+                logger.info(f"Profile written: {path}")
+            except Exception as e:
+                logger.warning(f"Failed to write profile {path}: {e}")
@@ -0,0 +1,159 @@
+# backend/app/core/rate_limit.py
+"""
+Per-user token-bucket rate limiting for expensive routes.
+
+Each authenticated user has one bucket per scope. It holds up to
+RATE_LIMIT_BURST tokens and refills at RATE_LIMIT_PER_MIN tokens per
+minute. A route declares what one call costs:
+
+    @router.get("/next-workout", dependencies=[..., rate_limited(5)])
+
+Put it after cache_validated: a 304 revalidation costs nothing. An
+empty bucket raises 429 with Retry-After, the seconds until enough
+tokens have refilled. The key is the user id from get_current_user,
+which FastAPI resolves once per request, so the JWT isn't verified twice.
+
+Backends (RATE_LIMIT_BACKEND):
+  memory    per worker process, LRU-bounded to RATE_LIMIT_MAX_KEYS buckets
+  supabase  one bucket row per key, updated atomically by the
+            take_rate_limit_tokens() SQL function (migration 012), shared
+            by every worker
+
+Other stores plug in through set_backend() (anything with an async
+`take(key, cost, rate_per_sec, burst) -> Decision`). A backend error
+fails open: the request goes through and is counted as "error".
+
+Metrics: rate_limit_requests_total{route, decision} and
+rate_limit_buckets{state} (tracked / exhausted, memory backend).
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request
+
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.executors import run_sync
+from app.core.metrics import Counter, Gauge, LabelValues
+
+logger = logging.getLogger(__name__)
+
+RPC = "take_rate_limit_tokens"
+
+DECISIONS = Counter("rate_limit_requests_total", "Rate-limited route calls by decision (allowed / limited / error).",
+                    ("route", "decision"))
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    tokens: float        # left after this call (or available, when refused)
+    retry_after: float   # seconds until `cost` tokens are available; 0 when allowed
+
+
+def _decide(tokens: float, cost: float, rate: float) -> Tuple[float, Decision]:
+    if tokens >= cost:
+        return tokens - cost, Decision(True, tokens - cost, 0.0)
+    return tokens, Decision(False, tokens, (cost - tokens) / rate if rate > 0 else math.inf)
+
+
+class MemoryBackend:
+    """Buckets in this process: key -> (tokens, last refill)."""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take_now(self, key: str, cost: float, rate: float, burst: float) -> Decision:
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            tokens, decision = _decide(tokens, cost, rate)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)  # least recently seen; it comes back full
+        return decision
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Decision:
+        return self.take_now(key, cost, rate, burst)
+
+    def stats(self, rate: float, burst: float, cost: float = 1.0) -> Dict[str, int]:
+        now = self.clock()
+        with self._lock:
+            buckets = list(self._buckets.values())
+        exhausted = sum(1 for tokens, at in buckets if min(burst, tokens + (now - at) * rate) < cost)
+        return {"tracked": len(buckets), "exhausted": exhausted}
+
+
+class SupabaseBackend:
+    """Shared buckets in Postgres via the take_rate_limit_tokens() function."""
+
+    def take_now(self, key: str, cost: float, rate: float, burst: float) -> Decision:
+        from app.services.supabase_client import supabase
+
+        row = supabase.rpc(RPC, {"p_key": key, "p_cost": cost, "p_rate": rate, "p_burst": burst}).execute().data
+        row = row[0] if isinstance(row, list) else row
+        return Decision(bool(row["allowed"]), float(row["tokens"]), float(row["retry_after"] or 0.0))
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Decision:
+        return await run_sync("crud", self.take_now, key, cost, rate, burst)
+
+
+_backend = None
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_BACKEND == "supabase":
+            _backend = SupabaseBackend()
+        else:
+            _backend = MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+    return _backend
+
+
+def set_backend(b) -> None:
+    global _backend
+    _backend = b
+
+
+def _bucket_stats() -> Dict[LabelValues, float]:
+    b = _backend
+    if not isinstance(b, MemoryBackend):
+        return {}
+    stats = b.stats(settings.RATE_LIMIT_PER_MIN / 60.0, settings.RATE_LIMIT_BURST)
+    return {(state,): float(n) for state, n in stats.items()}
+
+
+BUCKETS = Gauge("rate_limit_buckets", "Per-user rate-limit buckets in this worker (tracked / exhausted).",
+                ("state",), fn=_bucket_stats)
+
+
+def rate_limited(cost: float, scope: str = "ai"):
+    """Route dependency: charge `cost` tokens from the caller's `scope` bucket, or 429."""
+    async def dependency(request: Request, current_user: dict = Depends(get_current_user)) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        rate, burst = settings.RATE_LIMIT_PER_MIN / 60.0, settings.RATE_LIMIT_BURST
+        try:
+            decision: Optional[Decision] = await backend().take(f"{scope}:{current_user['id']}", cost, rate, burst)
+        except Exception as e:
+            logger.warning("Rate limiter unavailable, allowing request: %s", e)
+            DECISIONS.inc(route, "error")
+            return
+        if decision.allowed:
+            DECISIONS.inc(route, "allowed")
+            return
+        DECISIONS.inc(route, "limited")
+        retry_after = max(1, math.ceil(min(decision.retry_after, 3600)))
+        raise HTTPException(status_code=429, detail="Rate limit exceeded, try again later.",
+                            headers={"Retry-After": str(retry_after)})
+    return Depends(dependency)
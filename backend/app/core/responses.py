@@ -0,0 +1,80 @@
+# backend/app/core/responses.py
+"""
+Fast JSON responses.
+
+FastJSONResponse renders with orjson when it is installed, and with the
+stdlib json module otherwise. It is the app's default response class.
+
+List endpoints that return rows straight from Supabase can skip
+FastAPI's response_model pass (validate every row, re-encode it, dump
+it) with trusted_list_response(Model, rows). Postgres has already
+enforced the column types, so each row is only projected onto the
+model's fields, with defaults filled in for missing keys. The
+response_model stays on the route for the OpenAPI schema; a returned
+Response bypasses it. Values are passed through as stored, so timestamps
+keep Postgres' ISO format (+00:00) instead of pydantic's (Z).
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Type
+from uuid import UUID
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib fallback
+    orjson = None
+
+MEDIA_TYPE = "application/json"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _projection(model: Type[BaseModel]) -> Tuple[Tuple[str, str, Any], ...]:
+    """(output key, row key, default) per model field, computed once per model."""
+    out = []
+    for name, field in model.model_fields.items():
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        out.append((field.serialization_alias or name, field.alias or name, default))
+    return tuple(out)
+
+
+def trusted_rows(model: Type[BaseModel], rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Project DB rows onto `model`'s fields without validating them."""
+    fields = _projection(model)
+    return [{out: row.get(key, default) for out, key, default in fields} for row in rows]
+
+
+def trusted_list_response(model: Type[BaseModel], rows: Iterable[Dict[str, Any]], **kwargs: Any) -> FastJSONResponse:
+    return FastJSONResponse(trusted_rows(model, rows), **kwargs)
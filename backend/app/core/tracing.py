@@ -0,0 +1,317 @@
+# backend/app/core/tracing.py
+"""
+Lightweight in-process tracing.
+
+Spans carry OpenTelemetry-compatible ids (16-byte trace id, 8-byte span id,
+W3C `traceparent` in and out) and are exported as OTLP/JSON-shaped lines to
+the console (logger) or a JSONL file, so no collector is needed. The current
+span lives in a contextvar, so it follows `await`s and thread-pool hops.
+
+    with span("data_prep.fetch", exercise=name) as s:
+        ...
+        s.set_attribute("rows", len(rows))
+
+    @traced()                       # sync or async functions
+    async def aggregate_exercise_history(...): ...
+
+Sampling is decided once per trace (root span or incoming traceparent flag).
+Unsampled traces still get a trace id (echoed in X-Trace-Id for log
+correlation), but all their spans collapse into one no-op span object.
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = "x-trace-id"
+
+
+def _new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "events", "status", "status_message")
+
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.events: List[Tuple[str, int, Dict[str, Any]]] = []
+        self.status = "UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append((name, time.time_ns(), attributes))
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", **{"exception.type": type(exc).__name__, "exception.message": str(exc)})
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "events": [{"name": n, "timeUnixNano": t, "attributes": a} for n, t, a in self.events],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class _NonRecordingSpan:
+    """Stands in for every span of an unsampled trace; only keeps the trace id."""
+    __slots__ = ("trace_id", "span_id")
+
+    recording = False
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+_current: ContextVar[Optional[Any]] = ContextVar("trace_span", default=None)
+
+
+def current_span():
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    s = _current.get()
+    return s.trace_id if s is not None else None
+
+
+def _should_sample() -> bool:
+    return settings.TRACE_EXPORTER != "none" and random.random() < settings.TRACE_SAMPLE_RATE
+
+
+@contextmanager
+def _activate(s) -> Iterator[Any]:
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        if s.recording:
+            s.end_ns = time.time_ns()
+            _exporter.export(s)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Child of the current span, or the root of a new trace."""
+    parent = _current.get()
+    if parent is not None and not parent.recording:
+        yield parent
+        return
+    if parent is None:
+        s = Span(name, _new_trace_id(), None, attributes) if _should_sample() else _NonRecordingSpan(_new_trace_id(), _new_span_id())
+    else:
+        s = Span(name, parent.trace_id, parent.span_id, attributes)
+    with _activate(s):
+        yield s
+
+
+@contextmanager
+def root_span(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Any]:
+    """Request-level span; continues an incoming W3C traceparent when present."""
+    parsed = parse_traceparent(traceparent) if traceparent else None
+    if parsed is None:
+        trace_id, parent_id, sampled = _new_trace_id(), None, _should_sample()
+    else:
+        trace_id, parent_id, sampled = parsed
+        sampled = sampled and settings.TRACE_EXPORTER != "none"
+    s = Span(name, trace_id, parent_id, attributes) if sampled else _NonRecordingSpan(trace_id, parent_id or _new_span_id())
+    with _activate(s):
+        yield s
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: run the function inside a span named `module.qualname` by default."""
+    def decorate(fn):
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ------------------------------------------------------------------------------
+# W3C trace context
+# ------------------------------------------------------------------------------
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def format_traceparent(s) -> str:
+    return f"00-{s.trace_id}-{s.span_id}-{'01' if s.recording else '00'}"
+
+
+# ------------------------------------------------------------------------------
+# Exporters (background writer thread; the request path only enqueues)
+# ------------------------------------------------------------------------------
+
+class _Exporter:
+    def __init__(self) -> None:
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, s: Span) -> None:
+        if self._thread is None:
+            self._start()
+        self._queue.put(s)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _write(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        if settings.TRACE_EXPORTER == "file":
+            with open(settings.TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        elif settings.TRACE_EXPORTER == "console":
+            for line in lines:
+                logger.info(line)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in batch
+            try:
+                self._write([json.dumps(s.to_otlp(), default=str) for s in batch if s is not None])
+            except Exception as e:
+                logger.warning(f"Trace export failed: {e}")
+            if done:
+                return
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Drain the queue (app shutdown / tests)."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+
+_exporter = _Exporter()
+
+
+def flush() -> None:
+    _exporter.flush()
+
+
+# ------------------------------------------------------------------------------
+# ASGI middleware
+# ------------------------------------------------------------------------------
+
+class TracingMiddleware:
+    """Root span per HTTP request; echoes X-Trace-Id and traceparent on the response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        traceparent = None
+        for k, v in scope.get("headers", ()):
+            if k == b"traceparent":
+                traceparent = v.decode("latin-1")
+                break
+
+        with root_span(f"{scope['method']} {scope['path']}", traceparent,
+                       **{"http.method": scope["method"], "http.target": scope["path"]}) as s:
+            trace_headers = [
+                (b"x-trace-id", s.trace_id.encode()),
+                (b"traceparent", format_traceparent(s).encode()),
+            ]
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", ())) + trace_headers
+                    s.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route and s.recording:
+                    s.name = f"{scope['method']} {route}"
+                    s.set_attribute("http.route", route)
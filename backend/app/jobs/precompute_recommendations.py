@@ -0,0 +1,121 @@
+# backend/app/jobs/precompute_recommendations.py
+"""
+Offline precompute of next-workout suggestions for every active user.
+
+    python -m app.jobs.precompute_recommendations --active-days 30 --batch-size 200
+
+Schedule it from cron ahead of the morning / Monday-evening peaks. Users
+with a workout in the last `--active-days` days are enumerated from the
+`user_exercise_frequency` view, their full histories are fetched
+`--batch-size` users per query and scored on a process pool (one history
+frame -> grouped trends -> rule table per batch, see
+recommendations_cache.score_histories), then upserted into
+`recommendations_cache`. Each row records the workouts version read just
+before its history was fetched, so a write during the run makes it stale
+rather than silently covered. Throughput is logged in users/sec.
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.ai.data_prep import _fetch_all_pages, fetch_history_rows_for_users
+from app.ai.exercise_index import VIEW
+from app.ai.recommendations_cache import fetch_data_versions, score_histories, score_user_history, upsert_rows
+from app.services.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACTIVE_DAYS = 30
+DEFAULT_BATCH_SIZE = 200
+
+
+def active_user_ids(active_days: int) -> List[str]:
+    since = (datetime.now(timezone.utc) - timedelta(days=active_days)).isoformat()
+    rows = _fetch_all_pages(
+        lambda: supabase.table(VIEW).select("user_id").gte("last_performed_at", since).order("user_id")
+    )
+    return sorted({r["user_id"] for r in rows})
+
+
+def _batches(user_ids: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(user_ids), size):
+        yield user_ids[i:i + size]
+
+
+def _score_batch(histories: Dict[str, List[Dict[str, Any]]], now: datetime) -> List[Dict[str, Any]]:
+    """Worker entrypoint: score one fetched batch (runs in a child process)."""
+    try:
+        return score_histories(histories, now=now)
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Batch scoring failed ({e}); retrying user by user")
+    out = []
+    for user_id, rows in histories.items():
+        try:  # one bad history must not sink the batch
+            row = score_user_history(user_id, rows, now=now)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Scoring failed for {user_id}: {e}")
+            continue
+        if row is not None:
+            out.append(row)
+    return out
+
+
+def run(active_days: int = DEFAULT_ACTIVE_DAYS, batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = 0) -> Tuple[int, float]:
+    """
+    Fetch batches on the main process while earlier batches are scored by
+    the pool; upsert each batch as it completes. Returns (users_written, seconds).
+    """
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    user_ids = active_user_ids(active_days)
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"Precomputing recommendations for {len(user_ids)} active users "
+                f"({workers} workers, batches of {batch_size})")
+
+    written = 0
+    pending: Dict[Future, Dict[str, int]] = {}  # -> data versions the batch was fetched at
+
+    def drain(block_until: int) -> None:
+        nonlocal written
+        while len(pending) > block_until:
+            done, _ = wait(set(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                versions = pending.pop(fut)
+                rows = [dict(r, data_version=versions[r["user_id"]]) for r in fut.result()]
+                upsert_rows(rows)
+                written += len(rows)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in _batches(user_ids, batch_size):
+            versions = fetch_data_versions(batch)  # before the history: later writes bump past it
+            histories = fetch_history_rows_for_users(batch)
+            pending[pool.submit(_score_batch, histories, now)] = versions
+            drain(block_until=2 * workers)  # bound memory held by in-flight batches
+        drain(block_until=0)
+
+    elapsed = time.perf_counter() - started
+    return written, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute next-workout suggestions into recommendations_cache")
+    parser.add_argument("--active-days", type=int, default=DEFAULT_ACTIVE_DAYS,
+                        help="users with a workout in this many days are scored")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="users per history query / pool task")
+    parser.add_argument("--workers", type=int, default=0, help="process pool size (default: CPU count)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    written, elapsed = run(args.active_days, args.batch_size, args.workers)
+    rate = written / elapsed if elapsed > 0 else 0.0
+    logger.info(f"Wrote {written} users in {elapsed:.1f}s ({rate:.1f} users/sec)")
+
+
+if __name__ == "__main__":
+    main()
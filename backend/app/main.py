@@ -1,10 +1,9 @@
 # backend/app/main.py
 import os
+from contextlib import asynccontextmanager
 from typing import List
 from fastapi import FastAPI
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-# from fastapi.middleware.cors import CORSMiddleware
+from fastapi import Response
 
 from app.api.routes import (
     workouts,
@@ -16,21 +15,54 @@ from app.api.routes import (
     progress,
     ai_routes,
 )
+from app.ai import llm_client
+from app.core import analytics, executors, invalidation, metrics, tracing
+from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.conditional import ConditionalHeadersMiddleware
+from app.core.cors import CORSMiddleware
+from app.core.deadline import DeadlineExceeded, DeadlineMiddleware, deadline_exceeded_handler
+from app.core.responses import FastJSONResponse
+from app.core.log import setup_logging, shutdown_logging
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    executors.configure_default_limiter()
+    analytics.loop_lag.start()
+    invalidation.start()
+    yield
+    invalidation.stop()
+    await llm_client.aclose()
+    await analytics.loop_lag.stop()
+    analytics.shutdown()
+    tracing.flush()
+    shutdown_logging()
+
 
 app = FastAPI(
     title="AI Fit Fusion",
     version="0.1.0",
     description="Backend API for Fit Fusion app",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
 
 # Root + health endpoints (unchanged)
 @app.get("/")
 def root():
     return {"message": "Welcome to the AI Fit Fusion API 🚀"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "message": "Backend is running!"}
+    return {"status": "ok", "message": "Backend is running!", "loop_lag": analytics.loop_lag.stats()}
 
 # Routers
 app.include_router(workouts.router, prefix="/api", tags=["workouts"])
@@ -56,40 +88,30 @@ frontend_origins: List[str] = [s.strip() for s in frontend_env.split(",") if s.s
 
 # Optionally allow Codespaces domains with regex (only enable if you actively use it)
 ENABLE_CODESPACES = os.getenv("ENABLE_CODESPACES", "0") == "1"
-codespaces_regex = r"https://.*\.app\.github\.dev"
+codespaces_regex = r"https://[A-Za-z0-9-]+\.app\.github\.dev"
 
 allow_origins = set(default_origins)
 allow_origins.update(frontend_origins)
 
-# Configure CORSMiddleware
-# If you need regex-based allow for Codespaces, pass allow_origin_regex (FastAPI/Starlette supports both).
-# app.add_middleware(
-#     CORSMiddleware,
-#     allow_origins=allow_origins,              # explicit origins (preferred)
-#     allow_origin_regex=(codespaces_regex if ENABLE_CODESPACES else None),
-#     allow_credentials=True,                   # required if sending cookies or credentials
-#     allow_methods=["*"],
-#     allow_headers=["*"],                      # or explicitly ["Authorization","Content-Type"]
-# )
+# Innermost: ETag / Last-Modified / Cache-Control from cache_validated routes,
+# then gzip/brotli for large bodies
+app.add_middleware(ConditionalHeadersMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# Pure ASGI (app/core/cors.py): exact origins + optional Codespaces regex,
+# preflights answered from a per-origin cache with Access-Control-Max-Age.
 # --------------------------------------------
-class DynamicCORSMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        origin = request.headers.get("origin")
-        # handle preflight
-        if request.method == "OPTIONS":
-            if origin and origin in allow_origins:
-                headers = {
-                    "Access-Control-Allow-Origin": origin,
-                    "Access-Control-Allow-Credentials": "true",
-                    "Access-Control-Allow-Headers": "Authorization,Content-Type",
-                    "Access-Control-Allow-Methods": "GET,POST,PUT,PATCH,DELETE,OPTIONS",
-                }
-                return Response(status_code=200, headers=headers)
-            return Response(status_code=400, content="CORS origin not allowed")
-        resp = await call_next(request)
-        if origin and origin in allow_origins:
-            resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Access-Control-Allow-Credentials"] = "true"
-        return resp
-
-app.add_middleware(DynamicCORSMiddleware)
+app.add_middleware(
+    CORSMiddleware,
+    origins=allow_origins,
+    origin_regex=(codespaces_regex if ENABLE_CODESPACES else None),
+    max_age=settings.CORS_MAX_AGE,
+)
+if settings.PROFILE_DIR:
+    from app.core.profiling import ProfilerMiddleware
+    app.add_middleware(ProfilerMiddleware)
+# Request budget (X-Request-Timeout) inside the request span, so skipped stages land on it
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
+# Outermost: times everything, including CORS handling
+app.add_middleware(metrics.MetricsMiddleware)
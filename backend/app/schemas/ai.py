@@ -13,7 +13,7 @@ class WorkoutSet(BaseModel):
 
 class ExercisePerformance(BaseModel):
     user_id: str
-    exercise_id: Optional[str] = None
+    exercise_id: Optional[int] = Field(None, description="Catalog id (app.ai.exercise_catalog); None for free-text exercises")
     exercise_name: str
     performed_at: datetime
     sets: List[WorkoutSet]
@@ -36,7 +36,7 @@ class RollingWindowSummary(BaseModel):
 
 class ExerciseTrend(BaseModel):
     user_id: str
-    exercise_id: Optional[str]
+    exercise_id: Optional[int]
     exercise_name: str
     rolling: List[RollingWindowSummary] = Field(..., description="ordered by increasing window size (e.g., [4,8,12])")
     recent_performances: List[ExercisePerformance] = Field(..., description="raw occurrences used to compute summaries")
@@ -70,7 +70,7 @@ class OverloadSuggestion(BaseModel):
 
 class NextWorkoutSuggestionResponse(BaseModel):
     user_id: str
-    exercise_id: Optional[str]
+    exercise_id: Optional[int]
     exercise_name: str
     suggested_weight_kg: Optional[float]
     suggested_reps: Optional[int]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Annotated
+from typing import List, Optional, Annotated
 from datetime import datetime
 from uuid import UUID
 
@@ -7,6 +7,15 @@ from uuid import UUID
 # Replacements for conint / confloat
 PositiveInt = Annotated[int, Field(gt=0)]
 NonNegativeFloat = Annotated[float, Field(ge=0)]
+NonNegativeInt = Annotated[int, Field(ge=0)]
+
+
+class WorkoutSetDetail(BaseModel):
+    """One entry of `workouts.sets_json` (real per-set data)."""
+    set_index: Optional[PositiveInt] = None
+    reps: NonNegativeInt
+    weight_kg: Optional[NonNegativeFloat] = None
+    rpe: Optional[Annotated[float, Field(ge=0, le=10)]] = None
 
 
 class WorkoutBase(BaseModel):
@@ -14,6 +23,7 @@ class WorkoutBase(BaseModel):
     sets: PositiveInt
     reps: PositiveInt
     weight: Optional[NonNegativeFloat] = None
+    sets_json: Optional[List[WorkoutSetDetail]] = Field(default_factory=list)
 
 
 class WorkoutCreate(WorkoutBase):
@@ -27,12 +37,14 @@ class WorkoutUpdate(BaseModel):
     sets: Optional[PositiveInt] = None
     reps: Optional[PositiveInt] = None
     weight: Optional[NonNegativeFloat] = None
+    sets_json: Optional[List[WorkoutSetDetail]] = None
 
 
 class WorkoutResponse(WorkoutBase):
     """Schema for returning workouts (GET)."""
     id: UUID
     user_id: UUID
+    exercise_id: Optional[int] = None
     created_at: datetime
 
     class Config:
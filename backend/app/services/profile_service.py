@@ -0,0 +1,146 @@
+# backend/app/services/profile_service.py
+"""
+User profile access with a per-user read-through cache.
+
+Profiles change rarely but are read on every profile page, and as LLM
+context for suggestions and recommendations. get_profile() serves them
+from a bounded LRU cache with a TTL. update_profile() writes through,
+replacing the cached row with the one Postgres returned, and tells the
+other workers to drop theirs (app/core/invalidation.py). Concurrent cache
+misses for one user share a single fetch, which runs off the event loop.
+Every write or invalidation bumps the user's generation, and a fetch only
+fills the cache if the generation is unchanged when it returns, so a read
+that raced a PUT can't put the old row back under the new ETag. If the
+request that owns a shared fetch is cancelled, the waiters run their own.
+The first-visit auto-insert is an upsert that ignores duplicates, so two
+first requests (even on different workers) cannot fail on the primary key.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core import conditional, invalidation
+from app.core.executors import run_sync
+from app.core.metrics import record_cache
+from app.core.tracing import traced
+from app.services.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+TABLE = "users"
+CACHE_TTL_SEC = 300
+CACHE_MAX_USERS = 10_000
+
+_cache: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (expires_at, profile row)
+_inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+_generations: "OrderedDict[str, int]" = OrderedDict()  # user_id -> generation of the last write
+_generation_counter = itertools.count(1)
+
+
+class _FetchAbandoned(Exception):
+    """The request running a shared fetch was cancelled; waiters fetch for themselves."""
+
+
+def _generation(user_id: str) -> int:
+    return _generations.get(user_id, 0)
+
+
+def _bump_generation(user_id: str) -> None:
+    _generations[user_id] = next(_generation_counter)
+    _generations.move_to_end(user_id)
+    while len(_generations) > CACHE_MAX_USERS:
+        _generations.popitem(last=False)
+
+
+def _cache_get(user_id: str) -> Optional[Dict[str, Any]]:
+    hit = _cache.get(user_id)
+    if hit is None or hit[0] < time.monotonic():
+        return None
+    _cache.move_to_end(user_id)
+    return hit[1]
+
+
+def _cache_put(user_id: str, profile: Dict[str, Any]) -> None:
+    _cache[user_id] = (time.monotonic() + CACHE_TTL_SEC, profile)
+    _cache.move_to_end(user_id)
+    while len(_cache) > CACHE_MAX_USERS:
+        _cache.popitem(last=False)
+
+
+def invalidate(user_id: str) -> None:
+    _cache.pop(user_id, None)
+    _bump_generation(user_id)
+
+
+invalidation.subscribe("profile", invalidate)
+
+
+def _load_or_create(user_id: str, email: Optional[str]) -> Dict[str, Any]:
+    response = supabase.table(TABLE).select("*").eq("id", user_id).maybe_single().execute()
+    if response is not None and response.data:
+        return response.data
+    if not email:
+        raise LookupError(f"No profile for user {user_id}")
+    # Ignore-duplicates upsert: a concurrent first request (any worker) may have inserted it already
+    supabase.table(TABLE).upsert({"id": user_id, "email": email}, on_conflict="id", ignore_duplicates=True).execute()
+    response = supabase.table(TABLE).select("*").eq("id", user_id).single().execute()
+    logger.info("Created profile for user %s", user_id)
+    return response.data
+
+
+@traced()
+async def get_profile(user_id: str, email: Optional[str] = None) -> Dict[str, Any]:
+    """
+    The user's `users` row; created from `email` on first access.
+    Raises LookupError when there is no row and no email to create it with.
+    """
+    cached = _cache_get(user_id)
+    if cached is not None:
+        record_cache(TABLE, "hit")
+        return dict(cached)
+    record_cache(TABLE, "miss")
+
+    pending = _inflight.get(user_id)
+    while pending is not None:
+        try:
+            return dict(await asyncio.shield(pending))
+        except _FetchAbandoned:
+            pending = _inflight.get(user_id)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[user_id] = future
+    generation = _generation(user_id)
+    try:
+        profile = await run_sync("crud", _load_or_create, user_id, email)
+        if _generation(user_id) == generation:  # else a write landed meanwhile; its row is cached
+            _cache_put(user_id, profile)
+        future.set_result(profile)
+    except asyncio.CancelledError:
+        future.set_exception(_FetchAbandoned())
+        future.exception()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved when nobody else was waiting
+        raise
+    finally:
+        _inflight.pop(user_id, None)
+    return dict(profile)
+
+
+@traced()
+async def update_profile(user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Update profile fields; the returned row replaces the cached one (write-through)."""
+    response = supabase.table(TABLE).update(update_data).eq("id", user_id).execute()
+    if not response.data:
+        invalidate(user_id)
+        return None
+    profile = response.data[0]
+    _bump_generation(user_id)
+    _cache_put(user_id, profile)
+    conditional.bump(user_id, "profile")
+    invalidation.publish("profile", user_id)
+    return dict(profile)
@@ -1,19 +1,27 @@
 # backend/app/services/progress_service.py
 
+import logging
 from typing import List, Dict, Any, Optional
 from app.services.supabase_client import supabase
+from app.core import conditional
+from app.core.tracing import traced
 
+logger = logging.getLogger(__name__)
+
+@traced()
 async def insert_progress(user_id: str, progress_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Insert a progress record into Supabase DB for a specific user.
     """
     progress_data["user_id"] = user_id
     response = supabase.table("progress").insert(progress_data).execute()
-    print("Supabase insert response:", response)
+    logger.debug("Inserted progress record for user %s (%d rows)", user_id, len(response.data or []))
+    conditional.bump(user_id, "progress")
     if not response.data:
         raise Exception(f"Supabase insert error")
     return response.data[0] if response.data else {}
 
+@traced()
 async def fetch_progress(user_id: str, skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
     """
     Fetch all progress records for a specific user, ordered by recorded_at descending.
@@ -27,11 +35,12 @@ async def fetch_progress(user_id: str, skip: int = 0, limit: int = 50) -> List[D
         .range(skip, skip + limit - 1)
         .execute()
     )
-    print("Supabase fetch response:", response)
+    logger.debug("Fetched %d progress records for user %s", len(response.data or []), user_id)
     if not response.data:
         raise Exception(f"Supabase fetch error")
     return response.data or []
 
+@traced()
 async def get_progress_by_id(progress_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     """
     Fetch a single progress record by ID for a specific user.
@@ -44,11 +53,12 @@ async def get_progress_by_id(progress_id: str, user_id: str) -> Optional[Dict[st
         .single()
         .execute()
     )
-    print("Supabase get response:", response)
+    logger.debug("Fetched progress record %s for user %s (found=%s)", progress_id, user_id, bool(response.data))
     if not response.data:
         raise Exception(f"Supabase fetch error")
     return response.data if response.data else None
 
+@traced()
 async def update_progress(progress_id: str, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Update a progress record for a specific user.
@@ -64,11 +74,13 @@ async def update_progress(progress_id: str, user_id: str, update_data: Dict[str,
         .eq("user_id", user_id)  # ensure users can only update their own records
         .execute()
     )
-    print("Supabase update response:", response)
+    logger.debug("Updated progress record %s for user %s (%d rows)", progress_id, user_id, len(response.data or []))
+    conditional.bump(user_id, "progress")
     if not response.data:
         raise Exception(f"Supabase update error")
     return response.data[0] if response.data else None
 
+@traced()
 async def delete_progress(progress_id: str, user_id: str) -> None:
     """
     Delete a progress record for a specific user.
@@ -80,6 +92,7 @@ async def delete_progress(progress_id: str, user_id: str) -> None:
         .eq("user_id", user_id)
         .execute()
     )
-    print("Supabase delete response:", response)
+    logger.debug("Deleted progress record %s for user %s (%d rows)", progress_id, user_id, len(response.data or []))
+    conditional.bump(user_id, "progress")
     if not response.data:
         raise Exception(f"Supabase delete error")
@@ -0,0 +1,147 @@
+# backend/app/services/recommendation_service.py
+"""
+Combined training + nutrition recommendations for /api/recommendations.
+
+The three independent inputs are gathered concurrently:
+  - the user's top exercises (cached exercise index)
+  - the profile (cached; body weight / maintenance calories)
+  - daily nutrition totals for the last `window_days` only (daily_nutrition_totals view)
+
+Each top exercise then gets its trend metrics (stored running statistics,
+TREND_WINDOW sessions, no raw history), and every exercise goes through
+the rule table in one vectorized pass. Nutrition status can temper a
+load-increase suggestion: in a clear calorie deficit, confidence drops
+and the rationale says why. No LLM call is made here; /api/ai/* covers
+LLM-enriched suggestions. When the request deadline runs out, the
+profile and nutrition inputs fall back to defaults and are listed in
+`skipped_stages`.
+"""
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.ai import rule_table
+from app.ai.exercise_index import get_top_exercises
+from app.ai.trend_stats import get_trend_metrics
+from app.core import deadline
+from app.core.tracing import traced
+from app.services import meal_service, profile_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BODY_WEIGHT_KG = 70.0
+KCAL_PER_KG_MAINTENANCE = 32.0   # rough TDEE when the profile has none
+PROTEIN_G_PER_KG = 1.6
+DEFICIT_KCAL = 300.0             # avg intake this far below maintenance = deficit
+SURPLUS_KCAL = 500.0
+DEFICIT_CONFIDENCE_FACTOR = 0.8
+
+
+def summarize_nutrition(daily: List[Any], window_days: int, body_weight: float,
+                        maintenance_calories: float) -> Dict[str, Any]:
+    """Averages over logged days plus targets and the calorie balance."""
+    n = len(daily)
+
+    def avg(attr: str) -> float:
+        return round(sum(float(getattr(d, attr)) for d in daily) / n, 2) if n else 0.0
+
+    summary = {
+        "window_days": window_days,
+        "days_logged": n,
+        "calories_avg": avg("total_calories"),
+        "protein_avg": avg("total_protein_g"),
+        "carbs_avg": avg("total_carbs_g"),
+        "fats_avg": avg("total_fats_g"),
+        "maintenance_calories": round(maintenance_calories),
+        "protein_target_g": round(body_weight * PROTEIN_G_PER_KG),
+    }
+    summary["calorie_balance"] = round(summary["calories_avg"] - maintenance_calories) if n else None
+    return summary
+
+
+def nutrition_advice(summary: Dict[str, Any]) -> List[str]:
+    advice = []
+    if summary["days_logged"] < summary["window_days"] / 2:
+        advice.append(f"Only {summary['days_logged']} of the last {summary['window_days']} days have meals logged; "
+                      "log more consistently for accurate guidance.")
+    if not summary["days_logged"]:
+        return advice
+    balance = summary["calorie_balance"]
+    if balance <= -DEFICIT_KCAL:
+        advice.append(f"You're averaging {-balance} kcal below maintenance; expect slower strength gains.")
+    elif balance >= SURPLUS_KCAL:
+        advice.append(f"You're averaging {balance} kcal above maintenance; trim intake if fat gain isn't the goal.")
+    if summary["protein_avg"] < summary["protein_target_g"]:
+        advice.append(f"Protein averages {summary['protein_avg']:.0f} g/day; aim for about "
+                      f"{summary['protein_target_g']} g to support recovery.")
+    return advice
+
+
+def _suggestion_text(p: Dict[str, Any]) -> str:
+    action = p["suggestion_type"].replace("_", " ")
+    if p["suggestion_type"] == "increase_weight" and p["value"] is not None:
+        action += f" by {p['value']:g} kg"
+    elif p["value"] is not None:
+        action += f" by {p['value']:g}"
+    return f"{action.capitalize()}: {p['rationale']}"
+
+
+def _apply_nutrition(payloads: List[Dict[str, Any]], summary: Dict[str, Any]) -> None:
+    balance = summary["calorie_balance"]
+    if balance is None or balance > -DEFICIT_KCAL:
+        return
+    for p in payloads:
+        if p["suggestion_type"].startswith("increase"):
+            p["confidence_score"] = round(p["confidence_score"] * DEFICIT_CONFIDENCE_FACTOR, 2)
+            p["rationale"] += " Progress may stall while eating below maintenance."
+
+
+async def _daily_totals(user_id: str, window_days: int) -> List[Any]:
+    end = date.today()
+    return await meal_service.get_daily_totals(user_id, end - timedelta(days=window_days - 1), end)
+
+
+async def _safe(coro, default, what: str):
+    try:
+        return await coro
+    except deadline.DeadlineExceeded:
+        deadline.skip(what)
+        return default
+    except Exception as e:
+        logger.warning("Recommendations: %s unavailable: %s", what, e)
+        return default
+
+
+@traced()
+async def build_recommendations(user_id: str, email: Optional[str] = None, window_days: int = 14,
+                                limit: int = 5) -> Optional[Dict[str, Any]]:
+    """None when the user has no workouts to base training advice on."""
+    # the off-loop fetches go first so they are in flight while the index loads
+    profile, daily, exercises = await asyncio.gather(
+        _safe(profile_service.get_profile(user_id, email), {}, "profile"),
+        _safe(_daily_totals(user_id, window_days), [], "nutrition totals"),
+        get_top_exercises(user_id, limit),
+    )
+    if not exercises:
+        return None
+
+    metrics = await asyncio.gather(*(get_trend_metrics(user_id, name) for name in exercises))
+    payloads = rule_table.score_exercises(exercises, metrics)
+
+    body_weight = float(profile.get("weight") or DEFAULT_BODY_WEIGHT_KG)
+    maintenance = float(profile.get("maintenance_calories") or body_weight * KCAL_PER_KG_MAINTENANCE)
+    summary = summarize_nutrition(daily, window_days, body_weight, maintenance)
+    _apply_nutrition(payloads, summary)
+
+    return {
+        "user_id": user_id,
+        "nutrition_window_days": window_days,
+        "recommendations": [
+            {**p, "suggestion": _suggestion_text(p), "trend_metrics": m}
+            for p, m in zip(payloads, metrics)
+        ],
+        "nutrition": summary,
+        "nutrition_advice": nutrition_advice(summary),
+        "skipped_stages": deadline.skipped_stages(),
+    }
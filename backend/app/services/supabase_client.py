@@ -1,14 +1,75 @@
 # backend/app/services/supabase_client.py
+import time
+
 from supabase import create_client, Client
+from app.core import deadline
 from app.core.config import settings
+from app.core.metrics import SUPABASE_DURATION, SUPABASE_ERRORS
+from app.core.tracing import span
 
 """
 Supabase client instance to be shared across all services.
 
 Use this instead of creating separate clients in each service.
+Every `supabase.table(...)...execute()` is timed into the
+supabase_request_duration_seconds{table, operation} histogram, and
+no read starts once the request deadline has passed. Writes always run:
+the deadline must never leave half of a write's follow-up work undone.
 """
 
-supabase: Client = create_client(
+_OPERATIONS = frozenset(("select", "insert", "upsert", "update", "delete"))
+
+
+class _InstrumentedQuery:
+    """Wraps a postgrest request builder; remembers the table and first CRUD verb."""
+    __slots__ = ("_builder", "_table", "_op")
+
+    def __init__(self, builder, table: str, op: str = "other"):
+        self._builder = builder
+        self._table = table
+        self._op = op
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return _InstrumentedQuery(attr, self._table, self._op) if hasattr(attr, "execute") else attr
+        op = name if self._op == "other" and name in _OPERATIONS else self._op
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _InstrumentedQuery(result, self._table, op) if hasattr(result, "execute") else result
+        return call
+
+    def execute(self):
+        if self._op == "select":
+            deadline.check(f"supabase {self._table}.{self._op}")
+        start = time.perf_counter()
+        try:
+            with span(f"supabase {self._table}.{self._op}", **{"db.table": self._table, "db.operation": self._op}):
+                return self._builder.execute()
+        except Exception:
+            SUPABASE_ERRORS.inc(self._table, self._op)
+            raise
+        finally:
+            SUPABASE_DURATION.observe(time.perf_counter() - start, self._table, self._op)
+
+
+class InstrumentedClient:
+    """Delegates to the real Client; only `table()` / `from_()` are wrapped."""
+
+    def __init__(self, client: Client):
+        self._client = client
+
+    def table(self, name: str) -> _InstrumentedQuery:
+        return _InstrumentedQuery(self._client.table(name), name)
+
+    from_ = table
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+supabase: Client = InstrumentedClient(create_client(
     settings.SUPABASE_URL,
     settings.SUPABASE_SERVICE_ROLE_KEY
-)
+))
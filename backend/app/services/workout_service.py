@@ -1,20 +1,47 @@
 # backend/app/services/workout_service.py
 
+import logging
 from typing import List, Dict, Any, Optional
 from app.services.supabase_client import supabase
+from app.core import conditional, deadline
+from app.core.tracing import traced
+from app.core.profiling import note_history_size
+from app.ai import exercise_catalog, exercise_index, rolling, trend_stats
 
+logger = logging.getLogger(__name__)
+
+
+async def _on_workouts_changed(user_id: str, before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> None:
+    """
+    Refresh derived per-exercise data after a write to `workouts`.
+    `before` holds rows as they were (update/delete), `after` rows as written (insert/update).
+    The row is already committed, so this runs without the request deadline.
+    """
+    conditional.bump(user_id, "workouts")
+    names = [r.get("exercise_name") for r in before + after]
+    exercise_index.on_workouts_changed(user_id, before, after)
+    with deadline.suspended():
+        await rolling.on_workouts_changed(user_id, names)
+        await trend_stats.on_workouts_changed(user_id, before, after)
+
+
+@traced()
 async def insert_workout(user_id: str, workout_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Insert a workout into Supabase DB for a specific user.
     """
     workout_data["user_id"] = user_id
+    workout_data["exercise_id"] = exercise_catalog.exercise_id(workout_data.get("exercise_name"))
     response = supabase.table("workouts").insert(workout_data).execute()
-    print("Supabase insert response:", response)
+    logger.debug("Inserted workout for user %s (%d rows)", user_id, len(response.data or []))
     # If the Supabase client reports an error, surface it. Otherwise return inserted row or empty dict.
     if getattr(response, "error", None):
         raise Exception(f"Supabase insert error: {response.error}")
+    if response.data:
+        await _on_workouts_changed(user_id, [], [response.data[0]])
     return response.data[0] if response.data else {}
 
+@traced()
 async def fetch_workouts(user_id: str, filtered_date: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Fetch all workouts for a specific user, optionally filtered by date (YYYY-MM-DD).
@@ -29,16 +56,18 @@ async def fetch_workouts(user_id: str, filtered_date: Optional[str] = None) -> L
             end_datetime = f"{next_day}T00:00:00Z"
             query = query.gte("created_at", start_datetime).lt("created_at", end_datetime)
         except Exception as e:
-            print("Invalid date_filter passed to fetch_workouts, ignoring filter:", e)
+            logger.warning("Invalid date_filter %r passed to fetch_workouts, ignoring filter: %s", filtered_date, e)
             # Just don’t apply any created_at filter if parsing fails
 
     response = query.order("created_at", desc=True).execute()
-    print("Supabase fetch response:", response)
+    logger.debug("Fetched %d workouts for user %s", len(response.data or []), user_id)
 
     if getattr(response, "error", None):
         raise Exception(f"Supabase fetch error: {response.error}")
+    note_history_size(len(response.data or []))
     return response.data or []
 
+@traced()
 async def fetch_workout_by_id(user_id: str, workout_id: str) -> Optional[Dict[str, Any]]:
     """
     Fetch a single workout by id for a specific user.
@@ -61,6 +90,7 @@ async def fetch_workout_by_id(user_id: str, workout_id: str) -> Optional[Dict[st
 
     return response.data
 
+@traced()
 async def update_workout(workout_id: str, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Update a workout for a specific user.
@@ -68,6 +98,14 @@ async def update_workout(workout_id: str, user_id: str, update_data: Dict[str, A
     """
     if not update_data:
         return None
+    if "exercise_name" in update_data:
+        update_data["exercise_id"] = exercise_catalog.exercise_id(update_data["exercise_name"])
+
+    # derived data needs the row as it was (a rename moves the session between exercises)
+    try:
+        previous = await fetch_workout_by_id(user_id, workout_id)
+    except Exception:
+        previous = None
 
     response = (
         supabase.table("workouts")
@@ -79,9 +117,12 @@ async def update_workout(workout_id: str, user_id: str, update_data: Dict[str, A
 
     if getattr(response, "error", None):
         raise Exception(f"Supabase update error: {response.error}")
+    if response.data:
+        await _on_workouts_changed(user_id, [previous] if previous else [], [response.data[0]])
     return response.data[0] if response.data else None
 
 
+@traced()
 async def delete_workout(workout_id: str, user_id: str) -> bool:
     """
     Delete a workout owned by `user_id`. Returns True if a row was deleted.
@@ -93,11 +134,12 @@ async def delete_workout(workout_id: str, user_id: str) -> bool:
         .eq("user_id", user_id)
         .execute()
     )
-    print("Supabase delete response:", response)
+    logger.debug("Deleted workout %s for user %s (%d rows)", workout_id, user_id, len(response.data or []))
     if getattr(response, "error", None):
         raise Exception(f"Supabase delete error: {response.error}")
     # If deleted rows are returned in `data`, treat that as success.
     if response.data:
+        await _on_workouts_changed(user_id, response.data, [])
         return True
     # Some clients return a `count` attribute instead.
     deleted_count = getattr(response, "count", None)
@@ -0,0 +1,14 @@
+"""
+Micro-benchmarks for hot paths. Run from backend/, e.g.:
+
+    python -m benchmarks.bench_session_store
+
+Importing app modules needs Supabase/OpenAI settings; benchmarks never call
+those services, so placeholders are enough.
+"""
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench.anon.key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench.service.key")
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
@@ -0,0 +1,87 @@
+"""
+CORS middleware overhead per request: the previous BaseHTTPMiddleware
+implementation vs the pure-ASGI one, for a simple GET and a preflight,
+driven straight through the ASGI interface (no sockets, no router).
+
+    cd backend && python -m benchmarks.bench_cors [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cors import CORSMiddleware
+
+ORIGINS = {"http://localhost:3000", "http://localhost:5173"}
+ORIGIN = b"http://localhost:5173"
+
+
+class OldDynamicCORSMiddleware(BaseHTTPMiddleware):
+    """The middleware as it was in app/main.py."""
+
+    async def dispatch(self, request: Request, call_next):
+        origin = request.headers.get("origin")
+        if request.method == "OPTIONS":
+            if origin and origin in ORIGINS:
+                headers = {
+                    "Access-Control-Allow-Origin": origin,
+                    "Access-Control-Allow-Credentials": "true",
+                    "Access-Control-Allow-Headers": "Authorization,Content-Type",
+                    "Access-Control-Allow-Methods": "GET,POST,PUT,PATCH,DELETE,OPTIONS",
+                }
+                return Response(status_code=200, headers=headers)
+            return Response(status_code=400, content="CORS origin not allowed")
+        resp = await call_next(request)
+        if origin and origin in ORIGINS:
+            resp.headers["Access-Control-Allow-Origin"] = origin
+            resp.headers["Access-Control-Allow-Credentials"] = "true"
+        return resp
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+
+def scope(method):
+    return {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "http", "path": "/api/workouts", "raw_path": b"/api/workouts", "query_string": b"",
+            "root_path": "", "server": ("test", 80), "client": ("test", 1234),
+            "headers": [(b"host", b"test"), (b"origin", ORIGIN), (b"authorization", b"Bearer x")]}
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def per_request(app, method, n):
+    s = scope(method)
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(s), receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def main(n):
+    old = OldDynamicCORSMiddleware(endpoint)
+    new = CORSMiddleware(endpoint, ORIGINS, max_age=600)
+    base = await per_request(endpoint, "GET", n)
+    print(f"{'':18}{'GET us/req':>12}{'overhead':>10}{'OPTIONS us/req':>16}")
+    for name, app in (("BaseHTTPMiddleware", old), ("pure ASGI", new)):
+        get = await per_request(app, "GET", n)
+        opt = await per_request(app, "OPTIONS", n)
+        print(f"{name:18}{get:12.2f}{get - base:10.2f}{opt:16.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,76 @@
+"""
+Hedged vs plain chat completions against a simulated upstream whose
+latency has a heavy tail (most calls ~base, a few stall for seconds),
+scaled down so the run takes a few seconds. Reports p50 / p95 / p99
+latency and the extra requests hedging cost.
+
+    cd backend && python -m benchmarks.bench_hedging [--calls 400] [--stall-rate 0.05]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from app.ai import llm_client
+from app.core.config import settings
+
+MODEL = "bench-model"
+
+
+class SimulatedUpstream:
+    def __init__(self, base: float, stall: float, stall_rate: float, seed: int = 7):
+        self.base, self.stall, self.stall_rate = base, stall, stall_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.requests += 1
+        delay = self.base * self.rng.uniform(0.7, 1.6)
+        if self.rng.random() < self.stall_rate:
+            delay += self.stall
+        await asyncio.sleep(delay)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+
+
+def pct(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1e3
+
+
+async def run(hedge: bool, calls: int, concurrency: int, stall_rate: float):
+    upstream = SimulatedUpstream(base=0.02, stall=0.5, stall_rate=stall_rate)
+    llm_client.get_client = lambda: upstream
+    llm_client._latencies[MODEL] = deque(maxlen=llm_client.LATENCY_WINDOW)
+    settings.LLM_HEDGE = hedge
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with sem:
+            started = time.perf_counter()
+            await llm_client.chat_completion(model=MODEL, messages=[])
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    await asyncio.sleep(0.6)  # let hedged-away primaries finish
+    return latencies, upstream.requests
+
+
+def main(calls: int, concurrency: int, stall_rate: float):
+    print(f"{'':10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'requests':>10}")
+    for name, hedge in (("plain", False), ("hedged", True)):
+        latencies, requests = asyncio.run(run(hedge, calls, concurrency, stall_rate))
+        print(f"{name:10}{pct(latencies, 0.5):9.1f}{pct(latencies, 0.95):9.1f}{pct(latencies, 0.99):9.1f}"
+              f"{requests:10d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--stall-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    main(args.calls, args.concurrency, args.stall_rate)
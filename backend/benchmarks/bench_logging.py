@@ -0,0 +1,71 @@
+"""
+Per-request logging cost on the workouts fetch path: the old
+`print("Supabase fetch response:", response)` dump of a postgrest
+APIResponse vs the structured logger (row count only), both when the
+record is dropped by level and when it is emitted through the queue.
+
+    cd backend && python -m benchmarks.bench_logging [--rows 1000 --requests 2000]
+"""
+import argparse
+import io
+import logging
+import time
+from contextlib import redirect_stdout
+
+from postgrest import APIResponse
+
+from app.core.log import setup_logging, shutdown_logging
+
+logger = logging.getLogger("app.services.workout_service")
+
+
+def fake_response(rows):
+    return APIResponse(data=[{
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "user_id": "11111111-1111-1111-1111-111111111111",
+        "exercise_name": "Barbell Bench Press",
+        "sets": 4, "reps": 8, "weight": 80.0 + i % 10,
+        "sets_json": [{"reps": 8, "weight": 80.0, "rpe": 8}] * 4,
+        "created_at": "2026-01-01T10:00:00+00:00",
+    } for i in range(rows)], count=None)
+
+
+def per_request(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    response = fake_response(args.rows)
+    sink = io.StringIO()
+
+    def old():
+        with redirect_stdout(sink):
+            print("Supabase fetch response:", response)
+        sink.seek(0)
+        sink.truncate()
+
+    def new():
+        logger.debug("Fetched %d workouts for user %s", len(response.data or []), "user")
+
+    setup_logging(stream=sink)
+    n_old = max(args.requests // 20, 10)
+    old_us = per_request(old, n_old)
+
+    logging.getLogger().setLevel(logging.INFO)
+    dropped_us = per_request(new, args.requests)
+    logging.getLogger().setLevel(logging.DEBUG)
+    queued_us = per_request(new, args.requests)
+    shutdown_logging()
+
+    print(f"{args.rows} rows/response")
+    print(f"  print(response)          {old_us:10.1f} us/request")
+    print(f"  logger.debug (dropped)   {dropped_us:10.2f} us/request")
+    print(f"  logger.debug (queued)    {queued_us:10.2f} us/request")
@@ -0,0 +1,60 @@
+"""
+Rule scoring throughput: build_suggestion_payload per row vs the vectorized
+decision table over a users × exercises matrix.
+
+    cd backend && python -m benchmarks.bench_rule_table [--users 100000 --exercises 10]
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from app.ai.fitness_advisor import build_suggestion_payload
+from app.ai.rule_table import evaluate, increments_for
+
+EXERCISES = ["Bench Press", "Squat", "Deadlift", "Pull-Up", "Overhead Press",
+             "Barbell Row", "Leg Press", "Lateral Raise", "Bicep Curl", "Dips"]
+
+
+def random_columns(rng, shape):
+    rpe = rng.uniform(4, 10, shape)
+    rpe[rng.random(shape) < 0.4] = np.nan
+    return {
+        "volume_slope": rng.normal(0, 1, shape),
+        "weight_slope": rng.normal(0, 0.05, shape),
+        "rpe_trend": rng.normal(0, 0.2, shape),
+        "consistency": rng.uniform(0, 2, shape),
+        "avg_rpe": rpe,
+    }
+
+
+async def scalar(cols, names, n):
+    for i in range(n):
+        u, e = divmod(i, len(names))
+        m = {k: float(v[u, e]) for k, v in cols.items() if not np.isnan(v[u, e])}
+        await build_suggestion_payload(names[e], m)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--exercises", type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    names = EXERCISES[: args.exercises]
+    cols = random_columns(np.random.default_rng(0), (args.users, len(names)))
+    cells = args.users * len(names)
+
+    sample = min(cells, 20_000)
+    t0 = time.perf_counter()
+    asyncio.run(scalar(cols, names, sample))
+    per_row = (time.perf_counter() - t0) / sample
+    print(f"build_suggestion_payload: {1 / per_row:12,.0f} rows/s  (sampled {sample:,} rows)")
+
+    t0 = time.perf_counter()
+    evaluate(cols, increments_for(names))
+    dt = time.perf_counter() - t0
+    print(f"rule_table.evaluate:      {cells / dt:12,.0f} rows/s  ({cells:,} rows in {dt:.2f}s)")
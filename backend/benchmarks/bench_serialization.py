@@ -0,0 +1,78 @@
+"""
+List-endpoint serialization cost at 1k / 10k rows, per endpoint.
+
+"response_model" is what FastAPI does with a returned list: it validates
+each row against the model, dumps it in JSON mode, and json.dumps the
+result. "trusted + orjson" projects the rows and renders them with
+FastJSONResponse. Compressed sizes are shown for gzip and, when the
+package is installed, brotli.
+
+    cd backend && python -m benchmarks.bench_serialization [--rows 1000 10000]
+"""
+import argparse
+import time
+import uuid
+from typing import List
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from app.core import compression
+from app.core.responses import FastJSONResponse, trusted_rows
+from app.schemas.meal import MealOut
+from app.schemas.progress import ProgressRead
+from app.schemas.workout import WorkoutResponse
+
+USER = str(uuid.uuid4())
+TS = "2026-01-01T10:00:00+00:00"
+
+
+def workout_row(i):
+    return {"id": str(uuid.uuid4()), "user_id": USER, "exercise_name": "Barbell Bench Press", "exercise_id": 1,
+            "sets": 4, "reps": 8, "weight": 80.0 + i % 10, "created_at": TS,
+            "sets_json": [{"set_index": s + 1, "reps": 8, "weight_kg": 80.0, "rpe": 8.0} for s in range(4)]}
+
+
+def meal_row(i):
+    return {"id": str(uuid.uuid4()), "user_id": USER, "meal_type": "lunch",
+            "food_items": [{"name": "rice", "grams": 200}, {"name": "chicken", "grams": 150}],
+            "calories": 650 + i % 50, "protein_g": 45.5, "carbs_g": 70.0, "fats_g": 18.2,
+            "date": "2026-01-01", "created_at": TS, "updated_at": TS}
+
+
+def progress_row(i):
+    return {"id": str(uuid.uuid4()), "user_id": USER, "weight_kg": 80.0 - i * 0.01, "body_fat_pct": 18.0,
+            "strength_milestones": {"bench": 100}, "notes": "felt good", "rpe": 7.5,
+            "recorded_at": TS, "created_at": TS}
+
+
+ENDPOINTS = [("GET /api/workouts/", WorkoutResponse, workout_row),
+             ("GET /api/meals", MealOut, meal_row),
+             ("GET /api/progress/", ProgressRead, progress_row)]
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'endpoint':22}{'rows':>7}{'response_model ms':>19}{'trusted+orjson ms':>19}"
+          f"{'raw KB':>9}{'gzip KB':>9}{'br KB':>8}")
+    for name, model, make in ENDPOINTS:
+        adapter = TypeAdapter(List[model])
+        for n in args.rows:
+            rows = [make(i) for i in range(n)]
+            old_ms, _ = timed(lambda: JSONResponse(adapter.dump_python(adapter.validate_python(rows), mode="json")).body)
+            new_ms, body = timed(lambda: FastJSONResponse(trusted_rows(model, rows)).body)
+            gz = len(compression.compress(body, "gzip")) / 1024
+            br = f"{len(compression.compress(body, 'br')) / 1024:8.1f}" if compression.brotli else f"{'-':>8}"
+            print(f"{name:22}{n:7d}{old_ms:19.1f}{new_ms:19.1f}{len(body) / 1024:9.1f}{gz:9.1f}{br}")
@@ -0,0 +1,71 @@
+"""
+Allocation / time benchmark: legacy per-set Pydantic path vs SessionStore.
+
+    cd backend && python -m benchmarks.bench_session_store [--rows 2000]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app.ai.data_prep import RawWorkoutRow, SessionStore, normalize_sets
+
+
+def make_rows(n: int):
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"w{i}",
+            "user_id": "bench-user",
+            "exercise_name": "Bench Press",
+            "sets": 3 + i % 3,
+            "reps": 6 + i % 6,
+            "weight": 40.0 + (i % 40) * 1.25,
+            "created_at": (base + timedelta(hours=12 * i)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+async def legacy(rows):
+    sessions = []
+    for w in (RawWorkoutRow.model_validate(r) for r in rows):
+        sets = await normalize_sets(w)
+        if not sets:
+            continue
+        sessions.append({
+            "date": w.created_at,
+            "total_volume": round(float(sum(s.weight * s.reps for s in sets)), 2),
+            "max_set_weight": round(float(max(s.weight for s in sets)), 2),
+            "avg_rpe": None,
+            "sets": [s.model_dump() for s in sets],
+        })
+    sessions.sort(key=lambda x: x["date"])
+    return sessions
+
+
+def compact(rows):
+    return SessionStore.from_rows(rows).to_sessions()
+
+
+def measure(label, fn, repeat=5):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    dt = (time.perf_counter() - t0) / repeat
+    print(f"{label:<10} {dt * 1000:9.2f} ms/call   peak alloc {peak / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    rows = make_rows(args.rows)
+    print(f"{args.rows} workout rows")
+    measure("legacy", lambda: asyncio.run(legacy(rows)))
+    measure("compact", lambda: compact(rows))
@@ -0,0 +1,15 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# app.core.config / supabase_client read these at import time; the unit tests
+# below never talk to Supabase or OpenAI, they only need importable modules.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test.anon.key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test.service.key")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# test_meal.py is a manual smoke script against a live Supabase project.
+collect_ignore = ["test_meal.py"]
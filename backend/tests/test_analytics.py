@@ -0,0 +1,66 @@
+import asyncio
+import math
+import os
+import threading
+import time
+
+from app.core import analytics
+from app.core.analytics import NUMPY, PYTHON, LoopLagMonitor, choose_pool, run_analytics
+
+
+def test_pool_choice_by_size_and_kind(monkeypatch):
+    monkeypatch.setattr(analytics.settings, "ANALYTICS_THREAD_MIN_ROWS", 100)
+    monkeypatch.setattr(analytics.settings, "ANALYTICS_PROCESS_MIN_ROWS", 1000)
+    monkeypatch.setattr(analytics.settings, "ANALYTICS_PROCESS_WORKERS", 2)
+
+    assert choose_pool(10, NUMPY) is None
+    assert choose_pool(5000, NUMPY) == "thread"
+    assert choose_pool(500, PYTHON) == "thread"
+    assert choose_pool(5000, PYTHON) == "process"
+
+    monkeypatch.setattr(analytics.settings, "ANALYTICS_PROCESS_WORKERS", 0)
+    assert choose_pool(5000, PYTHON) == "thread"
+
+
+def test_offloaded_work_keeps_loop_responsive(monkeypatch):
+    monkeypatch.setattr(analytics.settings, "ANALYTICS_THREAD_MIN_ROWS", 1)
+
+    async def main():
+        # time.sleep stands in for GIL-releasing NumPy work: the loop keeps
+        # running other steps while it is in flight
+        job = asyncio.ensure_future(run_analytics(time.sleep, 0.2, size=10))
+        ticks = 0
+        while not job.done():
+            ticks += 1
+            await asyncio.sleep(0.005)
+        where = (
+            await run_analytics(threading.get_ident, size=0),
+            await run_analytics(threading.get_ident, size=10),
+            await run_analytics(os.getpid, size=10 ** 6, kind=PYTHON),
+        )
+        processed = await run_analytics(math.factorial, 10, size=10 ** 6, kind=PYTHON)
+        return ticks, where, processed
+
+    try:
+        ticks, (inline, thread, pid), processed = asyncio.run(main())
+    finally:
+        analytics.shutdown()
+    assert ticks > 1
+    assert inline == threading.get_ident() != thread
+    assert pid != os.getpid()
+    assert processed == 3628800
+
+
+def test_loop_lag_monitor_stats():
+    monitor = LoopLagMonitor(interval=0.01, warn_ms=1e9, alpha=0.5)
+    for lag in (2.0, 6.0, 4.0):
+        monitor.record(lag)
+    assert monitor.stats() == {"last_ms": 4.0, "ewma_ms": 4.0, "max_ms": 6.0, "samples": 3}
+
+    async def main():
+        monitor.start()
+        while monitor.samples < 4:
+            await asyncio.sleep(0.01)
+        await monitor.stop()
+
+    asyncio.run(asyncio.wait_for(main(), 5))
@@ -0,0 +1,60 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import conditional
+from app.core.auth import get_current_user
+from app.core.conditional import ConditionalHeadersMiddleware, cache_validated
+from app.core.responses import FastJSONResponse
+
+
+def _client(calls):
+    app = FastAPI()
+
+    @app.get("/rows", dependencies=[cache_validated("workouts")])
+    def rows():
+        calls.append(1)  # stands in for the Supabase query
+        return FastJSONResponse([{"n": len(calls)}])
+
+    app.add_middleware(ConditionalHeadersMiddleware)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-etag"}
+    return TestClient(app)
+
+
+def test_matching_etag_short_circuits_before_the_route():
+    calls = []
+    client = _client(calls)
+    first = client.get("/rows")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == conditional.REVALIDATE
+
+    again = client.get("/rows", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert calls == [1]
+
+    # the gzip-tagged representation validates too
+    assert client.get("/rows", headers={"If-None-Match": etag[:-1] + '-gzip"'}).status_code == 304
+
+
+def test_write_bumps_the_version():
+    calls = []
+    client = _client(calls)
+    first = client.get("/rows")
+    conditional.bump("user-etag", "workouts")
+    after = client.get("/rows", headers={"If-None-Match": first.headers["etag"],
+                                         "If-Modified-Since": first.headers["last-modified"]})
+    assert after.status_code == 200 and after.headers["etag"] != first.headers["etag"]
+    assert after.headers["last-modified"] != first.headers["last-modified"]
+    assert calls == [1, 1]
+
+
+def test_tokens_are_short_lived_unless_writes_reach_every_worker(monkeypatch):
+    monkeypatch.setattr(conditional.settings, "WEB_CONCURRENCY", 0)
+    monkeypatch.setattr(conditional.invalidation, "enabled", lambda: False)
+    assert conditional.token_ttl() == conditional.settings.ETAG_UNSYNCED_TTL_SEC
+
+    monkeypatch.setattr(conditional.invalidation, "enabled", lambda: True)
+    assert conditional.token_ttl() == conditional.settings.ETAG_VERSION_TTL_SEC
+
+    monkeypatch.setattr(conditional.invalidation, "enabled", lambda: False)
+    monkeypatch.setattr(conditional.settings, "WEB_CONCURRENCY", 1)
+    assert conditional.token_ttl() == conditional.settings.ETAG_VERSION_TTL_SEC
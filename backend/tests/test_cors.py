@@ -0,0 +1,43 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.cors import CORSMiddleware, OriginMatcher
+
+
+def _client():
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    app.add_middleware(CORSMiddleware, origins={"http://localhost:5173"},
+                       origin_regex=r"https://[A-Za-z0-9-]+\.app\.github\.dev", max_age=600)
+    return TestClient(app)
+
+
+def test_origin_matcher_exact_and_regex():
+    m = OriginMatcher({"http://localhost:5173"}, r"https://[A-Za-z0-9-]+\.app\.github\.dev")
+    assert m("http://localhost:5173")
+    assert m("https://fuzzy-space-5173.app.github.dev")
+    assert not m("https://evil.com/.app.github.dev")
+    assert not m("http://localhost:3000")
+
+
+def test_preflight_is_answered_with_max_age():
+    client = _client()
+    r = client.options("/ping", headers={"Origin": "http://localhost:5173"})
+    assert r.status_code == 200
+    assert r.headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert r.headers["access-control-max-age"] == "600"
+    assert client.options("/ping", headers={"Origin": "http://x.test"}).status_code == 400
+
+
+def test_simple_request_reflects_allowed_origin_only():
+    client = _client()
+    r = client.get("/ping", headers={"Origin": "https://abc.app.github.dev"})
+    assert r.json() == {"ok": True}
+    assert r.headers["access-control-allow-origin"] == "https://abc.app.github.dev"
+    assert r.headers["vary"] == "Origin"
+    r = client.get("/ping", headers={"Origin": "http://x.test"})
+    assert "access-control-allow-origin" not in r.headers
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.ai.data_prep import (
+    RawWorkoutRow,
+    SessionStore,
+    _trend_metrics_from_arrays,
+    compute_trend_metrics,
+    normalize_sets,
+)
+
+BASE = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+
+def _rows(n=10):
+    return [
+        {
+            "id": f"w{i}",
+            "user_id": "u1",
+            "exercise_name": "Bench Press",
+            "sets": 3 + (i % 2),
+            "reps": 8 + (i % 3),
+            "weight": None if i == 4 else 60.0 + 2.5 * i,
+            "created_at": (BASE + timedelta(days=2 * i)).isoformat(),
+        }
+        for i in reversed(range(n))  # Supabase returns newest first
+    ] + [{"id": "empty", "user_id": "u1", "exercise_name": "Bench Press",
+          "sets": 0, "reps": 5, "weight": 50, "created_at": BASE.isoformat()}]
+
+
+async def _legacy_sessions(rows):
+    sessions = []
+    for w in (RawWorkoutRow.model_validate(r) for r in rows):
+        sets = await normalize_sets(w)
+        if not sets:
+            continue
+        sessions.append({
+            "date": w.created_at,
+            "total_volume": round(float(sum(s.weight * s.reps for s in sets)), 2),
+            "max_set_weight": round(float(max(s.weight for s in sets)), 2),
+            "avg_rpe": None,
+            "sets": [s.model_dump() for s in sets],
+        })
+    sessions.sort(key=lambda x: x["date"])
+    return sessions
+
+
+def test_session_store_matches_legacy_normalization():
+    rows = _rows()
+    legacy = asyncio.run(_legacy_sessions(rows))
+    store = SessionStore.from_rows(rows)
+
+    assert len(store) == len(legacy)
+    assert store.to_sessions(include_sets=True) == legacy
+    assert "sets" not in store.to_sessions()[0]
+
+
+def test_trend_metrics_from_store_match_session_path():
+    store = SessionStore.from_rows(_rows())
+    sessions = store.to_sessions()
+    expected = asyncio.run(compute_trend_metrics(sessions))
+    got = _trend_metrics_from_arrays(
+        np.round(store.total_volume, 2), np.round(store.max_set_weight, 2), np.round(store.avg_rpe, 2)
+    )
+    assert got == expected
+    assert expected["volume_slope"] != 0
+
+
+def test_empty_store():
+    store = SessionStore.from_rows([])
+    assert len(store) == 0
+    assert store.to_sessions() == []
+
+
+def test_sets_json_rows_use_real_per_set_data():
+    rows = _rows(6)
+    rows[0]["sets_json"] = [  # newest session
+        {"set_index": 1, "reps": 10, "weight_kg": 80, "rpe": 7},
+        {"set_index": 2, "reps": 8, "weight_kg": 85, "rpe": 8.5},
+        {"set_index": 3, "reps": 6, "weight_kg": None, "rpe": None},
+    ]
+    rows[2]["sets_json"] = [{"reps": 5, "weight_kg": 100, "rpe": 9}]
+    store = SessionStore.from_rows(rows)
+    sessions = store.to_sessions(include_sets=True)
+
+    newest = sessions[-1]
+    assert newest["total_volume"] == 10 * 80 + 8 * 85
+    assert newest["max_set_weight"] == 85
+    assert newest["avg_rpe"] == 7.75
+    assert newest["sets"][2] == {"set_index": 3, "reps": 6, "weight": 0.0, "rpe": None}
+    assert sessions[-3]["total_volume"] == 500
+    # scalar rows are untouched by the mixed layout
+    assert sessions[0]["total_volume"] == 3 * 8 * 60.0
+    assert sessions[0]["avg_rpe"] is None
+
+    legacy = [asyncio.run(normalize_sets(RawWorkoutRow.model_validate(r))) for r in rows[:1]]
+    assert [s.model_dump() for s in legacy[0]] == newest["sets"]
+
+
+def test_trend_metrics_use_logged_rpe():
+    sessions = [
+        {"total_volume": 1000 + 10 * i, "max_set_weight": 50, "avg_rpe": rpe}
+        for i, rpe in enumerate([6.0, None, 7.0, 7.5, None, 8.0])
+    ]
+    metrics = asyncio.run(compute_trend_metrics(sessions))
+    assert metrics["rpe_trend"] > 0
+    assert metrics["avg_rpe"] == round((6.0 + 7.0 + 7.5 + 8.0) / 4, 2)
+
+    no_rpe = asyncio.run(compute_trend_metrics([dict(s, avg_rpe=None) for s in sessions]))
+    assert no_rpe["rpe_trend"] == 0.0
+    assert "avg_rpe" not in no_rpe
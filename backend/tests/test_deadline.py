@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.ai import recommender
+from app.core import deadline
+from app.core.deadline import DeadlineExceeded, DeadlineMiddleware, deadline_budget, deadline_exceeded_handler
+from app.services.supabase_client import _InstrumentedQuery
+
+
+def _app():
+    app = FastAPI()
+    app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+    app.add_middleware(DeadlineMiddleware)
+
+    @app.get("/left", dependencies=[deadline_budget(5.0)])
+    async def left():
+        if not deadline.has_budget(1.0):
+            deadline.skip("llm")
+        return {"left": deadline.remaining()}
+
+    @app.get("/late")
+    async def late():
+        await asyncio.sleep(0.06)
+        deadline.check("supabase workouts.select")
+
+    return app
+
+
+def test_header_and_route_budget_and_skipped_stages():
+    client = TestClient(_app())
+    r = client.get("/left")
+    assert 4.0 < r.json()["left"] <= 5.0  # route cap below REQUEST_TIMEOUT_SEC
+    assert "x-skipped-stages" not in r.headers
+
+    r = client.get("/left", headers={"X-Request-Timeout": "0.5"})
+    assert r.json()["left"] <= 0.5
+    assert r.headers["x-skipped-stages"] == "llm"
+
+    r = client.get("/late", headers={"X-Request-Timeout": "0.05"})
+    assert r.status_code == 504
+    assert r.json()["skipped_stages"] == ["supabase workouts.select"]
+
+
+def test_llm_falls_back_without_retrying_when_budget_is_short(monkeypatch):
+    calls = []
+
+    async def failing(**kwargs):
+        calls.append(kwargs)
+        raise RuntimeError("upstream hiccup")
+
+    monkeypatch.setattr(recommender.llm_client, "chat_completion", failing)
+    monkeypatch.setattr(recommender.LLM_LATENCY, "value", 0.2)
+    base = {"exercise": "Bench Press", "suggestion_type": "increase_weight", "value": 2.5,
+            "confidence_score": 0.9, "rationale": "r"}
+
+    async def run(seconds):
+        with deadline.deadline_scope(seconds):
+            started = time.perf_counter()
+            out = await recommender.llm_enhance_suggestion(base, {}, {})
+            return out, time.perf_counter() - started, deadline.skipped_stages()
+
+    out, elapsed, skipped = asyncio.run(run(0.1))  # below one expected call
+    assert out is base and not calls and skipped == ["llm:Bench Press"]
+
+    out, elapsed, skipped = asyncio.run(run(0.5))  # one call fits, the 1 s backoff + retry doesn't
+    assert out is base and len(calls) == 1 and elapsed < 0.2
+    assert skipped == ["llm_retry:Bench Press"]
+
+
+class _Builder:
+    def __init__(self):
+        self.executed = 0
+
+    def select(self, *a):
+        return self
+
+    def upsert(self, *a, **k):
+        return self
+
+    def execute(self):
+        self.executed += 1
+        return self
+
+
+def test_expired_deadline_stops_reads_but_not_writes():
+    builder = _Builder()
+    table = _InstrumentedQuery(builder, "exercise_trend_stats")
+    with deadline.deadline_scope(-1.0):
+        with pytest.raises(DeadlineExceeded):
+            table.select("*").execute()
+        table.upsert({"state": {}}).execute()
+        with deadline.suspended():
+            table.select("*").execute()
+        assert deadline.skipped_stages() == ["supabase exercise_trend_stats.select"]
+    assert builder.executed == 2
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import executors
+from app.core.executors import QUEUE_WAIT, offload, run_sync
+from app.core.tracing import current_trace_id, root_span
+
+
+def test_offloaded_handler_and_dependency_keep_fastapi_signatures():
+    app = FastAPI()
+
+    @offload("auth")
+    def who(x_user: str = "anon"):
+        return {"id": x_user, "thread": threading.current_thread().name}
+
+    @app.get("/items/{item_id}")
+    @offload("crud")
+    def item(item_id: int, q: str = "", user: dict = Depends(who)):
+        return {"item_id": item_id, "q": q, "user": user["id"], "loop_thread": threading.current_thread().name}
+
+    before = QUEUE_WAIT.count("crud")
+    r = TestClient(app).get("/items/7?q=a&x_user=u1")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["item_id"] == 7 and body["q"] == "a" and body["user"] == "u1"
+    assert body["loop_thread"] != "MainThread"
+    assert QUEUE_WAIT.count("crud") == before + 1
+
+
+def test_saturated_pool_does_not_block_another(monkeypatch):
+    monkeypatch.setattr(executors.settings, "THREADPOOL_CRUD", 2)
+    monkeypatch.setattr(executors.settings, "THREADPOOL_AUTH", 2)
+
+    async def run():
+        release = threading.Event()
+        slow = [asyncio.create_task(run_sync("crud", release.wait, 5)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        assert executors.limiter("crud").statistics().tasks_waiting == 2
+        start = time.perf_counter()
+        with root_span("req") as s:
+            trace = await run_sync("auth", current_trace_id)
+        elapsed = time.perf_counter() - start
+        release.set()
+        await asyncio.gather(*slow)
+        return elapsed, trace, s.trace_id
+
+    elapsed, trace, expected = asyncio.run(run())
+    assert elapsed < 1.0
+    assert trace == expected  # context vars follow the call into the pool thread
@@ -0,0 +1,31 @@
+from app.ai import exercise_catalog
+from app.ai.exercise_catalog import EXERCISES_BY_ID, canonical_name, exercise_key, lookup, normalize_name, suggest
+from app.ai.fitness_advisor import _infer_is_lower_body
+
+
+def test_spelling_variants_share_one_id():
+    ids = {exercise_catalog.exercise_id(n) for n in ("Bicep Curl", "bicep curl", "bicep_curl", "Biceps Curls ")}
+    assert ids == {33}
+    assert canonical_name("bench_press") == "Barbell Bench Press"
+    assert exercise_key("Back Squat") == exercise_key("squat") == "id:45"
+
+
+def test_fuzzy_and_unknown_names():
+    assert lookup("raise lateral").id == 27
+    # near misses never get an id: they are stored and grouped as free text
+    assert lookup("Barbel Bench Pres") is None and suggest("Barbel Bench Pres").id == 1
+    assert exercise_catalog.exercise_id("Hack Squat") is None
+    assert exercise_key("Hack Squat") == "name:hack squat" != exercise_key("Back Squat")
+    assert suggest("Back Squat").id == 45
+    assert lookup("zumba") is None
+    assert exercise_key("Zumba Class") == "name:zumba class"
+    assert canonical_name("  Zumba ") == "Zumba"
+
+
+def test_catalog_attributes():
+    assert normalize_name("Farmer's Walk") == "farmer walk"
+    assert len({e.name for e in EXERCISES_BY_ID.values()}) == len(EXERCISES_BY_ID)
+    assert lookup("deadlift").is_lower_body and lookup("deadlift").increment_kg == 5.0
+    assert lookup("pull up").increment_kg is None
+    assert _infer_is_lower_body("Leg Press") and not _infer_is_lower_body("Bicep Curl")
+    assert _infer_is_lower_body("Hack Squat Machine")  # free text: marker fallback
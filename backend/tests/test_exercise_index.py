@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+from app.ai import exercise_index
+from app.ai.exercise_index import ExerciseUsage, rank_exercises
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _usage(name, count, first_days_ago, last_days_ago):
+    return ExerciseUsage(
+        exercise_name=name, session_count=count,
+        first_performed_at=NOW - timedelta(days=first_days_ago),
+        last_performed_at=NOW - timedelta(days=last_days_ago),
+    )
+
+
+def test_rank_prefers_frequent_current_and_due_exercises():
+    ranked = rank_exercises([
+        _usage("Abandoned Press", 40, 400, 200),  # frequent once, dropped long ago
+        _usage("Squat", 30, 90, 3),                # main lift, due (every ~3 days)
+        _usage("Curl", 30, 90, 0),                 # trained today
+        _usage("Lunge", 2, 10, 9),
+    ], now=NOW)
+    names = [u.exercise_name for u in ranked]
+    assert names[0] == "Squat"
+    assert names.index("Curl") < names.index("Abandoned Press")
+    assert all(0 <= u.score <= 1 for u in ranked)
+
+
+def test_write_hook_patches_cached_index():
+    user = "u-index"
+    ts = (NOW - timedelta(days=1)).isoformat()
+    exercise_index._cache_put(user, {"id:45": _usage("Barbell Back Squat", 3, 30, 5)})
+
+    exercise_index.on_workouts_changed(user, [], [{"id": "a", "exercise_name": "squat", "created_at": ts},
+                                                  {"id": "b", "exercise_name": "Sled Drag", "created_at": ts}])
+    index = exercise_index._cache_get(user)
+    squat = index["id:45"]
+    assert squat.session_count == 4 and squat.last_performed_at == NOW - timedelta(days=1)
+    assert index["name:sled drag"].session_count == 1
+
+    exercise_index.on_workouts_changed(user, [{"id": "b", "exercise_name": "Sled Drag", "created_at": ts}], [])
+    assert "name:sled drag" not in exercise_index._cache_get(user)
+
+    # deleting the newest Squat session cannot be patched: cache entry dropped
+    exercise_index.on_workouts_changed(user, [{"id": "a", "exercise_name": "Back Squat", "created_at": ts}], [])
+    assert exercise_index._cache_get(user) is None
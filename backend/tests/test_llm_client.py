@@ -0,0 +1,76 @@
+import asyncio
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import llm_client
+
+
+class _FakeClient:
+    """chat.completions.create that answers after the next scripted (delay, content)."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        delay, content = self.script[self.calls]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _content(resp):
+    text = resp.choices[0].message.content
+    if text == "bad":
+        raise ValueError("malformed")
+    return text
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    def install(script, model="m-hedge", p95=0.05):
+        client = _FakeClient(script)
+        monkeypatch.setattr(llm_client, "get_client", lambda: client)
+        monkeypatch.setitem(llm_client._latencies, model, deque([p95] * 30, maxlen=llm_client.LATENCY_WINDOW))
+        return client
+    return install
+
+
+def test_slow_primary_is_hedged_and_gain_recorded(fake):
+    client = fake([(0.4, "primary"), (0.01, "hedge")])
+    before = llm_client.HEDGED.value("m-hedge", "hedge")
+
+    async def run():
+        started = time.perf_counter()
+        out = await llm_client.chat_completion(model="m-hedge", validate=_content)
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.45)  # primary finishes in the background
+        return out, elapsed
+
+    out, elapsed = asyncio.run(run())
+    assert out == "hedge" and client.calls == 2
+    assert elapsed < 0.25
+    assert llm_client.HEDGED.value("m-hedge", "hedge") == before + 1
+    assert llm_client.HEDGE_GAIN.count("m-hedge") >= 1
+
+
+def test_fast_call_is_not_hedged_and_invalid_answer_does_not_win(fake):
+    client = fake([(0.001, "primary")])
+    assert asyncio.run(llm_client.chat_completion(model="m-hedge", validate=_content)) == "primary"
+    assert client.calls == 1
+
+    client = fake([(0.1, "primary"), (0.01, "bad")])
+    assert asyncio.run(llm_client.chat_completion(model="m-hedge", validate=_content)) == "primary"
+    assert client.calls == 2
+
+
+def test_no_hedging_until_latencies_are_known(monkeypatch):
+    assert llm_client.hedge_delay("never-called") is None
+    monkeypatch.setitem(llm_client._latencies, "m2", deque([0.1] * 5))
+    assert llm_client.hedge_delay("m2") is None  # fewer than LLM_HEDGE_MIN_SAMPLES
+    monkeypatch.setitem(llm_client._latencies, "m2", deque([i / 100 for i in range(100)]))
+    assert llm_client.hedge_delay("m2") == 0.95
@@ -0,0 +1,75 @@
+import asyncio
+
+from app.ai.llm_dispatcher import BATCH, INTERACTIVE, PREFETCH, PriorityDispatcher, QueueTimeout
+
+
+def _limits(interactive=4, prefetch=4, batch=4):
+    return {INTERACTIVE: interactive, PREFETCH: prefetch, BATCH: batch}
+
+
+async def _drain(d, waiters, order):
+    """Release one slot at a time and record which class got it."""
+    async def wait(cls):
+        await d.acquire(cls)
+        order.append(cls)
+    tasks = [asyncio.create_task(wait(c)) for c in waiters]
+    await asyncio.sleep(0)
+    for _ in waiters:
+        held = order[-1] if order else None
+        d.release(held or INTERACTIVE)
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+
+def test_weighted_fair_order_and_class_caps():
+    async def run():
+        d = PriorityDispatcher(1, _limits())
+        await d.acquire(INTERACTIVE)  # the one slot is busy; everything below queues
+        order = []
+        await _drain(d, [BATCH] * 4 + [PREFETCH] * 4 + [INTERACTIVE] * 8, order)
+        return order
+
+    order = asyncio.run(run())
+    # interactive takes most slots while every class is backlogged, but batch isn't shut out
+    assert order[:12].count(INTERACTIVE) >= 7
+    assert BATCH in order[:12] and order[-1] == BATCH
+    assert sorted(order) == sorted([BATCH] * 4 + [PREFETCH] * 4 + [INTERACTIVE] * 8)
+
+    async def capped():
+        d = PriorityDispatcher(4, _limits(batch=1))
+        await d.acquire(BATCH)
+        waiting = asyncio.create_task(d.acquire(BATCH))
+        await asyncio.sleep(0)
+        assert not waiting.done() and d.total == 1  # free slots, but batch is at its cap
+        await d.acquire(INTERACTIVE)                # interactive still gets one at once
+        d.release(BATCH)
+        await waiting
+        return d.in_flight
+
+    assert asyncio.run(capped()) == {INTERACTIVE: 1, PREFETCH: 0, BATCH: 1}
+
+
+def test_starving_waiter_is_served_first_and_timeouts_leave_the_queue():
+    async def run():
+        d = PriorityDispatcher(1, _limits(), starvation_sec=0.05)
+        await d.acquire(INTERACTIVE)
+        batch = asyncio.create_task(d.acquire(BATCH))
+        await asyncio.sleep(0.06)
+        interactive = asyncio.create_task(d.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        d.release(INTERACTIVE)
+        await batch
+        assert not interactive.done()  # the aged batch call went first
+
+        try:
+            await d.acquire(PREFETCH, timeout=0.01)
+        except QueueTimeout:
+            pass
+        else:
+            raise AssertionError("expected QueueTimeout")
+        assert d.queued(PREFETCH) == 0
+        assert not d.try_acquire(INTERACTIVE)  # no spare capacity for hedges
+        d.release(BATCH)
+        await interactive
+
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+import io
+import json
+import logging
+
+from app.core import log
+from app.core.log import Lazy, SamplingFilter, parse_sampling
+
+
+def _record(name, level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, "msg %s", ("x",), None)
+
+
+def test_parse_sampling():
+    assert parse_sampling("app.services=0.1, app.api=2,bogus") == {"app.services": 0.1, "app.api": 1.0}
+    assert parse_sampling("") == {}
+
+
+def test_sampling_by_logger_prefix_keeps_warnings():
+    f = SamplingFilter({"app.services": 0.0})
+    assert not f.filter(_record("app.services.workout_service"))
+    assert f.filter(_record("app.services.workout_service", logging.WARNING))
+    assert f.filter(_record("app.api.routes.workouts"))
+
+
+def test_queue_handler_formats_off_thread(monkeypatch):
+    monkeypatch.setattr(log.settings, "LOG_FORMAT", "json")
+    monkeypatch.setattr(log.settings, "LOG_LEVEL", "DEBUG")
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    calls = []
+    out = io.StringIO()
+    monkeypatch.setattr(log, "_listener", None)  # app.main may have installed one already
+    log.setup_logging(stream=out)
+    try:
+        logging.getLogger("app.test").debug("rows=%d %s", 3, Lazy(lambda: calls.append(1) or "lazy"),
+                                            extra={"fields": {"user_id": "u1"}})
+    finally:
+        log.shutdown_logging()
+        root.handlers[:], root.level = saved
+    line = json.loads(out.getvalue().strip().splitlines()[-1])
+    assert line["msg"] == "rows=3 lazy"
+    assert line["user_id"] == "u1" and line["logger"] == "app.test"
+    assert calls == [1]
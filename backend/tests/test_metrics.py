@@ -0,0 +1,59 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import Counter, Gauge, Histogram, MetricsMiddleware, Registry
+from app.services.supabase_client import SUPABASE_DURATION, _InstrumentedQuery
+
+
+def test_text_format():
+    reg = Registry()
+    c = Counter("jobs_total", "Jobs.", ("kind",), registry=reg)
+    h = Histogram("job_seconds", "Job time.", ("kind",), buckets=(0.1, 1.0), registry=reg)
+    Gauge("queue_depth", "Depth.", fn=lambda: 3, registry=reg)
+    c.inc('a"b')
+    c.inc('a"b', amount=2)
+    for v in (0.05, 0.1, 0.5, 7):
+        h.observe(v, "x")
+
+    text = reg.render()
+    assert '# TYPE jobs_total counter\njobs_total{kind="a\\"b"} 3\n' in text
+    assert 'job_seconds_bucket{kind="x",le="0.1"} 2' in text
+    assert 'job_seconds_bucket{kind="x",le="1"} 3' in text
+    assert 'job_seconds_bucket{kind="x",le="+Inf"} 4' in text
+    assert 'job_seconds_count{kind="x"} 4' in text
+    assert "queue_depth 3" in text
+
+
+def test_middleware_labels_route_templates():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+    before = metrics.HTTP_REQUESTS.value("GET", "/items/{item_id}", "200")
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nope")
+
+    assert metrics.HTTP_REQUESTS.value("GET", "/items/{item_id}", "200") == before + 2
+    assert metrics.HTTP_REQUESTS.value("GET", "<unmatched>", "404") >= 1
+    assert metrics.HTTP_IN_FLIGHT.value("GET") == 0
+
+
+class _Builder:
+    def __getattr__(self, name):
+        return lambda *a, **k: self
+
+    def execute(self):
+        return "rows"
+
+
+def test_supabase_proxy_times_execute_by_table_and_operation():
+    before = SUPABASE_DURATION.count("widgets", "update")
+    q = _InstrumentedQuery(_Builder(), "widgets")
+    assert q.update({"a": 1}).eq("id", 1).select("*").execute() == "rows"
+    assert SUPABASE_DURATION.count("widgets", "update") == before + 1
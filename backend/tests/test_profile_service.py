@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+from app.services import profile_service
+
+
+class _FakeUsers:
+    """`users` table stand-in: select returns the stored row, upsert ignores duplicates."""
+
+    def __init__(self):
+        self.rows = {}
+        self.selects = 0
+        self.upserts = 0
+        self.lock = threading.Lock()
+        self._op = self._user = self._payload = None
+
+    def table(self, name):
+        return self
+
+    def select(self, *a):
+        self._op = "select"
+        return self
+
+    def upsert(self, payload, **kw):
+        self._op, self._payload = "upsert", payload
+        return self
+
+    def update(self, payload):
+        self._op, self._payload = "update", payload
+        return self
+
+    def eq(self, col, value):
+        self._user = value
+        return self
+
+    def maybe_single(self):
+        return self
+
+    single = maybe_single
+
+    def execute(self):
+        with self.lock:
+            op, user = self._op, self._user
+            if op == "select":
+                self.selects += 1
+                time.sleep(0.01)  # give concurrent callers a chance to pile up
+                row = self.rows.get(user)
+                return type("R", (), {"data": dict(row) if row else None})()
+            if op == "upsert":
+                self.upserts += 1
+                self.rows.setdefault(self._payload["id"], dict(self._payload))
+                return type("R", (), {"data": [self.rows[self._payload["id"]]]})()
+            self.rows[user].update(self._payload)
+            return type("R", (), {"data": [dict(self.rows[user])]})()
+
+
+def test_concurrent_first_reads_share_one_fetch_and_insert(monkeypatch):
+    fake = _FakeUsers()
+    monkeypatch.setattr(profile_service, "supabase", fake)
+    profile_service.invalidate("new-user")
+
+    async def run():
+        return await asyncio.gather(*[profile_service.get_profile("new-user", "a@b.co") for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert all(r == {"id": "new-user", "email": "a@b.co"} for r in results)
+    assert fake.upserts == 1
+
+    selects = fake.selects
+    assert asyncio.run(profile_service.get_profile("new-user"))["email"] == "a@b.co"
+    assert fake.selects == selects  # served from cache
+
+
+def test_update_writes_through(monkeypatch):
+    fake = _FakeUsers()
+    fake.rows["u1"] = {"id": "u1", "email": "u1@x.co", "weight": 80.0}
+    monkeypatch.setattr(profile_service, "supabase", fake)
+    profile_service.invalidate("u1")
+
+    asyncio.run(profile_service.get_profile("u1"))
+    updated = asyncio.run(profile_service.update_profile("u1", {"weight": 78.5}))
+    selects = fake.selects
+    assert updated["weight"] == 78.5
+    assert asyncio.run(profile_service.get_profile("u1"))["weight"] == 78.5
+    assert fake.selects == selects
+
+
+def test_fetch_racing_an_update_does_not_cache_the_old_row(monkeypatch):
+    fake = _FakeUsers()
+    fake.rows["u2"] = {"id": "u2", "email": "u2@x.co", "weight": 80.0}
+    monkeypatch.setattr(profile_service, "supabase", fake)
+    profile_service.invalidate("u2")
+
+    async def run():
+        read = asyncio.ensure_future(profile_service.get_profile("u2"))
+        while fake.selects == 0:  # the read has fetched the old row
+            await asyncio.sleep(0.001)
+        await profile_service.update_profile("u2", {"weight": 78.5})
+        return await read
+
+    assert asyncio.run(run())["weight"] == 80.0
+    selects = fake.selects
+    assert asyncio.run(profile_service.get_profile("u2"))["weight"] == 78.5
+    assert fake.selects == selects  # the write-through row survived
+
+
+def test_waiters_refetch_when_the_owner_is_cancelled(monkeypatch):
+    fake = _FakeUsers()
+    fake.rows["u3"] = {"id": "u3", "email": "u3@x.co"}
+    monkeypatch.setattr(profile_service, "supabase", fake)
+    profile_service.invalidate("u3")
+
+    async def run():
+        owner = asyncio.ensure_future(profile_service.get_profile("u3"))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(profile_service.get_profile("u3"))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == {"id": "u3", "email": "u3@x.co"}
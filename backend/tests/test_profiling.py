@@ -0,0 +1,43 @@
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.profiling import ProfilerMiddleware, note_history_size
+
+
+def _client(tmp_path, monkeypatch, rate=0.0):
+    monkeypatch.setattr(profiling.settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling.settings, "PROFILE_ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling.settings, "PROFILE_SAMPLE_RATE", rate)
+    app = FastAPI()
+
+    @app.get("/history/{user_id}")
+    async def history(user_id: str):
+        note_history_size(1234)
+        return {"total": sum(range(10_000))}
+
+    app.add_middleware(ProfilerMiddleware)
+    return TestClient(app)
+
+
+def test_admin_header_writes_tagged_pstats(tmp_path, monkeypatch):
+    client = _client(tmp_path, monkeypatch)
+    client.get("/history/u1")
+    client.get("/history/u1", headers={"X-Profile": "wrong"})
+    assert list(tmp_path.iterdir()) == []
+
+    client.get("/history/u1", headers={"X-Profile": "s3cret"})
+    client.get("/history/u1?profile=s3cret")
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 2
+    assert "_GET_history-user-id_h1234_" in files[0].name
+    stats = pstats.Stats(str(files[0]))
+    assert any(fn[2] == "history" for fn in stats.stats)
+
+
+def test_sampling_rate_profiles_without_token(tmp_path, monkeypatch):
+    client = _client(tmp_path, monkeypatch, rate=1.0)
+    client.get("/history/u2")
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+from app.ai import prompts
+from app.ai.recommender import USER_PROMPT_TEMPLATE
+
+TREND = {"volume_slope": -45.123456789, "weight_slope": 1.2500000001, "rpe_trend": 0.03333333333,
+         "consistency": 0.0241234, "avg_rpe": 7.6666666667, "sessions": 12, "last_rpe": None}
+BASE = {"exercise": "Barbell Bench Press", "suggestion_type": "increase_weight", "value": 2.5,
+        "confidence_score": 0.9, "rationale": "Consistent performance with moderate RPE and non-declining "
+        "volume — apply a small load increase."}
+PROFILE = {"id": "6f1c0d2e-8a4b-4c3d-9e1f-2a3b4c5d6e7f", "email": "lifter@example.com", "username": "lifter",
+           "age": 31, "gender": "female", "height": 168.0, "weight": 63.45, "training_experience": "intermediate",
+           "created_at": "2025-11-02T08:15:42.123456+00:00", "updated_at": "2026-03-01T19:01:02.654321+00:00",
+           "maintenance_calories": None, "avatar_url": None}
+
+
+def _old_prompt():
+    return USER_PROMPT_TEMPLATE.format(EXERCISE_TREND_JSON=json.dumps(TREND, indent=2),
+                                       BASE_PAYLOAD_JSON=json.dumps(BASE, indent=2),
+                                       USER_PROFILE_JSON=json.dumps(PROFILE, indent=2))
+
+
+def _new_prompt():
+    return USER_PROMPT_TEMPLATE.format(EXERCISE_TREND_JSON=prompts.compact_json(TREND),
+                                       BASE_PAYLOAD_JSON=prompts.compact_json(BASE),
+                                       USER_PROFILE_JSON=prompts.compact_json(prompts.profile_context(PROFILE)))
+
+
+def test_compaction_cuts_prompt_tokens():
+    old, new = prompts.estimate_tokens(_old_prompt()), prompts.estimate_tokens(_new_prompt())
+    assert new <= 0.7 * old, (old, new)
+    # the data sections alone shrink by about half
+    payload_old = sum(prompts.estimate_tokens(json.dumps(x, indent=2)) for x in (TREND, BASE, PROFILE))
+    payload_new = sum(prompts.estimate_tokens(prompts.compact_json(x))
+                      for x in (TREND, BASE, prompts.profile_context(PROFILE)))
+    assert payload_new <= 0.6 * payload_old, (payload_old, payload_new)
+
+
+def test_compact_json_is_canonical_rounded_and_whitelisted():
+    assert prompts.compact_json({"b": 1.0, "a": np.float64(0.123456), "c": None, "d": np.int64(3)}) == \
+        '{"a":0.12,"b":1,"d":3}'
+    ctx = prompts.profile_context(PROFILE)
+    assert set(ctx) == {"age", "gender", "height", "weight", "training_experience"}
+
+
+def test_budget_drops_profile_before_giving_up():
+    sections = [("profile", prompts.compact_json(prompts.profile_context(PROFILE)), True),
+                ("trend", prompts.compact_json(TREND), False),
+                ("base", prompts.compact_json(BASE), False)]
+
+    def render(t):
+        return USER_PROMPT_TEMPLATE.format(EXERCISE_TREND_JSON=t["trend"], BASE_PAYLOAD_JSON=t["base"],
+                                           USER_PROFILE_JSON=t["profile"])
+
+    full = prompts.estimate_tokens(render({n: s for n, s, _ in sections}))
+    assert prompts.fit_sections(sections, render, full) == (render({n: s for n, s, _ in sections}), [])
+    prompt, dropped = prompts.fit_sections(sections, render, full - 5)
+    assert dropped == ["profile"] and prompt is not None and "intermediate" not in prompt
+    assert prompts.fit_sections(sections, render, 20) == (None, ["profile"])
@@ -0,0 +1,59 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import rate_limit
+from app.core.auth import get_current_user
+from app.core.rate_limit import MemoryBackend, rate_limited
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _client(monkeypatch, user="u1"):
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_PER_MIN", 60.0)  # 1 token / s
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_BURST", 4.0)
+    app = FastAPI()
+    app.dependency_overrides[get_current_user] = lambda: {"id": app.state.user}
+    app.state.user = user
+
+    @app.get("/expensive", dependencies=[rate_limited(2)])
+    async def expensive():
+        return {"ok": True}
+
+    return app, TestClient(app)
+
+
+def test_bucket_per_user_with_retry_after(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit, "_backend", MemoryBackend(clock=clock))
+    app, client = _client(monkeypatch)
+    before = rate_limit.DECISIONS.value("/expensive", "limited")
+
+    assert [client.get("/expensive").status_code for _ in range(2)] == [200, 200]
+    r = client.get("/expensive")
+    assert r.status_code == 429 and r.headers["retry-after"] == "2"
+    assert rate_limit.DECISIONS.value("/expensive", "limited") == before + 1
+
+    app.state.user = "u2"  # someone else's bucket is untouched
+    assert client.get("/expensive").status_code == 200
+
+    app.state.user = "u1"
+    clock.now = 2.0  # refilled 2 tokens = one more call
+    assert client.get("/expensive").status_code == 200
+    assert client.get("/expensive").status_code == 429
+    assert rate_limit._bucket_stats() == {("tracked",): 2.0, ("exhausted",): 1.0}
+
+
+def test_backend_failure_fails_open(monkeypatch):
+    class Broken:
+        async def take(self, *a):
+            raise ConnectionError("store down")
+
+    monkeypatch.setattr(rate_limit, "_backend", Broken())
+    _, client = _client(monkeypatch)
+    assert all(client.get("/expensive").status_code == 200 for _ in range(5))
@@ -0,0 +1,47 @@
+import asyncio
+from datetime import date
+
+from app.schemas.meal import DailyTotals
+from app.services import recommendation_service as rs
+
+RISING = {"volume_slope": 5.0, "weight_slope": 1.0, "rpe_trend": 0.0, "consistency": 1.0, "avg_rpe": 6.5}
+
+
+def _patch(monkeypatch, calories):
+    async def top(user_id, limit):
+        return ["Barbell Bench Press", "Back Squat"][:limit]
+
+    async def metrics(user_id, name):
+        return dict(RISING)
+
+    async def profile(user_id, email=None):
+        return {"id": user_id, "weight": 80.0}
+
+    async def totals(user_id, start, end):
+        return [DailyTotals(date=date(2026, 1, d), total_calories=calories, total_protein_g=100,
+                            total_carbs_g=250, total_fats_g=70) for d in range(1, 11)]
+
+    monkeypatch.setattr(rs, "get_top_exercises", top)
+    monkeypatch.setattr(rs, "get_trend_metrics", metrics)
+    monkeypatch.setattr(rs.profile_service, "get_profile", profile)
+    monkeypatch.setattr(rs.meal_service, "get_daily_totals", totals)
+
+
+def test_combined_recommendations(monkeypatch):
+    _patch(monkeypatch, calories=2600)
+    out = asyncio.run(rs.build_recommendations("u1", window_days=14))
+
+    recs = out["recommendations"]
+    assert [r["exercise"] for r in recs] == ["Barbell Bench Press", "Back Squat"]
+    assert all(r["suggestion_type"] == "increase_weight" and r["confidence_score"] == 0.9 for r in recs)
+    assert recs[0]["suggestion"].startswith("Increase weight by")
+    assert out["nutrition"]["days_logged"] == 10 and out["nutrition"]["protein_target_g"] == 128
+    assert any("Protein" in a for a in out["nutrition_advice"])
+
+
+def test_calorie_deficit_tempers_load_increases(monkeypatch):
+    _patch(monkeypatch, calories=1800)  # maintenance 80 kg * 32 = 2560
+    out = asyncio.run(rs.build_recommendations("u1", window_days=14))
+    assert out["nutrition"]["calorie_balance"] == -760
+    assert all(r["confidence_score"] == 0.72 for r in out["recommendations"])
+    assert any("below maintenance" in a for a in out["nutrition_advice"])
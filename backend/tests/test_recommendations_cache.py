@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.ai import recommendations_cache
+from app.jobs.precompute_recommendations import _score_batch
+
+NOW = datetime(2025, 10, 1, tzinfo=timezone.utc)
+
+
+def _rows(user_id, specs):
+    rows, k = [], 0
+    for name, n, last_day in specs:
+        for i in range(n):
+            k += 1
+            rows.append({
+                "id": f"{user_id}-{k}", "user_id": user_id, "exercise_name": name,
+                "sets": 3, "reps": 8, "weight": 50.0 + 2.5 * i,
+                "created_at": (NOW - timedelta(days=last_day + 3 * (n - 1 - i))).isoformat(),
+            })
+    return rows
+
+
+def test_score_batch_ranks_every_exercise():
+    histories = {
+        "u1": _rows("u1", [("Bench Press", 10, 1), ("Deadlift", 2, 40), ("bench press", 2, 2)]),
+        "u2": [],
+    }
+    out = _score_batch(histories, NOW)
+
+    assert [r["user_id"] for r in out] == ["u1"]
+    row = out[0]
+    assert [s["exercise_name"] for s in row["suggestions"]] == ["Barbell Bench Press", "Deadlift"]
+    bench = row["suggestions"][0]
+    assert bench["base_suggestion"]["suggestion_type"] == "increase_weight"
+    assert bench["enriched_suggestion"] == bench["base_suggestion"]
+    assert row["last_workout_at"].startswith((NOW - timedelta(days=1)).date().isoformat())
+
+
+def test_batch_scoring_matches_single_user():
+    histories = {
+        "u1": _rows("u1", [("Bench Press", 14, 1), ("Back Squat", 5, 4)]),
+        "u2": _rows("u2", [("Back Squat", 3, 2), ("Zumba Class", 1, 9)]),
+    }
+    batch = {r["user_id"]: r for r in recommendations_cache.score_histories(histories, now=NOW)}
+    for user_id, rows in histories.items():
+        assert batch[user_id] == recommendations_cache.score_user_history(user_id, rows, now=NOW)
+
+
+class _Table:
+    def __init__(self, data):
+        self.data = data
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self
+
+    def execute(self):
+        return self
+
+
+def test_fresh_suggestions_require_the_current_data_version(monkeypatch):
+    cached = {"suggestions": [{"exercise_name": "A"}, {"exercise_name": "B"}], "data_version": 7}
+    tables = {recommendations_cache.TABLE: [cached],
+              recommendations_cache.VERSIONS: [{"user_id": "u1", "workouts_version": 7}]}
+    monkeypatch.setattr(recommendations_cache.settings, "RECOMMENDATIONS_CACHE", True)
+    monkeypatch.setattr(recommendations_cache.supabase, "table", lambda name: _Table(tables[name]))
+    assert asyncio.run(recommendations_cache.get_fresh_suggestions("u1", 1)) == [{"exercise_name": "A"}]
+
+    # any write (insert, edit or delete, on any worker) bumps the version
+    tables[recommendations_cache.VERSIONS] = [{"user_id": "u1", "workouts_version": 8}]
+    assert asyncio.run(recommendations_cache.get_fresh_suggestions("u1", 1)) is None
+
+    monkeypatch.setattr(recommendations_cache.settings, "RECOMMENDATIONS_CACHE", False)
+    assert asyncio.run(recommendations_cache.get_fresh_suggestions("u1", 1)) is None
@@ -0,0 +1,42 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.core.responses import FastJSONResponse, trusted_rows
+from app.schemas.workout import WorkoutResponse
+
+ROW = {"id": "00000000-0000-0000-0000-000000000001", "user_id": "00000000-0000-0000-0000-000000000002",
+       "exercise_name": "Squat", "sets": 3, "reps": 5, "created_at": "2026-01-01T10:00:00+00:00",
+       "extra_column": "dropped"}
+
+
+def test_trusted_rows_project_onto_model_fields():
+    [row] = trusted_rows(WorkoutResponse, [ROW])
+    assert set(row) == set(WorkoutResponse.model_fields)
+    assert row["weight"] is None and row["sets_json"] == [] and row["exercise_id"] is None
+    assert json.loads(FastJSONResponse([row]).body) == [row]
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("identity") is None
+
+
+def test_large_bodies_are_compressed_small_ones_are_not():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/rows")
+    def rows(n: int):
+        return FastJSONResponse(trusted_rows(WorkoutResponse, [ROW] * n))
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    client = TestClient(app)
+    big = client.get("/rows?n=100", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in big.headers["vary"]
+    assert len(big.json()) == 100  # httpx decodes transparently
+    small = client.get("/rows?n=1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.ai import data_prep, rolling
+from app.ai.data_prep import SessionStore
+from app.ai.rolling import compute_rolling_series, compute_rolling_summaries
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _store(n):
+    rows = []
+    for i in range(n):
+        row = {
+            "id": f"w{i}", "sets": 3, "reps": 8, "weight": 50.0 + i,
+            "created_at": (BASE + timedelta(days=i)).isoformat(),
+        }
+        if i % 3 == 0:
+            row["sets_json"] = [{"reps": 8, "weight_kg": 50.0 + i, "rpe": 6 + (i % 4)}]
+        rows.append(row)
+    return SessionStore.from_rows(rows)
+
+
+def _naive(store, end, w):
+    """Direct re-scan of the window, as the SQL view did."""
+    vol, top, rpe = store.total_volume[:end], store.max_set_weight[:end], store.avg_rpe[:end]
+    cur = slice(max(end - w, 0), end)
+    prev = slice(max(end - 2 * w, 0), max(end - w, 0))
+    rpes = rpe[cur][~np.isnan(rpe[cur])]
+    pct = None
+    if len(vol[prev]):
+        pct = round(float((vol[cur].mean() - vol[prev].mean()) / vol[prev].mean() * 100), 2)
+    return {
+        "occurrences": len(vol[cur]),
+        "avg_total_volume": round(float(vol[cur].mean()), 2),
+        "avg_max_weight": round(float(top[cur].mean()), 2),
+        "avg_rpe": round(float(rpes.mean()), 2) if len(rpes) else None,
+        "trend_volume_pct_change": pct,
+    }
+
+
+def test_series_matches_naive_rescan():
+    store = _store(30)
+    series = compute_rolling_series(store)
+    assert len(series) == 30
+    for end, summaries in enumerate(series, start=1):
+        assert [s.window_size for s in summaries] == [4, 8, 12]
+        for s in summaries:
+            got = s.model_dump(include={"occurrences", "avg_total_volume", "avg_max_weight",
+                                        "avg_rpe", "trend_volume_pct_change"})
+            assert got == _naive(store, end, s.window_size)
+            assert s.last_performed_at == store.dates[end - 1]
+
+
+def test_latest_summary_and_short_history():
+    store = _store(5)
+    latest = compute_rolling_summaries(store)
+    assert latest == compute_rolling_series(store)[-1]
+    assert latest[1].occurrences == 5 and latest[1].trend_volume_pct_change is None
+    assert compute_rolling_summaries(_store(0)) == []
+
+
+class _Table:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        return lambda *a, **k: self
+
+    def execute(self):
+        return self
+
+
+def test_refresh_only_deletes_on_an_empty_history(monkeypatch):
+    calls = []
+    monkeypatch.setattr(rolling.supabase, "table", lambda name: _Table(calls))
+
+    async def failing(*args):
+        raise ConnectionError("supabase unavailable")
+
+    monkeypatch.setattr(data_prep, "_query_workout_rows", failing)
+    with pytest.raises(ConnectionError):
+        asyncio.run(rolling.refresh_rolling_summaries("u1", "Squat"))
+    assert "delete" not in calls
+
+    async def empty(*args):
+        return []
+
+    monkeypatch.setattr(data_prep, "_query_workout_rows", empty)
+    assert asyncio.run(rolling.refresh_rolling_summaries("u1", "Squat")) == []
+    assert "delete" in calls
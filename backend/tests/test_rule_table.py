@@ -0,0 +1,61 @@
+import asyncio
+import random
+
+import numpy as np
+
+from app.ai.fitness_advisor import build_suggestion_payload
+from app.ai.rule_table import columns_from_metrics, evaluate, increments_for, score_exercises
+
+EXERCISES = ["Bench Press", "squat", "Deadlift", "Pull-Up", "Lateral Raise", "Mystery Lift", "Leg Curl"]
+
+# values straddling every threshold used by the rules
+SLOPES = [-1.0, -0.5, -0.2, -0.1, -0.01, -0.005, 0.0, 0.004, 0.005, 0.01, 0.02, 0.3, 2.0]
+RPE_TRENDS = [-0.5, -0.2, -0.1, 0.0, 0.1, 0.2, 0.3]
+AVG_RPES = [None, 0.0, 4.0, 5.0, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5]
+CONSISTENCY = [None, 0.2, 0.8, 0.9, 3.0]
+
+
+def _random_metrics(rng):
+    m = {
+        "volume_slope": rng.choice(SLOPES),
+        "weight_slope": rng.choice(SLOPES),
+        "rpe_trend": rng.choice(RPE_TRENDS),
+    }
+    c, rpe = rng.choice(CONSISTENCY), rng.choice(AVG_RPES)
+    if c is not None:
+        m["consistency"] = c
+    if rpe is not None:
+        m["avg_rpe"] = rpe
+    return m
+
+
+async def _scalar(names, metrics):
+    return [await build_suggestion_payload(n, m) for n, m in zip(names, metrics)]
+
+
+def test_vectorized_rules_match_build_suggestion_payload():
+    rng = random.Random(42)
+    metrics = [_random_metrics(rng) for _ in range(3000)]
+    names = [rng.choice(EXERCISES) for _ in metrics]
+
+    expected = asyncio.run(_scalar(names, metrics))
+    assert score_exercises(names, metrics) == expected
+    assert {e["suggestion_type"] for e in expected} == {
+        "increase_weight", "increase_reps", "increase_sets", "recovery", "maintain"
+    }
+
+
+def test_matrix_input_users_by_exercises():
+    rng = random.Random(1)
+    users, exercises = 40, len(EXERCISES)
+    metrics = [[_random_metrics(rng) for _ in range(exercises)] for _ in range(users)]
+    flat = columns_from_metrics([m for row in metrics for m in row])
+    cols = {k: v.reshape(users, exercises) for k, v in flat.items()}
+    inc = increments_for(EXERCISES)  # one per exercise column, broadcast over users
+
+    result = evaluate(cols, inc)
+    assert result.suggestion_type.shape == (users, exercises)
+    expected = asyncio.run(_scalar(EXERCISES, metrics[7]))
+    assert list(result.suggestion_type[7]) == [e["suggestion_type"] for e in expected]
+    got_values = [None if np.isnan(v) else v for v in result.value[7]]
+    assert got_values == [e["value"] for e in expected]
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import tracing
+from app.core.tracing import TracingMiddleware, span, traced
+
+
+@traced()
+async def _load(n):
+    with span("inner.step", n=n):
+        await asyncio.sleep(0)
+    return n
+
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": await _load(item_id)}
+
+    app.add_middleware(TracingMiddleware)
+    return TestClient(app)
+
+
+def _spans(path):
+    tracing.flush()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_request_spans_are_nested_and_exported(tmp_path, monkeypatch):
+    out = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing.settings, "TRACE_EXPORTER", "file")
+    monkeypatch.setattr(tracing.settings, "TRACE_FILE", str(out))
+    monkeypatch.setattr(tracing.settings, "TRACE_SAMPLE_RATE", 1.0)
+
+    resp = _app().get("/items/3")
+    trace_id = resp.headers["x-trace-id"]
+    assert resp.headers["traceparent"].startswith(f"00-{trace_id}-")
+
+    spans = {s["name"]: s for s in _spans(out)}
+    assert set(spans) == {"GET /items/{item_id}", "test_tracing._load", "inner.step"}
+    assert {s["traceId"] for s in spans.values()} == {trace_id}
+    root = spans["GET /items/{item_id}"]
+    assert root["parentSpanId"] == "" and root["attributes"]["http.status_code"] == 200
+    assert spans["test_tracing._load"]["parentSpanId"] == root["spanId"]
+    assert spans["inner.step"]["parentSpanId"] == spans["test_tracing._load"]["spanId"]
+    assert spans["inner.step"]["attributes"] == {"n": 3}
+
+
+def test_incoming_traceparent_and_unsampled_requests(tmp_path, monkeypatch):
+    out = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing.settings, "TRACE_EXPORTER", "file")
+    monkeypatch.setattr(tracing.settings, "TRACE_FILE", str(out))
+    monkeypatch.setattr(tracing.settings, "TRACE_SAMPLE_RATE", 0.0)
+    client = _app()
+    parent = "00-" + "ab" * 16 + "-" + "cd" * 8 + "-01"
+
+    resp = client.get("/items/1", headers={"traceparent": parent})
+    assert resp.headers["x-trace-id"] == "ab" * 16
+    root = [s for s in _spans(out) if s["name"] == "GET /items/{item_id}"]
+    assert root[0]["traceId"] == "ab" * 16 and root[0]["parentSpanId"] == "cd" * 8
+
+    out.unlink()
+    resp = client.get("/items/2")  # sample rate 0: id echoed, nothing exported
+    assert len(resp.headers["x-trace-id"]) == 32
+    tracing.flush()
+    assert not out.exists()
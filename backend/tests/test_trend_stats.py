@@ -0,0 +1,141 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.ai import trend_stats
+from app.ai.data_prep import SessionStore, compute_trend_metrics
+from app.ai.trend_stats import TREND_WINDOW, TrendStats, _apply_changes
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(i, rng):
+    row = {
+        "id": f"w{i}", "exercise_name": "Squat", "sets": rng.randint(1, 5),
+        "reps": rng.randint(3, 12), "weight": round(rng.uniform(40, 140), 1),
+        "created_at": (BASE + timedelta(days=i)).isoformat(),
+    }
+    if rng.random() < 0.5:
+        row["sets_json"] = [
+            {"reps": rng.randint(3, 12), "weight_kg": round(rng.uniform(40, 140), 1),
+             "rpe": rng.choice([None, 6, 7, 7.5, 8, 9])}
+            for _ in range(rng.randint(1, 4))
+        ]
+    return row
+
+
+def _expected(rows):
+    sessions = SessionStore.from_rows(rows[-TREND_WINDOW:]).to_sessions()
+    return asyncio.run(compute_trend_metrics(sessions))
+
+
+def _close(a, b):
+    assert a.keys() == b.keys()
+    for k in a:
+        assert abs(a[k] - b[k]) <= 1e-3, (k, a[k], b[k])
+
+
+def test_streaming_appends_match_full_recomputation():
+    rng = random.Random(7)
+    rows, stats = [], TrendStats()
+    for i in range(40):
+        rows.append(_row(i, rng))
+        stats = _apply_changes(stats, [], [rows[-1]])
+        _close(stats.metrics(), _expected(rows))
+    assert len(stats.entries) == TREND_WINDOW
+
+
+def test_in_window_edit_is_incremental_and_delete_requires_rebuild():
+    rng = random.Random(3)
+    rows = [_row(i, rng) for i in range(20)]
+    stats = TrendStats.from_store(SessionStore.from_rows(rows))
+
+    edited = dict(rows[-3], reps=20, sets_json=[])
+    stats = _apply_changes(stats, [rows[-3]], [edited])
+    rows[-3] = edited
+    _close(stats.metrics(), _expected(rows))
+
+    assert _apply_changes(stats, [rows[-5]], []) is None           # in window
+    assert _apply_changes(stats, [rows[0]], []) is stats            # already evicted
+    assert _apply_changes(stats, [], [dict(rows[10], id="late")]) is None  # back-dated
+
+
+def test_state_round_trips_through_json():
+    rng = random.Random(11)
+    stats = TrendStats.from_store(SessionStore.from_rows([_row(i, rng) for i in range(15)]))
+    assert TrendStats.from_dict(stats.to_dict()).metrics() == stats.metrics()
+    assert set(stats.ewma) >= {"volume_fast", "volume_slow", "weight_fast", "weight_slow"}
+
+
+class _VersionedTable:
+    """exercise_trend_stats for one user/exercise: a row {state, version} or None."""
+
+    def __init__(self):
+        self.row = None
+        self.before_update = None  # hook: another writer saving first
+        self._op = self._json = None
+        self._filters = {}
+
+    def select(self, *a):
+        self._op, self._filters = "select", {}
+        return self
+
+    def update(self, json):
+        self._op, self._json, self._filters = "update", json, {}
+        return self
+
+    def upsert(self, json, **kw):
+        self._op, self._json, self._filters = "upsert", json, {}
+        return self
+
+    def eq(self, column, value):
+        self._filters[column] = value
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def execute(self):
+        class Resp:
+            data = None
+        resp = Resp()
+        if self._op == "select":
+            resp.data = dict(self.row) if self.row else None
+        elif self._op == "upsert":
+            if self.row is None:
+                self.row = {"state": self._json["state"], "version": self._json["version"]}
+                resp.data = [self.row]
+            else:
+                resp.data = []
+        else:
+            if self.before_update:
+                hook, self.before_update = self.before_update, None
+                hook()
+            if self.row and self.row["version"] == self._filters.get("version"):
+                self.row = {"state": self._json["state"], "version": self._json["version"]}
+                resp.data = [self.row]
+            else:
+                resp.data = []
+        return resp
+
+
+def test_concurrent_writes_do_not_lose_an_update(monkeypatch):
+    rng = random.Random(5)
+    rows = [_row(i, rng) for i in range(14)]
+    table = _VersionedTable()
+    table.row = {"state": TrendStats.from_store(SessionStore.from_rows(rows[:12])).to_dict(), "version": 1}
+    monkeypatch.setattr(trend_stats.settings, "TREND_STATS_PERSIST", True)
+    monkeypatch.setattr(trend_stats.supabase, "table", lambda name: table)
+
+    def other_worker_appends():
+        stats = TrendStats.from_dict(table.row["state"])
+        stats.append(*next(trend_stats._session_values(SessionStore.from_rows([rows[12]]))))
+        table.row = {"state": stats.to_dict(), "version": table.row["version"] + 1}
+
+    table.before_update = other_worker_appends
+    asyncio.run(trend_stats.on_workouts_changed("u1", [], [rows[13]]))
+
+    assert table.row["version"] == 3
+    stored = TrendStats.from_dict(table.row["state"])
+    assert [e[1] for e in stored.entries][-2:] == ["w12", "w13"]
+    _close(stored.metrics(), _expected(rows))
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.ai import data_prep, fitness_advisor
+from app.ai.data_prep import (
+    SessionStore,
+    _trend_metrics_from_arrays,
+    grouped_trend_metrics,
+    history_frame,
+)
+from app.ai.exercise_catalog import exercise_key
+from app.ai.fitness_advisor import build_suggestion_payload
+
+BASE = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+
+def _history():
+    rng = np.random.default_rng(7)
+    rows = []
+    # "bench press" / "Bench Press" resolve to one catalog exercise
+    specs = [("Bench Press", 15), ("bench press", 3), ("Back Squat", 9), ("Zumba Class", 1), ("Cable Fly", 2)]
+    k = 0
+    for name, n in specs:
+        for i in range(n):
+            k += 1
+            row = {
+                "id": f"w{k}",
+                "exercise_name": name,
+                "sets": int(rng.integers(2, 5)),
+                "reps": int(rng.integers(5, 12)),
+                "weight": float(rng.integers(20, 120)),
+                "created_at": (BASE + timedelta(days=int(rng.integers(0, 90)), minutes=k)).isoformat(),
+            }
+            if name == "Back Squat" and i % 2:
+                row["sets_json"] = [{"reps": 5, "weight_kg": 100.0 + i, "rpe": 7 + 0.5 * (i % 4)}] * 3
+            rows.append(row)
+    return rows
+
+
+def _per_exercise_metrics(rows):
+    groups = {}
+    for r in rows:
+        groups.setdefault(exercise_key(r["exercise_name"]), []).append(r)
+    out = {}
+    for key, group in groups.items():
+        store = SessionStore.from_rows(group)
+        last = slice(-data_prep.TREND_WINDOW, None)
+        out[key] = _trend_metrics_from_arrays(
+            np.round(store.total_volume, 2)[last],
+            np.round(store.max_set_weight, 2)[last],
+            np.round(store.avg_rpe, 2)[last],
+        )
+    return out
+
+
+def test_grouped_trends_match_per_exercise_path():
+    rows = _history()
+    trends = grouped_trend_metrics(history_frame(rows))
+    expected = _per_exercise_metrics(rows)
+
+    assert set(trends.index) == set(expected)
+    assert trends.loc[exercise_key("Bench Press"), "sessions"] == 12
+    for key, m in expected.items():
+        row = trends.loc[key]
+        for col in ("volume_slope", "weight_slope", "rpe_trend", "consistency"):
+            assert row[col] == pytest.approx(m[col], abs=1e-3), (key, col)
+        if "avg_rpe" in m:
+            assert row["avg_rpe"] == pytest.approx(m["avg_rpe"])
+        else:
+            assert np.isnan(row["avg_rpe"])
+
+
+def test_hybrid_pipeline_matches_rule_advisor(monkeypatch):
+    rows = _history()
+
+    async def fake_rows(user_id):
+        return rows
+
+    monkeypatch.setattr(data_prep, "fetch_user_history_rows", fake_rows)
+    out = asyncio.run(fitness_advisor.hybrid_recommendation_pipeline("u1"))
+    recs = out["recommendations"]
+    assert len(recs) == 4
+
+    for rec in recs:
+        metrics = {k: v for k, v in rec.pop("trend_metrics").items() if v is not None}
+        metrics.pop("sessions")
+        assert rec == asyncio.run(build_suggestion_payload(rec["exercise"], metrics))
+
+
+def test_hybrid_pipeline_without_history(monkeypatch):
+    async def fake_rows(user_id):
+        return []
+
+    monkeypatch.setattr(data_prep, "fetch_user_history_rows", fake_rows)
+    out = asyncio.run(fitness_advisor.hybrid_recommendation_pipeline("u1"))
+    assert "error" in out
@@ -0,0 +1,31 @@
+-- 007_exercise_rolling_summaries.sql
+-- Purpose: replace the O(n^2) exercise_performance_rolling view with a
+-- materialized table maintained by the backend (app/ai/rolling.py) on
+-- workout writes when ROLLING_SUMMARY_PERSIST is enabled.
+
+DROP VIEW IF EXISTS exercise_performance_rolling;
+
+CREATE TABLE IF NOT EXISTS exercise_rolling_summaries (
+  user_id uuid REFERENCES auth.users(id) ON DELETE CASCADE,
+  exercise_name text NOT NULL,
+  window_size int NOT NULL CHECK (window_size > 0),
+  occurrences int NOT NULL,
+  avg_total_volume numeric NOT NULL,
+  avg_max_weight numeric NOT NULL,
+  avg_rpe numeric,
+  trend_volume_pct_change numeric,
+  trend_max_weight_pct_change numeric,
+  last_performed_at timestamptz,
+  updated_at timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (user_id, exercise_name, window_size)
+);
+
+-- Supports the "last N sessions of one exercise" reads used to refresh a row
+CREATE INDEX IF NOT EXISTS idx_workouts_user_exercise_created
+  ON workouts(user_id, exercise_name, created_at DESC);
+
+ALTER TABLE exercise_rolling_summaries ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own rolling summaries"
+  ON exercise_rolling_summaries FOR SELECT
+  USING (auth.uid() = user_id);
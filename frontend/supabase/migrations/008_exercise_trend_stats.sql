@@ -0,0 +1,22 @@
+-- 008_exercise_trend_stats.sql
+-- Purpose: running trend statistics per (user, exercise), maintained by the
+-- backend (app/ai/trend_stats.py) on workout writes when TREND_STATS_PERSIST
+-- is enabled. `state` holds the last-12-session window plus regression sums,
+-- Welford mean/M2 and EWMA values. `version` is bumped on every save; the
+-- backend only writes a row still at the version it read (optimistic
+-- concurrency), so concurrent workout writes can't drop each other's update.
+
+CREATE TABLE IF NOT EXISTS exercise_trend_stats (
+  user_id uuid REFERENCES auth.users(id) ON DELETE CASCADE,
+  exercise_name text NOT NULL,
+  state jsonb NOT NULL,
+  version bigint NOT NULL DEFAULT 1,
+  updated_at timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (user_id, exercise_name)
+);
+
+ALTER TABLE exercise_trend_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own trend stats"
+  ON exercise_trend_stats FOR SELECT
+  USING (auth.uid() = user_id);
@@ -0,0 +1,20 @@
+-- 009_user_exercise_frequency.sql
+-- Purpose: per-user exercise frequency/recency in one grouped query
+-- (backend: app/ai/exercise_index.py). Served by the
+-- idx_workouts_user_exercise_created index from migration 007.
+-- security_invoker: the view applies the caller's workouts RLS policies
+-- instead of the owner's rights. Only the service-role backend reads it,
+-- so the API roles get no access at all.
+
+CREATE OR REPLACE VIEW user_exercise_frequency WITH (security_invoker = true) AS
+SELECT
+  w.user_id,
+  w.exercise_name,
+  count(*)::int AS session_count,
+  min(w.created_at) AS first_performed_at,
+  max(w.created_at) AS last_performed_at
+FROM workouts w
+WHERE w.exercise_name IS NOT NULL
+GROUP BY w.user_id, w.exercise_name;
+
+REVOKE ALL ON user_exercise_frequency FROM anon, authenticated;
@@ -0,0 +1,29 @@
+-- 010_exercise_ids.sql
+-- Purpose: key workouts by the backend exercise catalog id
+-- (app/ai/exercise_catalog.py) instead of free-text exercise_name.
+-- New/updated rows get exercise_id from the API; legacy rows can be filled
+-- with: python -m app.ai.exercise_catalog --backfill
+
+ALTER TABLE workouts
+ADD COLUMN IF NOT EXISTS exercise_id int;
+
+CREATE INDEX IF NOT EXISTS idx_workouts_user_exercise_id_created
+  ON workouts(user_id, exercise_id, created_at DESC);
+
+-- Group catalog exercises by id; free-text ones still by name. The column
+-- list differs from 009's (exercise_id is inserted second), which CREATE OR
+-- REPLACE VIEW cannot do, so the view is dropped and recreated.
+DROP VIEW IF EXISTS user_exercise_frequency;
+CREATE VIEW user_exercise_frequency WITH (security_invoker = true) AS
+SELECT
+  w.user_id,
+  w.exercise_id,
+  min(w.exercise_name) AS exercise_name,
+  count(*)::int AS session_count,
+  min(w.created_at) AS first_performed_at,
+  max(w.created_at) AS last_performed_at
+FROM workouts w
+WHERE w.exercise_name IS NOT NULL
+GROUP BY w.user_id, w.exercise_id, CASE WHEN w.exercise_id IS NULL THEN w.exercise_name END;
+
+REVOKE ALL ON user_exercise_frequency FROM anon, authenticated;
@@ -0,0 +1,61 @@
+-- 011_recommendations_cache.sql
+-- Purpose: next-workout suggestions precomputed per user by the offline job
+-- (python -m app.jobs.precompute_recommendations). /api/ai/next-workout
+-- serves a row when RECOMMENDATIONS_CACHE is enabled and its `data_version`
+-- still equals the user's workouts version.
+--
+-- user_data_versions.workouts_version is bumped by a trigger in the same
+-- transaction as every insert/update/delete on workouts, whichever worker
+-- or client made it. The job reads it before fetching a user's history, so
+-- a write that lands while the job runs leaves the row out of date and it
+-- is not served.
+
+CREATE TABLE IF NOT EXISTS user_data_versions (
+  user_id uuid PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  workouts_version bigint NOT NULL DEFAULT 0,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE user_data_versions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own data versions"
+  ON user_data_versions FOR SELECT
+  USING (auth.uid() = user_id);
+
+CREATE OR REPLACE FUNCTION bump_workouts_version()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO user_data_versions AS v (user_id, workouts_version, updated_at)
+  VALUES (COALESCE(NEW.user_id, OLD.user_id), 1, now())
+  ON CONFLICT (user_id) DO UPDATE
+    SET workouts_version = v.workouts_version + 1, updated_at = now();
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS workouts_bump_version ON workouts;
+CREATE TRIGGER workouts_bump_version
+  AFTER INSERT OR UPDATE OR DELETE ON workouts
+  FOR EACH ROW EXECUTE FUNCTION bump_workouts_version();
+
+INSERT INTO user_data_versions (user_id)
+SELECT DISTINCT user_id FROM workouts WHERE user_id IS NOT NULL
+ON CONFLICT (user_id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS recommendations_cache (
+  user_id uuid PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  suggestions jsonb NOT NULL,
+  data_version bigint NOT NULL,
+  last_workout_at timestamptz NOT NULL,
+  computed_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE recommendations_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own cached recommendations"
+  ON recommendations_cache FOR SELECT
+  USING (auth.uid() = user_id);
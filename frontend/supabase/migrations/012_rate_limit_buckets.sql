@@ -0,0 +1,50 @@
+-- 012_rate_limit_buckets.sql
+-- Purpose: shared per-user token buckets for the backend rate limiter
+-- (app/core/rate_limit.py) when RATE_LIMIT_BACKEND=supabase, so every
+-- worker draws from the same bucket. take_rate_limit_tokens() refills and
+-- charges a bucket in one statement under the row lock, and returns
+-- whether the call is allowed plus the seconds until it would be.
+
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+  key text PRIMARY KEY,
+  tokens double precision NOT NULL,
+  updated_at timestamptz NOT NULL DEFAULT clock_timestamp()
+);
+
+-- Backend (service role) only: no policies for anon / authenticated
+ALTER TABLE rate_limit_buckets ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION take_rate_limit_tokens(
+  p_key text,
+  p_cost double precision,
+  p_rate double precision,   -- tokens per second
+  p_burst double precision
+)
+RETURNS TABLE (allowed boolean, tokens double precision, retry_after double precision)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  v_now timestamptz := clock_timestamp();
+  v_tokens double precision;
+BEGIN
+  INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+  VALUES (p_key, p_burst, v_now)
+  ON CONFLICT (key) DO UPDATE
+    SET tokens = LEAST(p_burst, b.tokens + EXTRACT(EPOCH FROM v_now - b.updated_at) * p_rate),
+        updated_at = v_now
+  RETURNING b.tokens INTO v_tokens;
+
+  IF v_tokens >= p_cost THEN
+    UPDATE rate_limit_buckets SET tokens = v_tokens - p_cost WHERE key = p_key;
+    RETURN QUERY SELECT true, v_tokens - p_cost, 0::double precision;
+  ELSE
+    RETURN QUERY SELECT false, v_tokens, (p_cost - v_tokens) / NULLIF(p_rate, 0);
+  END IF;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION take_rate_limit_tokens(text, double precision, double precision, double precision)
+  FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION take_rate_limit_tokens(text, double precision, double precision, double precision)
+  TO service_role;